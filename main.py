@@ -1,6 +1,9 @@
+import logging
+
 import tyro
 
 from model_viewer import default_dict
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
     tyro.extras.subcommand_cli_from_dict(default_dict)
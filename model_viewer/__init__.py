@@ -1,49 +1,137 @@
-from dataclasses import asdict, dataclass
+import importlib
+import json
+import logging
+import time
+import tomllib
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
-from typing import Any, Literal, Protocol, Type
+from typing import Annotated, Callable, Literal, Type
 
-from .simple_viewer import SimpleViewer
-from .turntable_viewer import TurntableViewer
+import tyro
 
+from .batch import RenderJob, ViewerInterface, collect_jobs, process_job
+from .daemon import DEFAULT_SOCKET, serve, submit
+from .dataset_index import INDEX_NAME, CostModel, DatasetIndex, Progress
+from .dedup import DEDUP_MODE, Deduplicator
+from .instrumentation import METRICS_NAME, MetricsLog, PhaseTimer, log_phase_summary
+from .journal import JOURNAL_NAME, Journal
+from .manifest import MANIFEST_NAME, Manifest, hash_config, hash_model
+from .shards import Shard, merge_manifests, shard_manifests
+from .sinks import (
+    BORDER_MODE,
+    CROP_NAME,
+    IMAGE_FORMATS,
+    LOD_NAME,
+    OUTPUT_FORMAT,
+    output_files,
+)
+from .workers import (
+    WorkerLimits,
+    log_frame_summary,
+    log_summary,
+    render_frames_parallel,
+    render_parallel,
+)
 
-class ViewerInterface(Protocol):
-    def render(self, output_path: Path) -> None: ...
-    def save_blend_file(self, output_path: Path) -> None: ...
-    def load_model(self, model_path: Path) -> Any: ...
-    def unload_model(self, obj: Any) -> None: ...
+logger = logging.getLogger(__name__)
 
+# Viewers import bpy, which takes most of a second, so they are only imported
+# once a render starts.
+VIEWER_CLASSES = {
+    "simple": ("simple_viewer", "SimpleViewer"),
+    "turntable": ("turntable_viewer", "TurntableViewer"),
+    "sheet": ("contact_sheet", "ContactSheetViewer"),
+    "passes": ("passes", "MultiPassViewer"),
+}
 
-def process(
-    viewer: ViewerInterface,
-    model_path: Path,
-    output_dir: Path,
-):
-    obj = viewer.load_model(model_path)
-    viewer.render(output_dir)
-    viewer.unload_model(obj)
 
+def viewer_class(name: str) -> Type[ViewerInterface]:
+    """Import the viewer class of a subcommand or render pass."""
+    module, cls_name = VIEWER_CLASSES[name]
+    return getattr(importlib.import_module(f".{module}", __name__), cls_name)
 
-def _run(
-    model_path: Path,
-    output_dir: Path,
-    save_to_blend: bool,
-    viewer_cls: Type[ViewerInterface],
-    **cls_kwargs: Any,
-):
-    viewer = viewer_cls(**cls_kwargs)
 
-    if model_path.is_file():
-        process(viewer, model_path, output_dir)
-    else:
-        file_list = model_path.rglob("*.obj")
-        for path in file_list:
-            # for each model, create a new output directory maintaining folder structure
-            relative_path = path.relative_to(model_path)
-            model_output_dir = output_dir / relative_path.parent / path.stem
-            process(viewer, path, model_output_dir)
-
-    if save_to_blend:
-        viewer.save_blend_file(output_dir / "model.blend")
+def __getattr__(name: str):
+    # Keeps `from model_viewer import SimpleViewer` working.
+    for viewer, (_, cls_name) in VIEWER_CLASSES.items():
+        if name == cls_name:
+            return viewer_class(viewer)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass
+class BatchConfig:
+    """Configuration for batch rendering of model directories."""
+
+    workers: int = 1
+    """Number of worker processes, each with its own Blender scene."""
+    incremental: bool = False
+    """Skip models whose files, config and outputs are unchanged since the last run."""
+    prune: bool = False
+    """Delete the outputs of models that no longer exist in the input folder."""
+    metrics: bool = False
+    """Time every load, render and unload phase, write per-model records to
+    metrics.jsonl in the output folder and log p50/p95/max times per phase."""
+    index: Path | None = None
+    """Dataset index written by the `index` command, used to render the most
+    expensive models first and to estimate the remaining time. Defaults to
+    index.json in the input folder, if it exists."""
+    frame_workers: int = 1
+    """Split the frames of each turntable over this many processes, which all
+    load the model, instead of rendering models in parallel. For a few heavy
+    models; needs png output. Timeouts and recycling apply to each process's
+    share of the frames."""
+    shard: str | None = None
+    """Render only shard i/N (0 <= i < N) of the models, chosen by a hash of each
+    model's path, and write manifest.shard-i-of-N.json. Combine the shards with
+    the `merge` command."""
+    mesh_cache: Path | None = None
+    """Folder caching every imported and normalized mesh as binary arrays, keyed
+    by the model's files, axes and importer. Later runs build cached meshes
+    without reading the OBJ. With workers, the hit/miss report needs --metrics."""
+    mesh_cache_gb: float = 10.0
+    """Size of the mesh cache; the least recently used meshes are evicted."""
+    isolate: bool = False
+    """Render in a supervised worker process even with one worker, so a crash
+    inside Blender fails only its model. Implied by the options below."""
+    timeout: float = 0.0
+    """Seconds a model may take before its worker is killed and the model is
+    recorded as failed, 0 for no limit."""
+    recycle_after: int = 0
+    """Replace each worker process after this many models, 0 to keep it."""
+    recycle_rss_gb: float = 0.0
+    """Replace a worker process once its peak memory exceeds this many GB, 0 to
+    keep it."""
+    dedup: DEDUP_MODE = "none"
+    """Render models with the same fingerprint once: "file" compares the hashes
+    of the OBJ, its MTL files and textures, "geometry" also matches copies
+    with other float formatting, position or scale. Renders go to .store in the
+    output folder and are hardlinked into each model's folder."""
+    dedup_copy: bool = False
+    """Copy deduplicated outputs instead of hardlinking them."""
+    resume: bool = False
+    """Skip the models that the journal of the last run, journal.jsonl in the
+    output folder, lists as rendered or failed with the same config, e.g. after
+    the run was killed."""
+    dry_run: bool = False
+    """Print the models that would be rendered, their output paths and estimated
+    render times as JSON, without importing Blender or writing anything."""
+
+    @property
+    def supervised(self) -> bool:
+        """Whether models render in worker processes, even with one worker."""
+        return (
+            self.isolate
+            or self.timeout > 0
+            or self.recycle_after > 0
+            or self.recycle_rss_gb > 0
+        )
+
+    @property
+    def worker_limits(self) -> WorkerLimits:
+        return WorkerLimits(
+            self.timeout, self.recycle_after, int(self.recycle_rss_gb * 1e9)
+        )
 
 
 MODEL_ORIENTATION_AXIS = Literal[
@@ -71,15 +159,490 @@ class SimpleConfig:
     """Forward axis of the imported model."""
     apply_default_material: bool = True
     """Whether to apply default material to loaded models."""
+    importer: Literal["operator", "numpy"] = "operator"
+    """OBJ importer: Blender's operator, or the vectorized NumPy reader."""
+    orphan_purge_interval: int = 100
+    """Purge orphan datablocks every N unloaded models, 0 to disable."""
+    engine: Literal["WORKBENCH", "EEVEE", "CYCLES"] | None = None
+    """Render engine, Blender's factory default if not set."""
+    profile: Literal["preview", "standard", "final"] | None = None
+    """Quality profile setting samples, adaptive sampling, denoising, bounces and
+    tiles."""
+    threads: int = 0
+    """Render threads, 0 to use all cores (split evenly between workers)."""
+    output_format: OUTPUT_FORMAT = "png"
+    """Output of each model: one PNG, JPEG (needs Pillow) or float EXR per frame,
+    a frame stack as .npz or memory-mapped .npy, or an animated GIF/WebP (needs
+    Pillow)."""
+    png_compression: int = 1
+    """zlib level of PNGs, 0 (fastest) to 9 (smallest)."""
+    png_depth: Literal[8, 16] = 8
+    """Bits per PNG channel. 16-bit PNGs are encoded by Blender in the render
+    thread."""
+    quality: int = 90
+    """Quality of JPEG and lossy WebP, 1 to 100."""
+    lossless: bool = False
+    """Encode WebP losslessly."""
+    background: tuple[float, float, float] = (1.0, 1.0, 1.0)
+    """RGB color that JPEG frames are flattened onto, as JPEG has no alpha."""
+    writer_threads: int = 2
+    """Threads encoding and writing frames while the next frame renders, 0 to
+    write them in the render thread."""
+    border: BORDER_MODE = "none"
+    """Render only the model's projected bounds: "full" keeps full-size images
+    with empty margins, "crop" saves the cropped region and its offset in
+    crop.json."""
+    border_padding: float = 0.02
+    """Padding around the projected bounds, as a fraction of the image size."""
+    max_triangles: int = 0
+    """Decimate models with more triangles before rendering, 0 for no limit.
+    The triangle counts are saved to lod.json."""
+    triangles_per_pixel: float = 0.0
+    """Triangle budget per output pixel, e.g. 1.0 allows 65536 triangles at
+    256x256; 0 for no limit. The lower of both budgets applies."""
+
+    def output_files(self, output_dir: Path) -> list[Path]:
+        """Files rendered for one model into `output_dir`."""
+        return self._with_metadata(
+            output_files(self.output_format, output_dir, 1, numbered=False)
+        )
+
+    def _with_metadata(self, files: list[Path]) -> list[Path]:
+        output_dir = files[0].parent
+        if self.border == "crop":
+            files = [*files, output_dir / CROP_NAME]
+        if self.max_triangles > 0 or self.triangles_per_pixel > 0:
+            files = [*files, output_dir / LOD_NAME]
+        return files
+
+
+def _check_stale(manifest: Manifest, jobs: list[RenderJob], prune: bool):
+    keys = {job.key for job in jobs}
+    # Deleted models have nothing left to retry.
+    for key in set(manifest.failures) - keys:
+        del manifest.failures[key]
+    stale = manifest.stale_keys(keys)
+    if not stale:
+        return
+    if prune:
+        logger.info("pruning outputs of %d deleted models", len(stale))
+        manifest.prune(stale)
+    else:
+        logger.warning(
+            "%d models in the manifest no longer exist (use --prune to delete "
+            "their outputs): %s",
+            len(stale),
+            ", ".join(stale),
+        )
+
+
+def _prune_store(
+    batch: BatchConfig, model_path: Path, output_dir: Path, dedup: Deduplicator
+) -> None:
+    """With `--prune`, delete the store entries no manifest in `output_dir` links to."""
+    if batch.prune and model_path.is_dir():
+        dedup.prune_store(
+            [Manifest.load(output_dir), *shard_manifests(output_dir).values()]
+        )
+
+
+def _load_index(
+    model_path: Path, index_path: Path | None, jobs: list[RenderJob], save: bool
+) -> DatasetIndex:
+    """The dataset index of a batch run, brought up to date with the input.
+
+    Without an index file the index is empty and keeps the order of the jobs.
+    The updated index is written back if `save` is set.
+    """
+    if index_path is None:
+        index_path = model_path / INDEX_NAME
+        if not index_path.is_file():
+            return DatasetIndex(index_path)
+    index = DatasetIndex.load(index_path)
+    scanned = index.update(jobs)
+    if scanned:
+        logger.info("updated the index with %d new or changed models", scanned)
+        if save:
+            index.save()
+    return index
+
+
+def _select_shard(
+    spec: str | None, jobs: list[RenderJob]
+) -> tuple[list[RenderJob], tuple[str, str, str]]:
+    """The shard's jobs, and the names of its manifest, metrics and journal.
+
+    Without a shard, all jobs and the usual names.
+    """
+    names = (MANIFEST_NAME, METRICS_NAME, JOURNAL_NAME)
+    if spec is None:
+        return jobs, names
+    shard = Shard.parse(spec)
+    jobs = shard.select(jobs)
+    logger.info("shard %s: %d models", shard, len(jobs))
+    return jobs, tuple(shard.file_name(name) for name in names)
+
+
+def _resume(
+    journal: Journal, manifest: Manifest, jobs: list[RenderJob], config_hash: str
+) -> list[RenderJob]:
+    """Jobs that the last run left unfinished, with the finished ones recorded."""
+    finished = journal.replay(manifest, config_hash)
+    todo = [job for job in jobs if job.key not in finished]
+    logger.info("resuming: %d models finished by the last run", len(jobs) - len(todo))
+    return todo
+
+
+def _skip_up_to_date(
+    manifest: Manifest,
+    jobs: list[RenderJob],
+    config: "SimpleConfig | PassesConfig",
+    config_hash: str,
+) -> tuple[list[RenderJob], dict[str, str]]:
+    """Jobs whose outputs are missing or stale, and the hashes of all models."""
+    model_hashes = {job.key: hash_model(job.model_path) for job in jobs}
+    todo = [
+        job
+        for job in jobs
+        if not manifest.is_up_to_date(
+            job.key,
+            model_hashes[job.key],
+            config_hash,
+            config.output_files(job.output_dir),
+        )
+    ]
+    logger.info("skipping %d up-to-date models", len(jobs) - len(todo))
+    return todo, model_hashes
+
+
+def _render_in_processes(
+    jobs: list[RenderJob],
+    batch: BatchConfig,
+    viewer: str,
+    cls_kwargs: dict,
+    *,
+    on_done: Callable[[RenderJob, dict | None, float], None],
+    on_failed: Callable[[RenderJob, str, float], None],
+) -> None:
+    viewer_cls = viewer_class(viewer)
+    if batch.frame_workers <= 1:
+        start = time.perf_counter()
+        stats = render_parallel(
+            jobs,
+            batch.workers,
+            viewer_cls,
+            on_done=on_done,
+            on_failed=on_failed,
+            metrics=batch.metrics,
+            limits=batch.worker_limits,
+            **cls_kwargs,
+        )
+        log_summary(stats, time.perf_counter() - start)
+        return
+
+    if viewer != "turntable":
+        raise ValueError("--frame-workers only splits turntables")
+    if cls_kwargs["output_format"] not in IMAGE_FORMATS:
+        raise ValueError("--frame-workers needs png, jpeg or exr output")
+    if batch.workers > 1:
+        logger.warning("rendering one model at a time with --frame-workers")
+    start = time.perf_counter()
+    frame_stats = render_frames_parallel(
+        jobs,
+        batch.frame_workers,
+        viewer_cls,
+        on_done=on_done,
+        on_failed=on_failed,
+        metrics=batch.metrics,
+        limits=batch.worker_limits,
+        **cls_kwargs,
+    )
+    log_frame_summary(frame_stats, batch.frame_workers, time.perf_counter() - start)
+
+
+def _render_sequential(
+    viewer: ViewerInterface,
+    jobs: list[RenderJob],
+    on_done: Callable[[RenderJob, dict | None, float], None],
+    on_failed: Callable[[RenderJob, str, float], None],
+) -> None:
+    if isinstance(viewer, viewer_class("sheet")):
+        viewer.render_jobs(jobs, on_done, on_failed)
+    else:
+        for job in jobs:
+            start = time.perf_counter()
+            record, error = process_job(viewer, job)
+            if error is None:
+                on_done(job, record, time.perf_counter() - start)
+            else:
+                on_failed(job, error, time.perf_counter() - start)
+    if viewer.mesh_cache is not None:
+        viewer.mesh_cache.log_summary()
+
+
+def _render(
+    jobs: list[RenderJob],
+    batch: BatchConfig,
+    viewer_name: str,
+    cls_kwargs: dict,
+    *,
+    on_done: Callable[[RenderJob, dict | None, float], None],
+    on_failed: Callable[[RenderJob, str, float], None],
+) -> ViewerInterface | None:
+    """Render the jobs here or in worker processes.
+
+    Returns the viewer if the jobs were rendered in this process.
+    """
+    in_workers = batch.workers > 1 or batch.frame_workers > 1 or batch.supervised
+    if in_workers and viewer_name == "sheet":
+        logger.warning(
+            "contact sheets render in one process, ignoring --workers and "
+            "worker supervision"
+        )
+    elif in_workers:
+        _render_in_processes(
+            jobs, batch, viewer_name, cls_kwargs, on_done=on_done, on_failed=on_failed
+        )
+        return None
+
+    viewer = viewer_class(viewer_name)(**cls_kwargs)
+    if batch.metrics:
+        viewer.set_hooks(PhaseTimer())
+    _render_sequential(viewer, jobs, on_done, on_failed)
+    return viewer
+
+
+def _mesh_cache_kwargs(batch: BatchConfig) -> dict:
+    if batch.mesh_cache is None:
+        return {}
+    return {"mesh_cache": batch.mesh_cache, "mesh_cache_gb": batch.mesh_cache_gb}
+
+
+def _log_worker_cache_summary(
+    batch: BatchConfig, metrics_log: MetricsLog | None
+) -> None:
+    """Log the mesh cache hits and misses of the workers, from their metrics."""
+    if batch.mesh_cache is None or metrics_log is None:
+        return
+    # Imports bpy, which workers load but this process may not need.
+    from .mesh_cache import CacheStats, MeshCache  # noqa: PLC0415
+
+    cache = MeshCache(batch.mesh_cache, int(batch.mesh_cache_gb * 1e9))
+    cache.log_summary(CacheStats.from_records(metrics_log.records))
+
+
+@dataclass
+class _Plan:
+    """The models a batch run renders, and the state it records them in."""
+
+    jobs: list[RenderJob]
+    manifest: Manifest
+    journal: Journal
+    dedup: Deduplicator
+    index: DatasetIndex
+    model_hashes: dict[str, str]
+    config_hash: str
+    metrics_name: str
+
+
+def _plan(
+    model_path: Path,
+    output_dir: Path,
+    batch: BatchConfig,
+    viewer: str,
+    config: "SimpleConfig | PassesConfig",
+) -> _Plan:
+    """Select the models to render, without touching the output folder."""
+    jobs = collect_jobs(model_path, output_dir)
+    jobs, (manifest_name, metrics_name, journal_name) = _select_shard(batch.shard, jobs)
+
+    manifest = Manifest.load(output_dir, manifest_name)
+    if model_path.is_dir():
+        _check_stale(manifest, jobs, batch.prune and not batch.dry_run)
+
+    _, cls_name = VIEWER_CLASSES[viewer]
+    config_hash = hash_config({"viewer": cls_name, **asdict(config)})
+    journal = Journal(output_dir / journal_name, batch.resume)
+    if batch.resume:
+        jobs = _resume(journal, manifest, jobs, config_hash)
+    model_hashes: dict[str, str] = {}
+    if batch.incremental:
+        jobs, model_hashes = _skip_up_to_date(manifest, jobs, config, config_hash)
+    dedup = Deduplicator(output_dir, batch.dedup, batch.dedup_copy)
+    jobs = dedup.group(jobs, model_hashes)
+
+    index = _load_index(model_path, batch.index, jobs, save=not batch.dry_run)
+    return _Plan(
+        index.by_cost(jobs),
+        manifest,
+        journal,
+        dedup,
+        index,
+        model_hashes,
+        config_hash,
+        metrics_name,
+    )
+
+
+def _print_plan(plan: _Plan, config: "SimpleConfig | PassesConfig") -> None:
+    """Print the planned models as JSON, with render times estimated from the
+    manifest's timings of earlier runs."""
+    models = plan.index.models
+    timed = {
+        key: entry
+        for key, entry in plan.manifest.entries.items()
+        if entry["seconds"] and key in models
+    }
+    same_config = {
+        key: entry
+        for key, entry in timed.items()
+        if entry["config_hash"] == plan.config_hash
+    }
+    # Timings of other configs still beat no estimate.
+    cost_model = CostModel()
+    cost_model.observe_all(
+        [
+            (models[key].faces, entry["seconds"])
+            for key, entry in (same_config or timed).items()
+        ]
+    )
+
+    planned = []
+    for job in plan.jobs:
+        stats = models.get(job.key)
+        faces = stats.faces if stats is not None else None
+        estimate = cost_model.estimate(faces or 0) if cost_model.samples else None
+        planned.append(
+            {
+                "key": job.key,
+                "model_path": str(job.model_path),
+                "output_dir": str(job.output_dir),
+                "outputs": [str(path) for path in config.output_files(job.output_dir)],
+                # Output folders that a deduplicated render is linked into.
+                "copies": [
+                    str(member.output_dir)
+                    for member in plan.dedup.members(job)
+                    if member is not job
+                ],
+                "faces": faces,
+                "bytes": stats.size if stats is not None else None,
+                "estimated_seconds": estimate,
+            }
+        )
+    print(json.dumps(planned, indent=2))
+
+    estimates = [model["estimated_seconds"] for model in planned]
+    logger.info(
+        "dry run: %d models to render, %d faces, %s estimated",
+        len(planned),
+        sum(model["faces"] or 0 for model in planned),
+        f"{sum(estimates):.1f}s" if cost_model.samples else "no timings to",
+    )
+
+
+def _run(
+    model_path: Path,
+    output_dir: Path,
+    save_to_blend: bool,
+    *,
+    batch: BatchConfig,
+    viewer_name: str,
+    config: "SimpleConfig | PassesConfig",
+):
+    plan = _plan(model_path, output_dir, batch, viewer_name, config)
+    if batch.dry_run:
+        _print_plan(plan, config)
+        return
+
+    jobs, manifest, journal, dedup = plan.jobs, plan.manifest, plan.journal, plan.dedup
+    model_hashes, config_hash = plan.model_hashes, plan.config_hash
+    if not jobs:
+        # Keep the journal of the last run and don't start Blender.
+        manifest.save()
+        _prune_store(batch, model_path, output_dir, dedup)
+        logger.info("nothing to render")
+        return
+    # Not part of the config hash, as cached meshes render the same.
+    cls_kwargs = {**asdict(config), **_mesh_cache_kwargs(batch)}
+    # Split turntables are rendered one model at a time.
+    parallel_models = 1 if batch.frame_workers > 1 else max(1, batch.workers)
+    progress = Progress(jobs, plan.index.models, parallel_models)
+    metrics_log = (
+        MetricsLog(output_dir / plan.metrics_name, batch.resume)
+        if batch.metrics
+        else None
+    )
+    journal.start()
+    dedup.clear_store(jobs)
+    failed = []
+
+    def on_done(job: RenderJob, record: dict | None, seconds: float):
+        for member in dedup.fill(job, seconds):
+            model_hash = model_hashes.get(member.key) or hash_model(member.model_path)
+            # Copies of a deduplicated model took no render time.
+            member_seconds = seconds if member.key == job.key else 0.0
+            for log in (manifest, journal):
+                log.record(
+                    member.key,
+                    model_hash,
+                    config_hash,
+                    member.output_dir,
+                    member_seconds,
+                    store=dedup.store_entry(job),
+                )
+        if metrics_log is not None and record is not None:
+            metrics_log.write({"key": job.key, **record})
+        progress.done(job, seconds)
+
+    def on_failed(job: RenderJob, error: str, seconds: float):
+        failed.append(job.key)
+        for member in dedup.members(job):
+            manifest.record_failure(member.key, error)
+            journal.record_failure(member.key, error, config_hash)
+        progress.done(job, seconds)
+
+    try:
+        viewer = _render(
+            jobs, batch, viewer_name, cls_kwargs, on_done=on_done, on_failed=on_failed
+        )
+        if viewer is None:
+            _log_worker_cache_summary(batch, metrics_log)
+    finally:
+        dedup.log_summary()
+        journal.close()
+        manifest.save()
+        if manifest.failures:
+            logger.error(
+                "%d models failed, listed in %s", len(manifest.failures), manifest.path
+            )
+        if metrics_log is not None:
+            metrics_log.close()
+            log_phase_summary(metrics_log.records)
+    _prune_store(batch, model_path, output_dir, dedup)
+
+    if save_to_blend and viewer is None:
+        logger.warning("save_to_blend is ignored when rendering with workers")
+    elif save_to_blend:
+        viewer.save_blend_file(output_dir / "model.blend")
+    if failed:
+        raise SystemExit(1)
 
 
 def run_simple(
     model_path: Path,
     output_dir: Path,
     config: SimpleConfig,
+    batch: Annotated[BatchConfig, tyro.conf.OmitArgPrefixes] = BatchConfig(),
     save_to_blend: bool = True,
 ):
-    _run(model_path, output_dir, save_to_blend, SimpleViewer, **asdict(config))
+    _run(
+        model_path,
+        output_dir,
+        save_to_blend,
+        batch=batch,
+        viewer_name="simple",
+        config=config,
+    )
 
 
 @dataclass
@@ -87,18 +650,280 @@ class TurntableConfig(SimpleConfig):
     """Configuration for the turntable viewer."""
 
     num_frames: int = 5
+    animation_pass: bool = False
+    """Render all frames in one animation job instead of one render per frame.
+    Other output formats than png render per frame, keeping the scene data."""
+    border_union: bool = False
+    """Use one render border covering every frame instead of one per frame."""
+
+    def output_files(self, output_dir: Path) -> list[Path]:
+        return self._with_metadata(
+            output_files(self.output_format, output_dir, self.num_frames)
+        )
 
 
 def run_turntable(
     model_path: Path,
     output_dir: Path,
     config: TurntableConfig,
+    batch: Annotated[BatchConfig, tyro.conf.OmitArgPrefixes] = BatchConfig(),
     save_to_blend: bool = True,
 ):
-    _run(model_path, output_dir, save_to_blend, TurntableViewer, **asdict(config))
+    _run(
+        model_path,
+        output_dir,
+        save_to_blend,
+        batch=batch,
+        viewer_name="turntable",
+        config=config,
+    )
+
+
+@dataclass
+class SheetConfig(SimpleConfig):
+    """Configuration for contact sheets of many small renders."""
+
+    sheet_size: int = 16
+    """Models rendered together in one image (at most 63), which is that many times
+    larger."""
+
+
+def run_sheet(
+    model_path: Path,
+    output_dir: Path,
+    config: SheetConfig,
+    batch: Annotated[BatchConfig, tyro.conf.OmitArgPrefixes] = BatchConfig(),
+    save_to_blend: bool = False,
+):
+    """Render models in groups on one grid image and slice it into per-model renders."""
+    _run(
+        model_path,
+        output_dir,
+        save_to_blend,
+        batch=batch,
+        viewer_name="sheet",
+        config=config,
+    )
+
+
+VIEWER_CONFIGS = {"simple": SimpleConfig, "turntable": TurntableConfig}
+
+
+@dataclass
+class RenderPass:
+    """One render of every model in a multi-pass run."""
+
+    name: str
+    """Subdirectory of each model's output folder that the pass writes to."""
+    viewer: Literal["simple", "turntable"]
+    config: SimpleConfig
+
+
+@dataclass
+class PassesConfig:
+    """Render passes run on each model after loading it once."""
+
+    passes: list[RenderPass]
+
+    @classmethod
+    def load(cls, path: Path) -> "PassesConfig":
+        """Read passes from a TOML file.
+
+        Top-level keys are shared by all passes, and each `[[passes]]` table
+        sets a `name`, a `viewer` and the config fields it changes.
+        """
+        data = tomllib.loads(path.read_text())
+        tables = data.pop("passes", [])
+        if not tables:
+            raise ValueError(f"{path} defines no [[passes]]")
+        known = {f.name for f in fields(TurntableConfig)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"unknown config fields in {path}: {sorted(unknown)}")
+
+        passes = []
+        for table in tables:
+            settings = dict(table)
+            name = settings.pop("name")
+            viewer = settings.pop("viewer", "simple")
+            config_cls = VIEWER_CONFIGS[viewer]
+            names = {f.name for f in fields(config_cls)}
+            shared = {k: v for k, v in data.items() if k in names and k not in settings}
+            passes.append(RenderPass(name, viewer, config_cls(**shared, **settings)))
+        return cls(passes)
+
+    def output_files(self, output_dir: Path) -> list[Path]:
+        return [
+            path
+            for render_pass in self.passes
+            for path in render_pass.config.output_files(output_dir / render_pass.name)
+        ]
+
+
+def run_passes(
+    model_path: Path,
+    output_dir: Path,
+    config_file: Path,
+    batch: Annotated[BatchConfig, tyro.conf.OmitArgPrefixes] = BatchConfig(),
+    save_to_blend: bool = False,
+):
+    """Import each model once and render every pass listed in a TOML config file."""
+    config = PassesConfig.load(config_file)
+    _run(
+        model_path,
+        output_dir,
+        save_to_blend,
+        batch=batch,
+        viewer_name="passes",
+        config=config,
+    )
+
+
+def run_index(model_path: Path, index_path: Path | None = None):
+    """Count the vertices and faces of every OBJ in a folder without Blender.
+
+    Batch runs use the index to render the most expensive models first and to
+    estimate the remaining time. Only new or changed files are scanned again.
+
+    Args:
+        index_path: Where to save the index, index.json in the folder by default.
+    """
+    jobs = collect_jobs(model_path, model_path)
+    index = DatasetIndex.load(index_path or model_path / INDEX_NAME)
+    start = time.perf_counter()
+    scanned = index.update(jobs)
+    index.save()
+    models = index.models.values()
+    logger.info(
+        "indexed %d models (%d scanned in %.2fs): %d vertices, %d faces, %.1f MB",
+        len(index.models),
+        scanned,
+        time.perf_counter() - start,
+        sum(stats.vertices for stats in models),
+        sum(stats.faces for stats in models),
+        sum(stats.size for stats in models) / 1e6,
+    )
+
+
+def run_merge(model_path: Path, output_dir: Path):
+    """Combine the manifests of `--shard` runs copied into one output folder.
+
+    Writes the manifest.json a single run would have written, and fails if a
+    shard is missing, shards were rendered with different configs, a model
+    failed, or a model was rendered by no shard, several shards or the wrong
+    shard.
+    """
+    manifests = shard_manifests(output_dir)
+    if not manifests:
+        logger.error("no shard manifests in %s", output_dir)
+        raise SystemExit(1)
+    for shard, manifest in sorted(manifests.items(), key=lambda item: item[0].index):
+        seconds = [e["seconds"] for e in manifest.entries.values() if e["seconds"]]
+        logger.info(
+            "shard %s: %d models in %.1fs, %d failed",
+            shard,
+            len(manifest.entries),
+            sum(seconds),
+            len(manifest.failures),
+        )
+
+    keys = {job.key for job in collect_jobs(model_path, output_dir)}
+    merged, report = merge_manifests(output_dir, keys, manifests)
+    merged.save()
+    logger.info("merged %d models into %s", len(merged.entries), merged.path)
+
+    if len(report.shard_counts) > 1:
+        logger.error("shards of different counts: %s", report.shard_counts)
+    if report.missing_shards:
+        logger.error("missing shards: %s", report.missing_shards)
+    if len(report.config_hashes) > 1:
+        logger.error("shards were rendered with %d configs", len(report.config_hashes))
+    for key in report.missing:
+        logger.error("not rendered by any shard: %s", key)
+    for key, shards in report.duplicates.items():
+        logger.error("rendered by shards %s: %s", shards, key)
+    for key, index in report.misplaced.items():
+        logger.error(
+            "rendered by shard %d, which it does not belong to: %s", index, key
+        )
+    for key in report.extra:
+        logger.error("rendered but not in %s: %s", model_path, key)
+    for key, error in report.failures.items():
+        logger.error("failed: %s: %s", key, error)
+    if not report.ok:
+        raise SystemExit(1)
+
+
+def run_serve(
+    socket_path: Path = DEFAULT_SOCKET,
+    preload: Literal["simple", "turntable"] | None = "simple",
+):
+    """Keep a warm viewer in this process and render jobs sent with `submit`."""
+    viewers = {
+        name: (viewer_class(name), config_cls)
+        for name, config_cls in VIEWER_CONFIGS.items()
+    }
+    serve(socket_path, viewers, preload)
+
+
+def _parse_override(override: str) -> tuple[str, object]:
+    key, _, value = override.partition("=")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def run_submit(
+    model_path: Path,
+    output_dir: Path,
+    viewer: Literal["simple", "turntable"] = "simple",
+    overrides: tuple[str, ...] = (),
+    socket_path: Path = DEFAULT_SOCKET,
+):
+    """Render one model on a running daemon.
+
+    Args:
+        overrides: Config fields as key=value, e.g. width=512 engine=CYCLES.
+    """
+    response = submit(
+        {
+            "viewer": viewer,
+            "model_path": str(model_path.absolute()),
+            "output_dir": str(output_dir.absolute()),
+            "config": dict(_parse_override(o) for o in overrides),
+        },
+        socket_path,
+    )
+    if response["status"] != "ok":
+        logger.error("render failed: %s", response["error"])
+        raise SystemExit(1)
+    phases = {
+        name: sum(durations)
+        for name, durations in response["metrics"]["phases"].items()
+    }
+    logger.info(
+        "rendered %s in %.2fs with a %s viewer: %s",
+        model_path,
+        response["time"],
+        "warm" if response["warm"] else "new",
+        ", ".join(f"{name} {seconds:.3f}s" for name, seconds in phases.items()),
+    )
+
+
+def run_stop(socket_path: Path = DEFAULT_SOCKET):
+    """Shut down a running daemon."""
+    submit({"command": "shutdown"}, socket_path)
 
 
 default_dict = {
     "turntable": run_turntable,
     "simple": run_simple,
+    "sheet": run_sheet,
+    "passes": run_passes,
+    "index": run_index,
+    "merge": run_merge,
+    "serve": run_serve,
+    "submit": run_submit,
+    "stop": run_stop,
 }
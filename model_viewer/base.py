@@ -5,14 +5,52 @@ from typing import Any
 
 import bpy
 
+from .instrumentation import Hooks
+
+# An empty copy of the factory scene, kept to give later viewers a scene with
+# the factory settings without resetting Blender.
+FACTORY_SCENE = "Factory Scene"
+
 
 class BaseViewer(ABC):
-    def __init__(self):
+    def __init__(self, scene: str | None = None):
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.empty_scene()
+        self.hooks = Hooks()
+        self.scene = self.empty_scene(scene)
+
+    def set_hooks(self, hooks: Hooks) -> None:
+        """Install instrumentation hooks, e.g. a `PhaseTimer`."""
+        if self.hooks.render_stats in bpy.app.handlers.render_stats:
+            bpy.app.handlers.render_stats.remove(self.hooks.render_stats)
+        self.hooks = hooks
+        if hooks.enabled:
+            bpy.app.handlers.render_stats.append(hooks.render_stats)
 
-    def empty_scene(self):
-        bpy.ops.wm.read_factory_settings(use_empty=True)
+    def empty_scene(self, name: str | None = None) -> bpy.types.Scene:
+        """An empty scene with the factory settings for this viewer.
+
+        Without a name, Blender is reset to an empty file and its scene is
+        used. With a name, a new scene is added next to those of other
+        viewers, which keep working; only the first viewer resets Blender.
+        """
+        factory = bpy.data.scenes.get(FACTORY_SCENE)
+        if name is None or factory is None:
+            bpy.ops.wm.read_factory_settings(use_empty=True)
+            factory = bpy.context.scene.copy()
+            factory.name = FACTORY_SCENE
+            if name is None:
+                return bpy.context.scene
+        scene = factory.copy()
+        scene.name = name
+        return scene
+
+    def scene_context(self):
+        """Context override running an operator in this viewer's scene."""
+        return bpy.context.temp_override(
+            scene=self.scene,
+            view_layer=self.scene.view_layers[0],
+            collection=self.scene.collection,
+        )
 
     def save_blend_file(self, output_path: Path, exit_after_save: bool = True) -> None:
         """Save the current blend file to the output path."""
@@ -0,0 +1,79 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+from .instrumentation import Hooks
+
+if TYPE_CHECKING:
+    from .mesh_cache import MeshCache
+
+logger = logging.getLogger(__name__)
+
+
+class ViewerInterface(Protocol):
+    hooks: Hooks
+    mesh_cache: "MeshCache | None"
+
+    def render(self, output_path: Path) -> None: ...
+    def save_blend_file(self, output_path: Path) -> None: ...
+    def load_model(self, model_path: Path) -> Any: ...
+    def unload_model(self, obj: Any) -> None: ...
+    def set_hooks(self, hooks: Hooks) -> None: ...
+    def reset(self) -> None: ...
+
+
+@dataclass
+class RenderJob:
+    """A single model to render and the directory its outputs go to."""
+
+    model_path: Path
+    output_dir: Path
+    key: str
+    """Model path relative to the input folder, stable across runs."""
+
+
+def process(
+    viewer: ViewerInterface,
+    model_path: Path,
+    output_dir: Path,
+) -> dict[str, Any] | None:
+    """Load, render and unload one model.
+
+    Returns the model's metrics record if the viewer's hooks collect one.
+    """
+    viewer.hooks.begin_model(model_path)
+    obj = viewer.load_model(model_path)
+    viewer.render(output_dir)
+    viewer.unload_model(obj)
+    return viewer.hooks.end_model()
+
+
+def process_job(
+    viewer: ViewerInterface, job: RenderJob
+) -> tuple[dict[str, Any] | None, str | None]:
+    """Like `process`, but returns a failure as an error message.
+
+    The viewer is reset after a failure, so the next job starts from a clean
+    scene.
+    """
+    try:
+        return process(viewer, job.model_path, job.output_dir), None
+    except Exception as e:
+        logger.exception("failed to render %s", job.key)
+        viewer.reset()
+        return None, f"{type(e).__name__}: {e}"
+
+
+def collect_jobs(model_path: Path, output_dir: Path) -> list[RenderJob]:
+    """List the models under `model_path` with their output directories."""
+    if model_path.is_file():
+        return [RenderJob(model_path, output_dir, model_path.name)]
+
+    jobs = []
+    for path in model_path.rglob("*.obj"):
+        # for each model, create a new output directory maintaining folder structure
+        relative_path = path.relative_to(model_path)
+        model_output_dir = output_dir / relative_path.parent / path.stem
+        jobs.append(RenderJob(path, model_output_dir, relative_path.as_posix()))
+    return jobs
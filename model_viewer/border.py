@@ -0,0 +1,98 @@
+import json
+import math
+from pathlib import Path
+
+import bpy
+from bpy_extras.object_utils import world_to_camera_view
+from mathutils import Vector
+
+from .sinks import CROP_NAME
+
+# A pixel rectangle (x_min, y_min, x_max, y_max) with y pointing up, as Blender
+# counts the render border.
+PixelRect = tuple[int, int, int, int]
+
+
+def projected_bounds(
+    scene: bpy.types.Scene, camera: bpy.types.Object, objects: list[bpy.types.Object]
+) -> tuple[float, float, float, float] | None:
+    """Bounds of the objects' bounding boxes in normalized camera view space.
+
+    Returns None when a corner lies behind the camera, where the projection is
+    not meaningful. The camera matrix must be up to date, e.g. after
+    `view_layer.update()`.
+    """
+    xs, ys = [], []
+    for obj in objects:
+        matrix = obj.matrix_world
+        for corner in obj.bound_box:
+            point = world_to_camera_view(scene, camera, matrix @ Vector(corner))
+            if point.z <= 0:
+                return None
+            xs.append(point.x)
+            ys.append(point.y)
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def pixel_border(
+    bounds: tuple[float, float, float, float] | None,
+    width: int,
+    height: int,
+    padding: float,
+) -> PixelRect:
+    """Pixel rectangle covering `bounds` plus `padding` (a fraction of the size).
+
+    Falls back to the full frame when the bounds are unknown or off screen.
+    """
+    if bounds is None:
+        return 0, 0, width, height
+    min_x, min_y, max_x, max_y = bounds
+    x0 = max(0, math.floor((min_x - padding) * width))
+    y0 = max(0, math.floor((min_y - padding) * height))
+    x1 = min(width, math.ceil((max_x + padding) * width))
+    y1 = min(height, math.ceil((max_y + padding) * height))
+    if x1 <= x0 or y1 <= y0:
+        return 0, 0, width, height
+    return x0, y0, x1, y1
+
+
+def union(rects: list[PixelRect]) -> PixelRect:
+    return (
+        min(r[0] for r in rects),
+        min(r[1] for r in rects),
+        max(r[2] for r in rects),
+        max(r[3] for r in rects),
+    )
+
+
+def set_border(render: bpy.types.RenderSettings, rect: PixelRect, crop: bool) -> None:
+    """Restrict rendering to `rect`, cropping the output to it if `crop`."""
+    width, height = render.resolution_x, render.resolution_y
+    x0, y0, x1, y1 = rect
+    # Blender truncates border * size to whole pixels, so aim inside each pixel.
+    render.border_min_x = min(1.0, (x0 + 0.25) / width)
+    render.border_min_y = min(1.0, (y0 + 0.25) / height)
+    render.border_max_x = min(1.0, (x1 + 0.25) / width)
+    render.border_max_y = min(1.0, (y1 + 0.25) / height)
+    render.use_border = True
+    render.use_crop_to_border = crop
+
+
+def write_crop_metadata(
+    output_dir: Path, rects: list[PixelRect], width: int, height: int
+) -> Path:
+    """Save the offset and size of each cropped frame in the full image.
+
+    Offsets are measured from the top left corner, like image rows.
+    """
+    frames = [
+        {"x": x0, "y": height - y1, "width": x1 - x0, "height": y1 - y0}
+        for x0, y0, x1, y1 in rects
+    ]
+    path = output_dir / CROP_NAME
+    path.write_text(
+        json.dumps({"width": width, "height": height, "frames": frames}, indent=2)
+    )
+    return path
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+# Blender does not expose the pixels of the Render Result outside the UI, so a
+# frame is handed over as an uncompressed TGA, on a RAM-backed filesystem when
+# there is one with room for it.
+_SHM = Path("/dev/shm")
+
+_TGA_HEADER = 18
+_TGA_TRUECOLOR = 2
+_TGA_BITS = 32
+_TGA_TOP_LEFT = 0x20
+
+
+def decode_tga(data: bytes) -> np.ndarray:
+    """Decode an uncompressed 32-bit TGA into an (height, width, 4) RGBA array."""
+    id_length = data[0]
+    width = int.from_bytes(data[12:14], "little")
+    height = int.from_bytes(data[14:16], "little")
+    descriptor = data[17]
+    if data[2] != _TGA_TRUECOLOR or data[16] != _TGA_BITS:
+        raise ValueError("expected an uncompressed 32-bit TGA")
+
+    bgra = np.frombuffer(
+        data, dtype=np.uint8, count=width * height * 4, offset=_TGA_HEADER + id_length
+    ).reshape(height, width, 4)
+    rgba = bgra[:, :, [2, 1, 0, 3]]
+    # Rows are stored bottom-up unless the descriptor says otherwise.
+    return rgba if descriptor & _TGA_TOP_LEFT else rgba[::-1].copy()
+
+
+def capture_dir(num_bytes: int) -> Path:
+    """Directory for a capture of `num_bytes`: /dev/shm if it has room, which
+    Docker limits to 64 MB by default, the temporary directory otherwise."""
+    if _SHM.is_dir() and shutil.disk_usage(_SHM).free > num_bytes:
+        return _SHM
+    return Path(tempfile.gettempdir())
+
+
+def capture_frame(scene: bpy.types.Scene | None = None) -> np.ndarray:
+    """Pixels of the last render as an (height, width, 4) uint8 RGBA array.
+
+    The first row is the top of the image. The scene's color management is
+    applied, as when the render is saved to a PNG.
+
+    The Render Result is saved as an uncompressed TGA and read back, 4 bytes
+    per pixel, in /dev/shm on Linux and in the temporary directory where
+    /dev/shm is missing or too small. Both are cheaper for the render thread
+    than Blender writing a PNG itself, so only formats a capture cannot hold
+    are saved by Blender (see `sinks.saved_by_blender`).
+    """
+    scene = scene or bpy.context.scene
+    settings = scene.render.image_settings
+    saved = (settings.file_format, settings.color_mode, settings.color_depth)
+    render = scene.render
+    scale = render.resolution_percentage / 100
+    num_bytes = int(render.resolution_x * scale) * int(render.resolution_y * scale) * 4
+    path = capture_dir(num_bytes) / f"model_viewer_{os.getpid()}.tga"
+    try:
+        settings.file_format = "TARGA_RAW"
+        settings.color_mode = "RGBA"
+        bpy.data.images["Render Result"].save_render(str(path), scene=scene)
+        return decode_tga(path.read_bytes())
+    finally:
+        settings.file_format, settings.color_mode, settings.color_depth = saved
+        path.unlink(missing_ok=True)
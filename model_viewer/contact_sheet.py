@@ -0,0 +1,230 @@
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import bpy
+from mathutils import Matrix, Vector
+
+from .batch import RenderJob
+from .capture import capture_frame
+from .simple_viewer import SimpleViewer
+from .sinks import make_sink, saved_by_blender
+
+# Up to 8 x 8 cells, which the shared light rig covers from nearly the same
+# directions.
+MAX_SHEET_SIZE = 63
+# The shared rig is the simple viewer's, this many times larger and farther
+# away. Across a full sheet its light directions then differ by about 2
+# degrees, and its energy grows with the square of the scale to light the
+# models as brightly.
+RIG_SCALE = 100.0
+
+
+class ContactSheetViewer(SimpleViewer):
+    """Renders up to `sheet_size` models in one image and slices it per model.
+
+    The models sit on a grid facing a shared orthographic camera, which looks
+    along the simple viewer's camera direction. A cell spans what the simple
+    viewer's perspective camera sees at the model's distance, so models keep
+    their size in the frame. All cells share one copy of the simple viewer's
+    lights, scaled up around the sheet so every cell sees it alike: a light
+    per cell made Cycles' light sampling cost grow with the sheet size.
+    """
+
+    def __init__(self, sheet_size: int = 16, *args: Any, **kwargs: Any):
+        if not 1 <= sheet_size <= MAX_SHEET_SIZE:
+            raise ValueError(f"sheet_size must be between 1 and {MAX_SHEET_SIZE}")
+        self.sheet_size = sheet_size
+        self.columns = math.ceil(math.sqrt(sheet_size))
+        self.rows = math.ceil(sheet_size / self.columns)
+        # Model in each cell, None for a free cell.
+        self.cells: list[bpy.types.Object | None] = [None] * sheet_size
+        self.cell_centers: list[Vector] = []
+        super().__init__(*args, **kwargs)
+        if saved_by_blender(self.output_format, self.image_options):
+            raise ValueError("contact sheets are sliced from 8-bit captures")
+
+    def setup_scene(self) -> Any:
+        target = self.add_track_target()
+        self.add_sunlight(energy=5.0)
+        self.add_many_arealights(
+            num_lights=6,
+            radius=3.5 * RIG_SCALE,
+            height=1.5 * RIG_SCALE,
+            energy=25.0 * RIG_SCALE**2,
+            light_size=2.0 * RIG_SCALE,
+            track_target=target,
+        )
+
+        location = Vector((0, self.camera_distance, self.camera_height))
+        rotation = (-location).to_track_quat("-Z", "Y")
+        self.camera = self.add_camera(location=tuple(location))
+        self.camera.rotation_mode = "QUATERNION"
+        self.camera.rotation_quaternion = rotation
+
+        # Width of the perspective view at the model, along the larger side.
+        extent = 2 * location.length * math.tan(self.camera.data.angle / 2)
+        width, height = self.resolution
+        self.cell_size = (
+            extent * width / max(width, height),
+            extent * height / max(width, height),
+        )
+        self.camera.data.type = "ORTHO"
+        self.camera.data.ortho_scale = max(
+            self.columns * self.cell_size[0], self.rows * self.cell_size[1]
+        )
+
+        # Cells are laid out in the image plane, so each one is a shifted copy
+        # of the single model view.
+        right = rotation @ Vector((1, 0, 0))
+        up = rotation @ Vector((0, 1, 0))
+        for i in range(self.sheet_size):
+            row, column = divmod(i, self.columns)
+            center = (column - (self.columns - 1) / 2) * self.cell_size[0] * right + (
+                (self.rows - 1) / 2 - row
+            ) * self.cell_size[1] * up
+            self.cell_centers.append(center)
+
+    def setup_render(self) -> None:
+        super().setup_render()
+        R = self.scene.render
+        R.resolution_x = self.columns * self.resolution[0]
+        R.resolution_y = self.rows * self.resolution[1]
+
+    def load_model(self, model_path: Path) -> Any:
+        """Load a model into the first free cell."""
+        index = self.cells.index(None)
+        obj = super().load_model(model_path)
+        obj.matrix_world = (
+            Matrix.Translation(self.cell_centers[index]) @ obj.matrix_world
+        )
+        self.cells[index] = obj
+        return obj
+
+    def unload_model(self, obj: bpy.types.Object) -> Any:
+        self.cells[self.cells.index(obj)] = None
+        super().unload_model(obj)
+
+    def render(self, output_path: Path) -> Any:
+        """Render the only loaded model into `output_path`."""
+        loaded = [i for i, obj in enumerate(self.cells) if obj is not None]
+        if len(loaded) != 1:
+            raise ValueError(f"render() needs one loaded model, not {len(loaded)}")
+        self.render_sheet({loaded[0]: output_path})
+
+    def render_sheet(self, output_dirs: dict[int, Path]) -> None:
+        """Render all cells at once and write each listed cell to its directory."""
+        scene = self.scene
+        R = scene.render
+        R.film_transparent = self.transparent_background
+        R.use_border = False
+        scene.camera = self.camera
+
+        with self.hooks.phase("render"):
+            bpy.ops.render.render(animation=False, write_still=False, scene=scene.name)
+        with self.hooks.phase("capture"):
+            sheet = capture_frame(scene)
+
+        width, height = self.resolution
+        sinks = {}
+        # Cells are encoded on the writer's threads, side by side.
+        with self.hooks.phase("write"):
+            for index, output_dir in output_dirs.items():
+                row, column = divmod(index, self.columns)
+                cell = sheet[
+                    row * height : (row + 1) * height,
+                    column * width : (column + 1) * width,
+                ]
+                output_dir.mkdir(parents=True, exist_ok=True)
+                sinks[index] = make_sink(
+                    self.output_format, self.image_options, self.writer
+                )
+                sinks[index].open(output_dir, 1, numbered=False)
+                sinks[index].add(cell, 0)
+            written = {index: sink.close() for index, sink in sinks.items()}
+        for index, output_dir in output_dirs.items():
+            for path in written[index]:
+                self.hooks.wrote(path)
+            self.save_lod_metadata(output_dir, [self.cells[index]])
+
+    def reset(self) -> None:
+        super().reset()
+        self.cells = [None] * self.sheet_size
+
+    def load_group(
+        self,
+        group: list[RenderJob],
+        on_failed: Callable[[RenderJob, str, float], None] | None = None,
+    ) -> list[tuple[RenderJob, bpy.types.Object]]:
+        """Load the models of `group` into cells, leaving out those that fail.
+
+        A failure resets the viewer, like `process_job`, so the models loaded
+        before it are loaded again.
+        """
+        pending = list(group)
+        while True:
+            loaded = []
+            for job in pending:
+                start = time.perf_counter()
+                try:
+                    loaded.append((job, self.load_model(job.model_path)))
+                except Exception as e:
+                    self.logger.exception("failed to render %s", job.key)
+                    self.reset()
+                    pending.remove(job)
+                    if on_failed is not None:
+                        error = f"{type(e).__name__}: {e}"
+                        on_failed(job, error, time.perf_counter() - start)
+                    break
+            else:
+                return loaded
+
+    def render_jobs(
+        self,
+        jobs: list[RenderJob],
+        on_done: Callable[[RenderJob, dict | None, float], None] | None = None,
+        on_failed: Callable[[RenderJob, str, float], None] | None = None,
+    ) -> None:
+        """Render `jobs` in groups of `sheet_size` models per image.
+
+        A model that fails to load is reported to `on_failed` and the rest of
+        its sheet is rendered; if the sheet fails, all of its models do.
+        """
+        for start in range(0, len(jobs), self.sheet_size):
+            group = jobs[start : start + self.sheet_size]
+            group_start = time.perf_counter()
+            self.hooks.begin_model(group[0].model_path)
+            loaded = self.load_group(group, on_failed)
+            if not loaded:
+                self.hooks.end_model()
+                continue
+            self.hooks.record(models=[job.key for job, _ in loaded])
+            self.hooks.record(
+                vertices=sum(len(obj.data.vertices) for _, obj in loaded),
+                faces=sum(len(obj.data.polygons) for _, obj in loaded),
+            )
+            try:
+                self.render_sheet(
+                    {self.cells.index(obj): job.output_dir for job, obj in loaded}
+                )
+                for _, obj in loaded:
+                    self.unload_model(obj)
+            except Exception as e:
+                self.logger.exception(
+                    "failed to render a sheet of %d models", len(loaded)
+                )
+                self.reset()
+                self.hooks.end_model()
+                seconds = (time.perf_counter() - group_start) / len(loaded)
+                for job, _ in loaded:
+                    if on_failed is not None:
+                        on_failed(job, f"{type(e).__name__}: {e}", seconds)
+                continue
+            record = self.hooks.end_model()
+
+            # Models of a sheet share its time.
+            seconds = (time.perf_counter() - group_start) / len(loaded)
+            for i, (job, _) in enumerate(loaded):
+                if on_done is not None:
+                    on_done(job, record if i == 0 else None, seconds)
@@ -0,0 +1,184 @@
+import json
+import logging
+import socket
+import socketserver
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Type
+
+from .batch import ViewerInterface
+from .instrumentation import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = Path("/tmp/model_viewer.sock")
+
+
+def _run_job(viewer: ViewerInterface, model_path: Path, output_dir: Path) -> dict:
+    """Like `process`, but leaves the scene clean even when a step fails."""
+    viewer.hooks.begin_model(model_path)
+    obj = None
+    try:
+        obj = viewer.load_model(model_path)
+        viewer.render(output_dir)
+    finally:
+        if obj is not None:
+            viewer.unload_model(obj)
+        viewer.reset()
+    return viewer.hooks.end_model()
+
+
+class RenderDaemon:
+    """Renders jobs with a warm viewer kept between requests.
+
+    `viewers` maps a viewer name to its class and config dataclass. A job
+    names a viewer and overrides fields of its default config. Jobs with the
+    same viewer and config reuse the warm viewer; anything else builds a new
+    one, which still saves importing bpy.
+    """
+
+    def __init__(self, viewers: dict[str, tuple[Type[ViewerInterface], type]]):
+        self.viewers = viewers
+        self.viewer: ViewerInterface | None = None
+        self.viewer_key: str | None = None
+        self.running = True
+
+    def get_viewer(
+        self, name: str, overrides: dict[str, Any]
+    ) -> tuple[ViewerInterface, bool]:
+        """The viewer for a job, and whether it was already warm."""
+        viewer_cls, config_cls = self.viewers[name]
+        cls_kwargs = asdict(config_cls(**overrides))
+        key = json.dumps([name, cls_kwargs], sort_keys=True)
+        if self.viewer is not None and key == self.viewer_key:
+            return self.viewer, True
+
+        # There is one Blender scene, so the old viewer goes before a new one.
+        self.viewer = self.viewer_key = None
+        viewer = viewer_cls(**cls_kwargs)
+        viewer.set_hooks(PhaseTimer())
+        self.viewer, self.viewer_key = viewer, key
+        return viewer, False
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        command = request.get("command", "render")
+        if command == "ping":
+            return {"status": "ok"}
+        if command == "shutdown":
+            self.running = False
+            return {"status": "ok"}
+        if command != "render":
+            return {"status": "error", "error": f"unknown command {command!r}"}
+
+        start = time.perf_counter()
+        try:
+            viewer, warm = self.get_viewer(
+                request.get("viewer", "simple"), request.get("config", {})
+            )
+            setup_time = time.perf_counter() - start
+            record = _run_job(
+                viewer, Path(request["model_path"]), Path(request["output_dir"])
+            )
+        except Exception as e:
+            logger.exception("job %s failed", request.get("model_path"))
+            return {
+                "status": "error",
+                "error": f"{type(e).__name__}: {e}",
+                "time": time.perf_counter() - start,
+            }
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "rendered %s in %.2fs (%s viewer)",
+            request["model_path"],
+            elapsed,
+            "warm" if warm else "new",
+        )
+        return {
+            "status": "ok",
+            "warm": warm,
+            "time": elapsed,
+            "setup_time": setup_time,
+            "metrics": record,
+        }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line, answered with one JSON line.
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"status": "error", "error": f"invalid request: {e}"}
+        else:
+            response = self.server.render_daemon.handle(request)
+        self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+def _is_listening(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(
+    socket_path: Path,
+    viewers: dict[str, tuple[Type[ViewerInterface], type]],
+    preload: str | None = None,
+) -> None:
+    """Serve render jobs on a Unix socket until a shutdown request arrives.
+
+    Jobs run one at a time in this process, since bpy is single-threaded.
+    """
+    daemon = RenderDaemon(viewers)
+    if preload is not None:
+        daemon.get_viewer(preload, {})
+
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            raise RuntimeError(f"a render daemon is already listening on {socket_path}")
+        socket_path.unlink()
+
+    with socketserver.UnixStreamServer(str(socket_path), _RequestHandler) as server:
+        server.render_daemon = daemon
+        logger.info("listening on %s", socket_path)
+        try:
+            while daemon.running:
+                server.handle_request()
+        finally:
+            socket_path.unlink(missing_ok=True)
+    logger.info("shut down")
+
+
+def submit(
+    request: dict[str, Any],
+    socket_path: Path = DEFAULT_SOCKET,
+    timeout: float | None = None,
+) -> dict[str, Any]:
+    """Send one request to a running daemon and wait for its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def wait_until_ready(socket_path: Path, timeout: float = 120.0) -> None:
+    """Block until a daemon answers on `socket_path`."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            submit({"command": "ping"}, socket_path, timeout=timeout)
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
@@ -0,0 +1,193 @@
+"""Per-model statistics of a dataset, for scheduling and progress estimates.
+
+The index is built without Blender: every OBJ is read once as raw bytes and its
+vertex and face lines are counted.
+"""
+
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from .batch import RenderJob
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.json"
+
+_CHUNK_SIZE = 16 << 20
+
+
+@dataclass
+class ModelStats:
+    """Size and geometry counts of one OBJ file."""
+
+    size: int
+    """File size in bytes."""
+    mtime_ns: int
+    """Modification time, to notice files changed since they were scanned."""
+    vertices: int
+    faces: int
+
+
+def scan_obj(path: Path) -> ModelStats:
+    """Count the vertex and face lines of an OBJ file without parsing them."""
+    vertices = faces = 0
+    # A line start is a newline in the previous byte, which the first line
+    # gets for free.
+    previous = b"\n"
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            data = previous + chunk
+            vertices += data.count(b"\nv ")
+            faces += data.count(b"\nf ")
+            # Keep a line start split between chunks, like "...\n" | "v 1 2 3".
+            previous = data[-2:]
+    stat = path.stat()
+    return ModelStats(stat.st_size, stat.st_mtime_ns, vertices, faces)
+
+
+class DatasetIndex:
+    """Statistics of the models under an input folder, keyed by job key."""
+
+    def __init__(self, path: Path, models: dict[str, ModelStats] | None = None):
+        self.path = path
+        self.models = models if models is not None else {}
+
+    @classmethod
+    def load(cls, path: Path) -> "DatasetIndex":
+        if not path.is_file():
+            return cls(path)
+        with open(path) as f:
+            models = json.load(f)["models"]
+        return cls(path, {key: ModelStats(**stats) for key, stats in models.items()})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        models = {key: asdict(stats) for key, stats in self.models.items()}
+        with open(tmp_path, "w") as f:
+            json.dump({"models": models}, f, indent=1, sort_keys=True)
+        tmp_path.replace(self.path)
+
+    def update(self, jobs: list[RenderJob]) -> int:
+        """Scan models that are new or changed, and drop the deleted ones.
+
+        Returns the number of files scanned.
+        """
+        keys = {job.key for job in jobs}
+        for key in set(self.models) - keys:
+            del self.models[key]
+
+        scanned = 0
+        for job in jobs:
+            stats = self.models.get(job.key)
+            stat = job.model_path.stat()
+            if (
+                stats is None
+                or stats.size != stat.st_size
+                or stats.mtime_ns != stat.st_mtime_ns
+            ):
+                self.models[job.key] = scan_obj(job.model_path)
+                scanned += 1
+        return scanned
+
+    def by_cost(self, jobs: list[RenderJob]) -> list[RenderJob]:
+        """Jobs ordered from the most to the least expensive model.
+
+        Models are ranked by face count, then file size, which orders them the
+        same way as any cost estimate growing with both.
+        """
+
+        def cost(job: RenderJob) -> tuple[int, int]:
+            stats = self.models.get(job.key)
+            return (stats.faces, stats.size) if stats is not None else (0, 0)
+
+        return sorted(jobs, key=cost, reverse=True)
+
+
+class CostModel:
+    """Render seconds of a model estimated as `fixed + per_face * faces`.
+
+    The two coefficients are fit by least squares to the timings observed so
+    far. Until timings of models with different face counts come in, every
+    model is estimated at the mean time.
+    """
+
+    def __init__(self):
+        self.samples: list[tuple[int, float]] = []
+        self.fixed = 0.0
+        self.per_face = 0.0
+
+    def observe(self, faces: int, seconds: float) -> None:
+        self.observe_all([(faces, seconds)])
+
+    def observe_all(self, samples: list[tuple[int, float]]) -> None:
+        """Add several timings, refitting once."""
+        self.samples.extend(samples)
+        n = len(self.samples)
+        if n == 0:
+            return
+        mean_faces = sum(f for f, _ in self.samples) / n
+        mean_seconds = sum(s for _, s in self.samples) / n
+        variance = sum((f - mean_faces) ** 2 for f, _ in self.samples)
+        if variance > 0:
+            covariance = sum(
+                (f - mean_faces) * (s - mean_seconds) for f, s in self.samples
+            )
+            self.per_face = max(0.0, covariance / variance)
+        self.fixed = max(0.0, mean_seconds - self.per_face * mean_faces)
+
+    def estimate(self, faces: int) -> float:
+        return self.fixed + self.per_face * faces
+
+
+class Progress:
+    """Logs a progress line with an ETA after every finished model.
+
+    `stats` gives the face count of each job where the index knows it. The
+    remaining time is the estimated render time of the unfinished models,
+    spread over the workers.
+    """
+
+    def __init__(
+        self,
+        jobs: list[RenderJob],
+        stats: dict[str, ModelStats] | None = None,
+        num_workers: int = 1,
+    ):
+        stats = stats or {}
+        self.faces = {
+            job.key: stats[job.key].faces if job.key in stats else 0 for job in jobs
+        }
+        self.remaining = set(self.faces)
+        self.num_workers = num_workers
+        self.cost_model = CostModel()
+        self.start = time.perf_counter()
+
+    def done(self, job: RenderJob, seconds: float) -> None:
+        self.remaining.discard(job.key)
+        self.cost_model.observe(self.faces.get(job.key, 0), seconds)
+        total = len(self.faces)
+        finished = total - len(self.remaining)
+        logger.info(
+            "[%d/%d] %.1f%% %s in %.2fs, elapsed %s, ETA %s",
+            finished,
+            total,
+            100 * finished / total,
+            job.key,
+            seconds,
+            _format_seconds(time.perf_counter() - self.start),
+            _format_seconds(self.eta()),
+        )
+
+    def eta(self) -> float:
+        """Estimated seconds until all models are rendered."""
+        remaining = sum(self.cost_model.estimate(self.faces[k]) for k in self.remaining)
+        return remaining / min(self.num_workers, max(1, len(self.remaining)))
+
+
+def _format_seconds(seconds: float) -> str:
+    return str(timedelta(seconds=round(seconds)))
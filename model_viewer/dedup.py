@@ -0,0 +1,212 @@
+"""Rendering identical models once per batch.
+
+Every model is fingerprinted before import. Models with the same fingerprint
+are rendered once, into a content-addressed store in the output folder, and
+the outputs are hardlinked (or copied) into each model's usual output folder.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+from .batch import RenderJob
+from .manifest import Manifest, hash_materials, hash_model
+from .obj_reader import read_obj
+
+logger = logging.getLogger(__name__)
+
+DEDUP_MODE = Literal["none", "file", "geometry"]
+STORE_NAME = ".store"
+
+# Positions, UVs and normals are compared on a grid this fine, relative to the
+# model's size, so files that differ in float formatting match.
+_GRID = 1e4
+
+
+def _quantize(values: np.ndarray | None, scale: float = 1.0) -> np.ndarray | None:
+    if values is None:
+        return None
+    return np.round(values * (_GRID / scale)).astype(np.int64)
+
+
+def geometry_hash(model_path: Path) -> str:
+    """Hash the geometry of an OBJ file as the viewers render it.
+
+    Positions are centered and scaled to the unit cube, like the viewers'
+    normalization, so copies that were moved or scaled as a whole match, as
+    do re-exports with other float formatting, comments or object names.
+    Faces, smoothing, UVs, normals, material assignments and the MTL files
+    with their textures must match.
+    """
+    data = read_obj(model_path)
+    vertices = data.vertices.astype(np.float64)
+    if len(vertices):
+        lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+        vertices = vertices - (lo + hi) / 2
+        size = float((hi - lo).max()) or 1.0
+    else:
+        size = 1.0
+
+    h = hashlib.sha256()
+    arrays = (
+        _quantize(vertices, size),
+        data.loop_vertices,
+        data.loop_starts,
+        data.face_smooth,
+        data.face_materials,
+        _quantize(data.uvs),
+        data.loop_uvs,
+        _quantize(data.normals),
+        data.loop_normals,
+    )
+    for array in arrays:
+        if array is None:
+            h.update(b"<none>")
+            continue
+        h.update(str(array.shape).encode())
+        h.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+    h.update("\n".join(data.material_names).encode())
+    hash_materials(model_path.parent, data.mtllibs, h)
+    return h.hexdigest()
+
+
+def _link(src: Path, dest: Path, copy: bool) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    dest.unlink(missing_ok=True)
+    if not copy:
+        try:
+            os.link(src, dest)
+            return
+        except OSError:
+            # E.g. the output folder spans several file systems.
+            pass
+    shutil.copy2(src, dest)
+
+
+class Deduplicator:
+    """Groups a batch's models by fingerprint and fills in the copies' outputs.
+
+    With the "none" mode every model is its own group, and nothing is
+    fingerprinted or linked.
+    """
+
+    def __init__(self, output_dir: Path, mode: DEDUP_MODE, copy: bool = False):
+        self.store_dir = output_dir / STORE_NAME
+        self.mode = mode
+        self.copy = copy
+        self.groups: dict[str, list[RenderJob]] = {}
+        self.saved_seconds = 0.0
+
+    def fingerprint(self, job: RenderJob, model_hashes: dict[str, str]) -> str:
+        if self.mode == "geometry":
+            return geometry_hash(job.model_path)
+        return model_hashes.get(job.key) or hash_model(job.model_path)
+
+    def group(
+        self, jobs: list[RenderJob], model_hashes: dict[str, str] | None = None
+    ) -> list[RenderJob]:
+        """One job per fingerprint, which renders into the store.
+
+        A store job keeps the key of the first model of its group.
+        `model_hashes` are file hashes already computed for some models.
+        Nothing is written until `clear_store`.
+        """
+        if self.mode == "none":
+            return jobs
+        start = time.perf_counter()
+        members: dict[str, list[RenderJob]] = {}
+        for job in jobs:
+            fingerprint = self.fingerprint(job, model_hashes or {})
+            members.setdefault(fingerprint, []).append(job)
+
+        unique = []
+        for fingerprint, group in members.items():
+            job = RenderJob(
+                group[0].model_path, self.store_dir / fingerprint, group[0].key
+            )
+            self.groups[job.key] = group
+            unique.append(job)
+        logger.info(
+            "dedup: %d models, %d unique by %s hash, fingerprinted in %.2fs",
+            len(jobs),
+            len(unique),
+            self.mode,
+            time.perf_counter() - start,
+        )
+        return unique
+
+    def clear_store(self, jobs: list[RenderJob]) -> None:
+        """Delete the store entries that `jobs` render into.
+
+        Renders then write fresh files, and the outputs linked from an earlier
+        render keep theirs.
+        """
+        if self.mode == "none":
+            return
+        for job in jobs:
+            shutil.rmtree(job.output_dir, ignore_errors=True)
+
+    def store_entry(self, job: RenderJob) -> str | None:
+        """The name of the store entry `job` renders into, if any."""
+        return None if self.mode == "none" else job.output_dir.name
+
+    def prune_store(self, manifests: list[Manifest]) -> None:
+        """Delete the store entries that no model in `manifests` links to.
+
+        Entries of deleted models and of models whose fingerprint changed are
+        left behind by renders otherwise.
+        """
+        if not self.store_dir.is_dir():
+            return
+        linked = {
+            entry.get("store")
+            for manifest in manifests
+            for entry in manifest.entries.values()
+        }
+        unused = [path for path in self.store_dir.iterdir() if path.name not in linked]
+        for path in unused:
+            shutil.rmtree(path)
+        if unused:
+            logger.info("dedup: pruned %d unused store entries", len(unused))
+
+    def members(self, job: RenderJob) -> list[RenderJob]:
+        """The models rendered by `job`."""
+        return self.groups.get(job.key, [job])
+
+    def fill(self, job: RenderJob, seconds: float) -> list[RenderJob]:
+        """Link the outputs of a store job into the output folder of each model.
+
+        Returns the models, and counts the render time saved on all but the
+        first.
+        """
+        members = self.members(job)
+        if self.mode == "none":
+            return members
+        outputs = [path for path in job.output_dir.rglob("*") if path.is_file()]
+        for member in members:
+            for path in outputs:
+                _link(
+                    path,
+                    member.output_dir / path.relative_to(job.output_dir),
+                    self.copy,
+                )
+        self.saved_seconds += seconds * (len(members) - 1)
+        return members
+
+    def log_summary(self) -> None:
+        if self.mode == "none":
+            return
+        num_models = sum(len(group) for group in self.groups.values())
+        logger.info(
+            "dedup: rendered %d unique models for %d models, saving about %.1fs of "
+            "rendering",
+            len(self.groups),
+            num_models,
+            self.saved_seconds,
+        )
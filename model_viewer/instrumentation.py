@@ -0,0 +1,225 @@
+import json
+import logging
+import re
+import resource
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+METRICS_NAME = "metrics.jsonl"
+
+# Memory figures in Blender's render stats, e.g. "Mem: 12.5M" or "Peak: 1.2G".
+_STATS_MEMORY = re.compile(r"(?:Mem|Peak):?\s*([\d.]+)([KMGT]?)")
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+# Shared by every disabled phase, so timing off costs one method call.
+_NO_PHASE = nullcontext()
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def parse_render_memory(stats: str) -> int:
+    """Largest memory figure in a Blender render stats line, in bytes."""
+    return max(
+        (
+            int(float(value) * _UNITS[unit])
+            for value, unit in _STATS_MEMORY.findall(stats)
+        ),
+        default=0,
+    )
+
+
+class Hooks:
+    """Instrumentation points called by the viewers.
+
+    This base class does nothing; `PhaseTimer` collects the measurements.
+    """
+
+    enabled = False
+
+    def begin_model(self, model_path: Path) -> None:
+        pass
+
+    def end_model(self) -> dict[str, Any] | None:
+        return None
+
+    def phase(self, name: str):
+        """Context manager timing one phase of the current model."""
+        return _NO_PHASE
+
+    def add(self, name: str, seconds: float) -> None:
+        """Record a phase timed elsewhere, e.g. by a Blender handler."""
+
+    def record(self, **fields: Any) -> None:
+        """Attach fields to the current model's record."""
+
+    def wrote(self, path: Path) -> None:
+        """Count the size of an output file."""
+
+    def render_stats(self, stats: str, *args: Any) -> None:
+        """Handler for `bpy.app.handlers.render_stats`."""
+
+
+class PhaseTimer(Hooks):
+    """Hooks building one metrics record per model.
+
+    A record holds the durations of every phase (a list, as phases such as
+    the turntable's "render" run once per frame), the fields passed to
+    `record`, the bytes written, the peak render memory reported by Blender
+    and the peak RSS of the process.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._record: dict[str, Any] | None = None
+        self._phases: dict[str, list[float]] = defaultdict(list)
+        self._start = 0.0
+        self._phase_start = 0.0
+        self._synced = True
+
+    def begin_model(self, model_path: Path) -> None:
+        self._record = {
+            "model": str(model_path),
+            "bytes_written": 0,
+            "render_memory": 0,
+        }
+        self._phases = defaultdict(list)
+        self._start = time.perf_counter()
+
+    def end_model(self) -> dict[str, Any] | None:
+        record = self._record
+        if record is None:
+            return None
+        self._record = None
+        record["total"] = time.perf_counter() - self._start
+        record["peak_rss"] = peak_rss()
+        record["phases"] = dict(self._phases)
+        return record
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self._phase_start = time.perf_counter()
+        self._synced = False
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        if self._record is not None:
+            self._phases[name].append(seconds)
+
+    def record(self, **fields: Any) -> None:
+        if self._record is not None:
+            self._record.update(fields)
+
+    def wrote(self, path: Path) -> None:
+        if self._record is not None and path.is_file():
+            self._record["bytes_written"] += path.stat().st_size
+
+    def render_stats(self, stats: str, *args: Any) -> None:
+        if self._record is None:
+            return
+        memory = parse_render_memory(stats)
+        self._record["render_memory"] = max(self._record["render_memory"], memory)
+        # Cycles reports "Sample" once the scene is synced to the device, so
+        # the time until then is the scene sync part of the render phase.
+        if not self._synced and "Sample" in stats:
+            self._synced = True
+            self.add("sync", time.perf_counter() - self._phase_start)
+
+
+class MetricsLog:
+    """Writes metrics records as JSON lines and keeps them for the summary.
+
+    With `append`, the records of an earlier run are kept in the file, but
+    only the new ones are summarized.
+    """
+
+    def __init__(self, path: Path, append: bool = False):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.records: list[dict[str, Any]] = []
+        self._file = open(path, "a" if append else "w")
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.records.append(record)
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def summarize(records: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """p50, p95 and max seconds of every phase, and of the whole model."""
+    samples: dict[str, list[float]] = defaultdict(list)
+    for record in records:
+        for name, durations in record["phases"].items():
+            samples[name].extend(durations)
+        samples["total"].append(record["total"])
+
+    summary = {}
+    for name, values in samples.items():
+        p50, p95 = np.percentile(values, [50, 95])
+        summary[name] = {
+            "count": len(values),
+            "p50": float(p50),
+            "p95": float(p95),
+            "max": float(max(values)),
+        }
+    return summary
+
+
+def merge_records(records: list[dict[str, Any]], total: float) -> dict[str, Any]:
+    """Combine the records of one model rendered in parts by several processes.
+
+    Phases and bytes add up, memory is the largest of any part, and `total`
+    is the wall time of all parts together.
+    """
+    phases: dict[str, list[float]] = defaultdict(list)
+    for record in records:
+        for name, durations in record["phases"].items():
+            phases[name].extend(durations)
+    return {
+        **records[0],
+        "phases": dict(phases),
+        "bytes_written": sum(r["bytes_written"] for r in records),
+        "render_memory": max(r["render_memory"] for r in records),
+        "peak_rss": max(r["peak_rss"] for r in records),
+        "total": total,
+        "parts": len(records),
+    }
+
+
+def log_phase_summary(records: list[dict[str, Any]]) -> None:
+    if not records:
+        return
+    logger.info("%-10s %7s %9s %9s %9s", "phase", "count", "p50 s", "p95 s", "max s")
+    for name, s in summarize(records).items():
+        logger.info(
+            "%-10s %7d %9.3f %9.3f %9.3f",
+            name,
+            s["count"],
+            s["p50"],
+            s["p95"],
+            s["max"],
+        )
+    logger.info(
+        "peak RSS %.0f MB, %.2f MB written",
+        max(r["peak_rss"] for r in records) / 2**20,
+        sum(r["bytes_written"] for r in records) / 2**20,
+    )
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from .manifest import Manifest
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+class Journal:
+    """Append-only record of the models a batch has finished.
+
+    The manifest is only written when a run ends, so a run that is killed or
+    loses its machine would start over. The journal gets one JSON line per
+    rendered or failed model, synced to disk before the next model starts. With
+    `resume`, the previous journal is read, and `start` appends to it instead
+    of starting a new one.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        self.resume = resume
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._file = None
+        if resume and path.is_file():
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line of a killed run may be cut off.
+                        continue
+                    self.entries[entry["key"]] = entry
+
+    def start(self) -> None:
+        """Open the journal for the models of this run."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a" if self.resume else "w")
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        self.entries[entry["key"]] = entry
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(
+        self,
+        key: str,
+        model_hash: str,
+        config_hash: str,
+        model_output_dir: Path,
+        seconds: float,
+        *,
+        store: str | None = None,
+    ) -> None:
+        """Record a rendered model, like `Manifest.record`."""
+        self._write(
+            {
+                "key": key,
+                "status": "done",
+                "model_hash": model_hash,
+                "config_hash": config_hash,
+                "output_dir": model_output_dir.relative_to(self.path.parent).as_posix(),
+                "seconds": seconds,
+                "store": store,
+            }
+        )
+
+    def record_failure(self, key: str, error: str, config_hash: str) -> None:
+        self._write(
+            {"key": key, "status": "failed", "config_hash": config_hash, "error": error}
+        )
+
+    def finished(self, config_hash: str) -> dict[str, dict[str, Any]]:
+        """Entries of the models finished with the config `config_hash`."""
+        return {
+            key: entry
+            for key, entry in self.entries.items()
+            if entry["config_hash"] == config_hash
+        }
+
+    def replay(self, manifest: Manifest, config_hash: str) -> set[str]:
+        """Copy the models finished with `config_hash` into `manifest`.
+
+        Returns their keys, which a resumed run skips. Failed models are
+        skipped too, as a crash would likely repeat; the next run without
+        `--resume` retries them.
+        """
+        finished = self.finished(config_hash)
+        for key, entry in finished.items():
+            if entry["status"] == "done":
+                manifest.record(
+                    key,
+                    entry["model_hash"],
+                    config_hash,
+                    manifest.output_dir / entry["output_dir"],
+                    entry["seconds"],
+                    store=entry.get("store"),
+                )
+            else:
+                manifest.record_failure(key, entry["error"])
+        return set(finished)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
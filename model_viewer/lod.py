@@ -0,0 +1,176 @@
+"""Triangle budgets for preview renders.
+
+Models over the budget are simplified by vertex clustering: the normalized
+model is overlaid with a grid of cubic cells, the vertices in each cell are
+merged into one, and triangles that lose a corner are dropped. It runs in a
+few vectorized passes, so it stays cheap next to rendering the full model,
+unlike edge collapse. The grid is placed in the normalized unit cube, so the
+same budget gives every model the same detail relative to its size.
+"""
+
+import json
+import math
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+from .sinks import LOD_NAME
+from .utils import ATTRIBUTE_LAYOUT, foreach_get
+
+# Grid refinements tried to get close to the budget.
+_MAX_STEPS = 8
+
+
+def triangle_count(mesh: bpy.types.Mesh) -> int:
+    """Triangles of the mesh once its faces are triangulated."""
+    sizes = foreach_get(mesh.polygons, "loop_total", np.int32)
+    return int(sizes.sum()) - 2 * len(sizes)
+
+
+def triangle_budget(
+    max_triangles: int, triangles_per_pixel: float, width: int, height: int
+) -> int:
+    """Triangle budget of a model rendered at `width` x `height`, 0 for none.
+
+    With both limits set, the lower one applies.
+    """
+    budgets = []
+    if max_triangles > 0:
+        budgets.append(max_triangles)
+    if triangles_per_pixel > 0:
+        budgets.append(max(1, int(triangles_per_pixel * width * height)))
+    return min(budgets, default=0)
+
+
+def _cluster(
+    points: np.ndarray, triangles: np.ndarray, cells: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge the vertices in each cell of a grid with `cells` cells per side.
+
+    Returns the cluster of every vertex and the triangles that keep three
+    distinct clusters, with one triangle for each set of three clusters.
+    """
+    lo = points.min(axis=0)
+    size = max(float((points.max(axis=0) - lo).max()), 1e-12)
+    cell = np.minimum(((points - lo) * (cells / size)).astype(np.int64), cells - 1)
+    keys = (cell[:, 0] * cells + cell[:, 1]) * cells + cell[:, 2]
+    _, clusters = np.unique(keys, return_inverse=True)
+
+    corners = clusters[triangles]
+    a, b, c = corners.T
+    distinct = np.flatnonzero((a != b) & (b != c) & (a != c))
+    _, first = np.unique(np.sort(corners[distinct], axis=1), axis=0, return_index=True)
+    return clusters, distinct[np.sort(first)]
+
+
+def _surface_area(points: np.ndarray, triangles: np.ndarray) -> float:
+    a, b, c = (points[triangles[:, i]] for i in range(3))
+    return float(np.linalg.norm(np.cross(b - a, c - a), axis=1).sum() / 2)
+
+
+def decimate(obj: bpy.types.Object, budget: int) -> None:
+    """Simplify the object's mesh to at most `budget` triangles.
+
+    The mesh is replaced by a triangulated copy, keeping face attributes such
+    as materials and smooth shading and corner attributes such as UVs. Custom
+    normals are dropped. The object matrix is kept, so a normalized model
+    keeps its framing.
+    """
+    mesh = obj.data
+    local = foreach_get(mesh.vertices, "co", np.float64, 3)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    points = local @ matrix[:3, :3].T + matrix[:3, 3]
+    mesh.calc_loop_triangles()
+    tri_corners = foreach_get(mesh.loop_triangles, "loops", np.int32, 3)
+    tri_faces = foreach_get(mesh.loop_triangles, "polygon_index", np.int32)
+    corner_verts = foreach_get(mesh.loops, "vertex_index", np.int32)
+    triangles = corner_verts[tri_corners]
+
+    # A surface of area A crosses about A * cells^2 cells of a unit grid,
+    # with two triangles each.
+    area = max(_surface_area(points, triangles), 1e-12)
+    cells = max(1, int(math.sqrt(budget / (2 * area))))
+    best = None
+    for _ in range(_MAX_STEPS):
+        clusters, kept = _cluster(points, triangles, cells)
+        if len(kept) <= budget and (best is None or len(kept) > len(best[1])):
+            best = clusters, kept
+        step = math.sqrt(budget / max(len(kept), 1)) * 0.97
+        next_cells = max(1, int(cells * step))
+        if 0.9 * budget <= len(kept) <= budget or next_cells == cells:
+            break
+        cells = next_cells
+    if best is None or len(best[1]) == 0:
+        return
+    clusters, kept = best
+
+    used, corner_clusters = np.unique(clusters[triangles[kept]], return_inverse=True)
+    counts = np.bincount(clusters)
+    centers = np.stack(
+        [np.bincount(clusters, weights=local[:, i]) / counts for i in range(3)],
+        axis=1,
+    )
+
+    reduced = bpy.data.meshes.new(mesh.name)
+    reduced.vertices.add(len(used))
+    reduced.loops.add(3 * len(kept))
+    reduced.polygons.add(len(kept))
+    reduced.attributes["position"].data.foreach_set(
+        "vector", centers[used].astype(np.float32).ravel()
+    )
+    reduced.attributes[".corner_vert"].data.foreach_set(
+        "value", corner_clusters.astype(np.int32).ravel()
+    )
+    reduced.polygons.foreach_set(
+        "loop_start", np.arange(0, 3 * len(kept), 3, dtype=np.int32)
+    )
+    _copy_attributes(mesh, reduced, tri_faces[kept], tri_corners[kept].ravel())
+    reduced.update(calc_edges=True)
+
+    for material in mesh.materials:
+        reduced.materials.append(material)
+    obj.data = reduced
+    name = mesh.name
+    bpy.data.meshes.remove(mesh)
+    reduced.name = name
+
+
+def _copy_attributes(
+    mesh: bpy.types.Mesh,
+    reduced: bpy.types.Mesh,
+    faces: np.ndarray,
+    corners: np.ndarray,
+) -> None:
+    """Copy face and corner attributes to the faces and corners they became."""
+    sources = {"FACE": faces, "CORNER": corners}
+    for attribute in mesh.attributes:
+        layout = ATTRIBUTE_LAYOUT.get(attribute.data_type)
+        source = sources.get(attribute.domain)
+        # Custom normals would no longer fit the merged vertices.
+        skip = attribute.name.startswith(".") or attribute.name == "custom_normal"
+        if layout is None or source is None or skip:
+            continue
+        values = foreach_get(attribute.data, *layout)[source]
+        target = reduced.attributes.get(attribute.name) or reduced.attributes.new(
+            attribute.name, attribute.data_type, attribute.domain
+        )
+        target.data.foreach_set(layout[0], np.ascontiguousarray(values).ravel())
+
+
+def write_lod_metadata(
+    output_dir: Path, triangles: int, rendered_triangles: int, budget: int
+) -> Path:
+    """Save the triangle counts of the model as imported and as rendered."""
+    path = output_dir / LOD_NAME
+    path.write_text(
+        json.dumps(
+            {
+                "triangles": triangles,
+                "rendered_triangles": rendered_triangles,
+                "budget": budget,
+            },
+            indent=2,
+        )
+    )
+    return path
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+from typing import Any
+
+MANIFEST_NAME = "manifest.json"
+
+_CHUNK_SIZE = 1 << 20
+_MTLLIB_RE = re.compile(rb"^mtllib[ \t]+(.+?)[ \t]*\r?$", re.MULTILINE)
+_MTL_MAP_RE = re.compile(
+    rb"^[ \t]*(?:map_\w+|bump|disp|decal|refl|norm)[ \t]+(.+?)[ \t]*\r?$",
+    re.MULTILINE,
+)
+
+
+def _hash_file(path: Path, h: "hashlib._Hash") -> None:
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            h.update(chunk)
+
+
+def _mtllib_names(model_path: Path, h: "hashlib._Hash") -> list[str]:
+    """Hash the OBJ file and collect its `mtllib` references in the same pass."""
+    names = []
+    tail = b""
+    with open(model_path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            h.update(chunk)
+            data = tail + chunk
+            end = data.rfind(b"\n") + 1
+            # The regex is slow on large files, most chunks have no mtllib.
+            if b"mtllib" in data:
+                names += [m.group(1) for m in _MTLLIB_RE.finditer(data, 0, end)]
+            tail = data[end:]
+    names += [m.group(1) for m in _MTLLIB_RE.finditer(tail)]
+    # `mtllib` may list several files separated by spaces.
+    return [name.decode() for line in names for name in line.split()]
+
+
+def hash_model(model_path: Path) -> str:
+    """Hash an OBJ file together with its MTL files and their textures."""
+    h = hashlib.sha256()
+    mtl_names = _mtllib_names(model_path, h)
+    hash_materials(model_path.parent, mtl_names, h)
+    return h.hexdigest()
+
+
+def hash_materials(model_dir: Path, mtl_names: list[str], h: "hashlib._Hash") -> None:
+    """Hash the MTL files of a model and their textures into `h`."""
+    for mtl_name in mtl_names:
+        mtl_path = model_dir / mtl_name
+        h.update(mtl_name.encode())
+        if not mtl_path.is_file():
+            h.update(b"<missing>")
+            continue
+
+        mtl_data = mtl_path.read_bytes()
+        h.update(mtl_data)
+        for m in _MTL_MAP_RE.finditer(mtl_data):
+            # Texture options come first, the file name is the last token.
+            texture_name = m.group(1).split()[-1].decode()
+            texture_path = mtl_path.parent / texture_name
+            h.update(texture_name.encode())
+            if texture_path.is_file():
+                _hash_file(texture_path, h)
+            else:
+                h.update(b"<missing>")
+
+
+# Config fields that change how a model is rendered, not what is written, so
+# changing them does not make earlier renders stale.
+RUNTIME_FIELDS = frozenset({"threads", "writer_threads", "orphan_purge_interval"})
+
+
+def _output_fields(value: Any) -> Any:
+    """`value` without `RUNTIME_FIELDS`, in nested configs as well."""
+    if isinstance(value, dict):
+        return {
+            k: _output_fields(v) for k, v in value.items() if k not in RUNTIME_FIELDS
+        }
+    if isinstance(value, list):
+        return [_output_fields(v) for v in value]
+    return value
+
+
+def hash_config(config: dict[str, Any]) -> str:
+    """Hash a render configuration, independent of key order and of the
+    `RUNTIME_FIELDS`."""
+    data = json.dumps(_output_fields(config), sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class Manifest:
+    """Record of the models rendered into an output directory.
+
+    Each entry is keyed by the model path relative to the input folder and
+    stores the model and config hashes it was rendered with and how long it
+    took. Models that failed to render are kept apart with their error.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        entries: dict[str, dict] | None = None,
+        failures: dict[str, str] | None = None,
+        name: str = MANIFEST_NAME,
+    ):
+        self.output_dir = output_dir
+        self.entries = entries if entries is not None else {}
+        self.failures = failures if failures is not None else {}
+        self.name = name
+
+    @property
+    def path(self) -> Path:
+        return self.output_dir / self.name
+
+    @classmethod
+    def load(cls, output_dir: Path, name: str = MANIFEST_NAME) -> "Manifest":
+        path = output_dir / name
+        if not path.is_file():
+            return cls(output_dir, name=name)
+        with open(path) as f:
+            data = json.load(f)
+        return cls(output_dir, data["models"], data.get("failures", {}), name)
+
+    def save(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"models": self.entries, "failures": self.failures},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        tmp_path.replace(self.path)
+
+    def is_up_to_date(
+        self,
+        key: str,
+        model_hash: str,
+        config_hash: str,
+        outputs: list[Path],
+    ) -> bool:
+        """Whether `key` was rendered from the same inputs and its outputs exist."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        if entry["model_hash"] != model_hash or entry["config_hash"] != config_hash:
+            return False
+        return all(path.is_file() for path in outputs)
+
+    def record(
+        self,
+        key: str,
+        model_hash: str,
+        config_hash: str,
+        model_output_dir: Path,
+        seconds: float | None = None,
+        *,
+        store: str | None = None,
+    ) -> None:
+        """Record a rendered model, with the `--dedup` store entry it links to."""
+        self.failures.pop(key, None)
+        self.entries[key] = {
+            "model_hash": model_hash,
+            "config_hash": config_hash,
+            "output_dir": model_output_dir.relative_to(self.output_dir).as_posix(),
+            "seconds": seconds,
+            "store": store,
+        }
+
+    def record_failure(self, key: str, error: str) -> None:
+        self.entries.pop(key, None)
+        self.failures[key] = error
+
+    def stale_keys(self, current_keys: set[str]) -> list[str]:
+        """Entries whose model is no longer part of the input."""
+        return sorted(key for key in self.entries if key not in current_keys)
+
+    def prune(self, keys: list[str]) -> None:
+        """Delete the outputs of `keys` and drop them from the manifest."""
+        for key in keys:
+            entry = self.entries.pop(key)
+            model_output_dir = self.output_dir / entry["output_dir"]
+            if model_output_dir == self.output_dir or not model_output_dir.is_dir():
+                continue
+            shutil.rmtree(model_output_dir)
+            # Drop the folders that only held this model's outputs.
+            for parent in model_output_dir.parents:
+                if parent == self.output_dir or any(parent.iterdir()):
+                    break
+                parent.rmdir()
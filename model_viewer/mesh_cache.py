@@ -0,0 +1,331 @@
+"""Binary cache of imported and normalized meshes.
+
+An entry is a directory with one .npy file per mesh attribute (positions,
+edges, corners, UVs, custom normals, material indices...) plus the face starts,
+the model's materials in `materials.blend`, and
+`mesh.json` with the object matrix and material slots. Entries are keyed by
+the hash of the model's files and the import settings, so a moved or copied
+model still finds its entry. Loading an entry memory-maps the arrays and hands
+them to Blender's bulk `foreach_set`, without reading the OBJ.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import bpy
+import numpy as np
+from mathutils import Matrix
+
+from .fast_import import add_to_scene
+from .manifest import hash_model
+from .utils import ATTRIBUTE_LAYOUT, foreach_get
+
+logger = logging.getLogger(__name__)
+
+# Part of every key, so entries written by another layout are never read.
+CACHE_VERSION = 1
+ENTRY_META = "mesh.json"
+ENTRY_MATERIALS = "materials.blend"
+_TMP_PREFIX = "tmp-"
+
+# Internal attributes holding the topology, which are stored like the generic
+# ones. Other internal attributes, such as the selection, are left out.
+_TOPOLOGY = (".edge_verts", ".corner_vert", ".corner_edge")
+
+
+def _images(materials) -> list[bpy.types.Image]:
+    return [
+        node.image
+        for material in materials
+        if material.node_tree is not None
+        for node in material.node_tree.nodes
+        if node.type == "TEX_IMAGE" and node.image is not None
+    ]
+
+
+def _save_materials(entry_dir: Path, materials: list, model_dir: Path) -> dict:
+    """Write the materials to a .blend library.
+
+    Returns the path of every texture relative to `model_dir` where possible,
+    so a copy of the model in another folder finds its own textures.
+    """
+    bpy.data.libraries.write(str(entry_dir / ENTRY_MATERIALS), set(materials))
+    textures = {}
+    for image in _images(materials):
+        path = Path(bpy.path.abspath(image.filepath))
+        if path.is_relative_to(model_dir):
+            path = path.relative_to(model_dir)
+        textures[image.filepath] = str(path)
+    return textures
+
+
+def _load_materials(entry_dir: Path, meta: dict[str, Any], model_dir: Path) -> list:
+    """Append the materials of an entry, pointing their textures at `model_dir`."""
+    libraries = set(bpy.data.libraries)
+    with bpy.data.libraries.load(str(entry_dir / ENTRY_MATERIALS), link=False) as (
+        _,
+        loaded,
+    ):
+        loaded.materials = meta["materials"]
+    # Appended datablocks are local copies, the library itself is not needed.
+    bpy.data.batch_remove([lib for lib in bpy.data.libraries if lib not in libraries])
+    for image in _images(loaded.materials):
+        texture = meta["textures"].get(image.filepath)
+        if texture is not None:
+            image.filepath = str(model_dir / texture)
+    return loaded.materials
+
+
+def save_mesh(entry_dir: Path, obj: bpy.types.Object, model_dir: Path) -> None:
+    """Write the mesh, matrix and materials of `obj` to `entry_dir`."""
+    mesh = obj.data
+    entry_dir.mkdir(parents=True)
+    # Attributes are read and written in bulk, while the RNA collections such
+    # as `mesh.loops` go through every item.
+    arrays = {"face_starts": foreach_get(mesh.polygons, "loop_start", np.int32)}
+    attributes = []
+    for attribute in mesh.attributes:
+        layout = ATTRIBUTE_LAYOUT.get(attribute.data_type)
+        internal = attribute.name.startswith(".") and attribute.name not in _TOPOLOGY
+        if internal or layout is None:
+            continue
+        file_name = f"attribute_{len(attributes)}"
+        # Flat, as foreach_set takes it when the entry is loaded.
+        arrays[file_name] = foreach_get(attribute.data, *layout).ravel()
+        attributes.append(
+            {
+                "name": attribute.name,
+                "data_type": attribute.data_type,
+                "domain": attribute.domain,
+                "file": file_name,
+            }
+        )
+    for name, values in arrays.items():
+        np.save(entry_dir / f"{name}.npy", values)
+
+    # Each material once, and the slots as indices into that list.
+    materials = list(dict.fromkeys(m for m in mesh.materials if m is not None))
+    textures = _save_materials(entry_dir, materials, model_dir) if materials else {}
+    meta = {
+        "name": obj.name,
+        "mesh_name": mesh.name,
+        "counts": [
+            len(mesh.vertices),
+            len(mesh.edges),
+            len(mesh.loops),
+            len(mesh.polygons),
+        ],
+        "matrix_world": [list(row) for row in obj.matrix_world],
+        "attributes": attributes,
+        "uv_active": mesh.uv_layers.active.name if mesh.uv_layers.active else None,
+        "materials": [m.name for m in materials],
+        "slots": [
+            materials.index(m) if m is not None else None for m in mesh.materials
+        ],
+        "textures": textures,
+    }
+    with open(entry_dir / ENTRY_META, "w") as f:
+        json.dump(meta, f)
+
+
+def load_mesh(
+    entry_dir: Path, model_dir: Path, scene: bpy.types.Scene | None = None
+) -> bpy.types.Object:
+    """Build the object saved in `entry_dir` and link it to the scene, the
+    active one by default."""
+    with open(entry_dir / ENTRY_META) as f:
+        meta = json.load(f)
+    # Read-only memory maps, viewed as plain arrays: foreach_set only takes its
+    # bulk path for exact ndarrays, and reads np.memmap item by item.
+    arrays = {
+        path.stem: np.asarray(np.load(path, mmap_mode="r"))
+        for path in entry_dir.glob("*.npy")
+    }
+
+    mesh = bpy.data.meshes.new(meta["mesh_name"])
+    num_vertices, num_edges, num_corners, num_faces = meta["counts"]
+    mesh.vertices.add(num_vertices)
+    mesh.edges.add(num_edges)
+    mesh.loops.add(num_corners)
+    mesh.polygons.add(num_faces)
+    mesh.polygons.foreach_set("loop_start", arrays["face_starts"])
+
+    # Positions and topology exist once the elements are added.
+    for attribute in meta["attributes"]:
+        data_type = attribute["data_type"]
+        prop = ATTRIBUTE_LAYOUT[data_type][0]
+        target = mesh.attributes.get(attribute["name"])
+        if target is None:
+            target = mesh.attributes.new(
+                attribute["name"], data_type, attribute["domain"]
+            )
+        target.data.foreach_set(prop, arrays[attribute["file"]])
+    if meta["uv_active"] is not None:
+        mesh.uv_layers.active = mesh.uv_layers[meta["uv_active"]]
+    mesh.update()
+
+    materials = _load_materials(entry_dir, meta, model_dir) if meta["materials"] else []
+    for index in meta["slots"]:
+        mesh.materials.append(materials[index] if index is not None else None)
+
+    obj = bpy.data.objects.new(meta["name"], mesh)
+    obj.matrix_world = Matrix(meta["matrix_world"])
+    add_to_scene(obj, scene)
+    return obj
+
+
+@dataclass
+class CacheStats:
+    """Hits and misses of a mesh cache, and the time spent on each."""
+
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    hit_seconds: float = 0.0
+    """Time spent loading entries."""
+    miss_seconds: float = 0.0
+    """Time spent importing and normalizing the models that missed."""
+
+    @classmethod
+    def from_records(cls, records: list[dict[str, Any]]) -> "CacheStats":
+        """Hits and misses of the metrics records of a run, e.g. from workers."""
+        stats = cls()
+        for record in records:
+            phases = record["phases"]
+            if record.get("mesh_cache") == "hit":
+                stats.hits += 1
+                stats.hit_seconds += sum(phases.get("cache", []))
+            elif record.get("mesh_cache") == "miss":
+                stats.misses += 1
+                stats.miss_seconds += sum(phases.get("import", []))
+                stats.miss_seconds += sum(phases.get("normalize", []))
+        return stats
+
+
+class MeshCache:
+    """Imported meshes stored under `path`, at most `max_bytes` in total.
+
+    When storing an entry pushes the cache over its size, the least recently
+    used entries are deleted. Every process sharing the directory keeps its
+    own view of the entries, scanned when the cache is opened; an entry that
+    another process evicted is a miss and is stored again.
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        path.mkdir(parents=True, exist_ok=True)
+        # Size of each entry, from the least to the most recently used.
+        self.entries: dict[str, int] = {}
+        found = [
+            (entry.stat().st_mtime, entry.name)
+            for entry in os.scandir(path)
+            if entry.is_dir() and not entry.name.startswith(_TMP_PREFIX)
+        ]
+        for _, key in sorted(found):
+            self.entries[key] = _dir_size(path / key)
+
+    @property
+    def size(self) -> int:
+        return sum(self.entries.values())
+
+    @staticmethod
+    def key(model_path: Path, settings: dict[str, Any]) -> str:
+        """Key of a model imported with `settings`, such as the axes."""
+        data = json.dumps(
+            {"model": hash_model(model_path), "version": CACHE_VERSION, **settings},
+            sort_keys=True,
+        )
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def load(
+        self, key: str, model_path: Path, scene: bpy.types.Scene | None = None
+    ) -> bpy.types.Object | None:
+        """Build the cached object in `scene`, or return None on a miss."""
+        entry_dir = self.path / key
+        if not (entry_dir / ENTRY_META).is_file():
+            self.stats.misses += 1
+            return None
+        start = time.perf_counter()
+        try:
+            obj = load_mesh(entry_dir, model_path.parent, scene)
+        except (OSError, ValueError, KeyError) as e:
+            # Anything already built is removed with the model's datablocks.
+            logger.warning("dropping unreadable mesh cache entry %s: %s", key, e)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self.entries.pop(key, None)
+            self.stats.misses += 1
+            return None
+        # The directory's modification time orders the entries by last use.
+        os.utime(entry_dir)
+        self.entries.pop(key, None)
+        self.entries[key] = _dir_size(entry_dir)
+        self.stats.hits += 1
+        self.stats.hit_seconds += time.perf_counter() - start
+        return obj
+
+    def store(
+        self, key: str, obj: bpy.types.Object, model_path: Path, seconds: float
+    ) -> None:
+        """Add an object that missed, which took `seconds` to import."""
+        self.stats.miss_seconds += seconds
+        # Write to a temporary directory and rename it, so other processes
+        # never see half an entry.
+        tmp_dir = self.path / f"{_TMP_PREFIX}{os.getpid()}-{key}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        try:
+            save_mesh(tmp_dir, obj, model_path.parent)
+        except (OSError, RuntimeError) as e:
+            # A full disk should not fail the render.
+            logger.warning("could not cache the mesh of %s: %s", model_path, e)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        try:
+            tmp_dir.rename(self.path / key)
+        except OSError:
+            # Another process stored the same model first.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.entries[key] = _dir_size(self.path / key)
+        self.stats.stored += 1
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the cache fits its size."""
+        total = self.size
+        while total > self.max_bytes and self.entries:
+            key = next(iter(self.entries))
+            total -= self.entries.pop(key)
+            shutil.rmtree(self.path / key, ignore_errors=True)
+            self.stats.evicted += 1
+
+    def log_summary(self, stats: CacheStats | None = None) -> None:
+        """Log the hits and misses of this process, or `stats` if given."""
+        stats = stats or self.stats
+        hit_time = stats.hit_seconds / stats.hits if stats.hits else 0.0
+        miss_time = stats.miss_seconds / stats.misses if stats.misses else 0.0
+        logger.info(
+            "mesh cache: %d hits (%.3fs each), %d misses (%.3fs import each), "
+            "%d stored, %d evicted, %d entries of %.1f MB",
+            stats.hits,
+            hit_time,
+            stats.misses,
+            miss_time,
+            stats.stored,
+            stats.evicted,
+            len(self.entries),
+            self.size / 1e6,
+        )
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in os.scandir(path))
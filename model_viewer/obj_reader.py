@@ -0,0 +1,417 @@
+"""Vectorized OBJ reader that builds Blender meshes through bulk array APIs.
+
+The file is memory-mapped and parsed in newline-aligned chunks. Each chunk is
+classified line by line with NumPy, and the numbers of all lines of one kind
+are parsed in a single call, so there is no Python work per vertex or face.
+"""
+
+import mmap
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+CHUNK_SIZE = 64 << 20
+# Faces with fewer corners are dropped.
+MIN_FACE_SIZE = 3
+# Up to this face size, repeated corners are found by shifted comparisons
+# rather than by sorting all corners.
+_MAX_SHIFTED_FACE = 8
+
+_SPACE, _TAB, _CR, _LF, _SLASH = (ord(c) for c in " \t\r\n/")
+# Where the texture and normal indices sit in a face corner `v/vt/vn`.
+_UV_PART, _NORMAL_PART = 1, 2
+
+
+@dataclass
+class ObjData:
+    """Geometry of an OBJ file as flat arrays, with 0-based indices."""
+
+    vertices: np.ndarray
+    """(num_vertices, 3) float32 positions."""
+    loop_vertices: np.ndarray
+    """(num_loops,) vertex index of every face corner."""
+    loop_starts: np.ndarray
+    """(num_faces,) index of the first corner of every face."""
+    face_smooth: np.ndarray
+    """(num_faces,) smoothing group state of every face."""
+    face_materials: np.ndarray
+    """(num_faces,) index into `material_names` of every face."""
+    material_names: list[str] = field(default_factory=list)
+    mtllibs: list[str] = field(default_factory=list)
+    uvs: np.ndarray | None = None
+    """(num_uvs, 2) float32 texture coordinates."""
+    loop_uvs: np.ndarray | None = None
+    normals: np.ndarray | None = None
+    """(num_normals, 3) float32 normals."""
+    loop_normals: np.ndarray | None = None
+
+
+def _is_space(buf: np.ndarray) -> np.ndarray:
+    # Spaces, tabs and line breaks, in one comparison as every byte of a
+    # number or index is above them.
+    return buf <= _SPACE
+
+
+def _gather(
+    buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, skip: int
+) -> np.ndarray:
+    """Concatenate the given lines, with their first `skip` bytes blanked out.
+
+    Every line keeps its terminating newline, so the result has exactly one
+    newline per line.
+    """
+    # Lines of one kind mostly come in long runs (all `v`, then all `f`), so
+    # whole runs are copied at once.
+    breaks = np.flatnonzero(starts[1:] != ends[:-1] + 1) + 1
+    run_first = np.concatenate([[0], breaks])
+    run_last = np.concatenate([breaks, [len(starts)]]) - 1
+    if len(run_first) > max(64, len(starts) // 16):
+        return _gather_scattered(buf, starts, ends, skip)
+
+    pieces = [buf[starts[a] : ends[b] + 1] for a, b in zip(run_first, run_last)]
+    if ends[-1] == len(buf):
+        # The last line of the file has no newline to keep.
+        pieces.append(np.array([_LF], dtype=np.uint8))
+    out = np.concatenate(pieces)
+
+    # Where each run, and so each of its lines, starts in the output.
+    run_ends = np.cumsum([len(p) for p in pieces[: len(run_first)]])
+    run_shift = starts[run_first] - np.concatenate([[0], run_ends[:-1]])
+    positions = starts - np.repeat(run_shift, run_last - run_first + 1)
+    for k in range(skip):
+        out[positions + k] = _SPACE
+    return out
+
+
+def _gather_scattered(
+    buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, skip: int
+) -> np.ndarray:
+    mark = np.zeros(len(buf) + 2, dtype=np.int8)
+    mark[starts + skip] += 1
+    mark[ends + 1] -= 1
+    out = buf[np.cumsum(mark[: len(buf)], dtype=np.int8) > 0]
+    if ends[-1] == len(buf):
+        out = np.append(out, np.uint8(_LF))
+    return out
+
+
+def _tokens_per_line(text: np.ndarray) -> np.ndarray:
+    """Number of tokens on every line of newline-terminated `text`."""
+    space = _is_space(text)
+    token_starts = np.flatnonzero(space[:-1] & ~space[1:]) + 1
+    if len(text) and not space[0]:
+        token_starts = np.concatenate([[0], token_starts])
+    # Tokens before each line's end, counted by bisecting the few token and
+    # line positions instead of running a sum over every byte.
+    before = np.searchsorted(token_starts, np.flatnonzero(text == _LF))
+    return np.diff(before, prepend=0)
+
+
+def _parse_floats(text: np.ndarray, num_lines: int, width: int) -> np.ndarray:
+    """Parse the first `width` numbers of every line."""
+    values = np.fromstring(text.tobytes(), dtype=np.float64, sep=" ")
+    if len(values) == num_lines * width:
+        return values.reshape(-1, width).astype(np.float32)
+
+    # Lines with extra values, e.g. vertex colors or a w component.
+    counts = _tokens_per_line(text)
+    if (counts < width).any():
+        raise ValueError(f"expected at least {width} values per line")
+    offsets = np.cumsum(counts) - counts
+    return values[offsets[:, None] + np.arange(width)].astype(np.float32)
+
+
+def _line_values(
+    buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, skip: int
+) -> np.ndarray:
+    """The rest of every line after its first `skip` bytes, stripped, as bytes."""
+    if not len(starts):
+        return np.array([], dtype=bytes)
+    text = _gather(buf, starts, ends, skip)
+    return np.char.strip(np.array(text.tobytes().split(b"\n")[:-1]))
+
+
+def _keyword_lines(
+    buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, keyword: bytes
+) -> tuple[np.ndarray, np.ndarray]:
+    """Lines that start with `keyword` and a space or tab, and their values."""
+    width = len(keyword)
+    candidates = np.flatnonzero(buf[starts] == keyword[0])
+    offsets = starts[candidates, None] + np.arange(width + 1)
+    head = buf[np.minimum(offsets, len(buf) - 1)]
+    match = (head[:, :width] == np.frombuffer(keyword, dtype=np.uint8)).all(axis=1)
+    match &= (head[:, width] == _SPACE) | (head[:, width] == _TAB)
+    lines = candidates[match]
+    return lines, _line_values(buf, starts[lines], ends[lines], width)
+
+
+def _face_layout(text: np.ndarray) -> tuple[bool, bool]:
+    """Whether face corners carry texture and normal indices (`v/vt/vn`)."""
+    first = text[: np.argmax(text == _LF)].tobytes().split()[0]
+    parts = first.split(b"/")
+    has_uv = len(parts) > _UV_PART and parts[_UV_PART] != b""
+    has_normal = len(parts) > _NORMAL_PART and parts[_NORMAL_PART] != b""
+    return has_uv, has_normal
+
+
+def _state_per_face(
+    face_lines: np.ndarray,
+    state_lines: np.ndarray,
+    state_values: np.ndarray,
+    carry: int,
+) -> np.ndarray:
+    """Value of the last state line (`s`, `usemtl`) before every face."""
+    idx = np.searchsorted(state_lines, face_lines, side="right") - 1
+    values = np.concatenate([[carry], state_values])
+    return values[idx + 1]
+
+
+def _repeated_corners(
+    loop_vertices: np.ndarray, faces: np.ndarray, max_face_size: int
+) -> np.ndarray:
+    """Mask of the corners that repeat an earlier vertex of the same face."""
+    repeated = np.zeros(len(loop_vertices), dtype=bool)
+    if max_face_size <= _MAX_SHIFTED_FACE:
+        # Compare every corner with the ones up to a face size before it.
+        for shift in range(1, max_face_size):
+            repeated[shift:] |= (loop_vertices[shift:] == loop_vertices[:-shift]) & (
+                faces[shift:] == faces[:-shift]
+            )
+        return repeated
+    # The stable sort keeps the first corner of every vertex in a face first.
+    order = np.lexsort((loop_vertices, faces))
+    same = (np.diff(faces[order]) == 0) & (np.diff(loop_vertices[order]) == 0)
+    repeated[order[1:][same]] = True
+    return repeated
+
+
+class _Reader:
+    def __init__(self):
+        self.num_vertices = 0
+        self.num_uvs = 0
+        self.num_normals = 0
+        self.layout: tuple[bool, bool] | None = None
+        self.smooth = 0
+        self.material = -1
+        self.material_names: list[str] = []
+        self.material_indices: dict[bytes, int] = {}
+        self.mtllibs: list[str] = []
+        self.parts: dict[str, list[np.ndarray]] = {
+            key: []
+            for key in (
+                "vertices",
+                "uvs",
+                "normals",
+                "loop_vertices",
+                "loop_uvs",
+                "loop_normals",
+                "face_sizes",
+                "face_smooth",
+                "face_materials",
+            )
+        }
+
+    def _resolve(
+        self, indices: np.ndarray, counts_at_loops: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        """Turn 1-based, possibly negative (relative) OBJ indices into 0-based ones.
+
+        `counts_at_loops` returns the elements defined before each loop, and is
+        only called for files with relative indices.
+        """
+        if not (indices < 0).any():
+            return indices - 1
+        return np.where(indices < 0, counts_at_loops() + indices, indices - 1)
+
+    def read_chunk(self, buf: np.ndarray) -> None:
+        n = len(buf)
+        newlines = np.flatnonzero(buf == _LF)
+        starts = np.concatenate([[0], newlines + 1])
+        ends = np.concatenate([newlines, [n]])
+        if starts[-1] == n:
+            starts, ends = starts[:-1], ends[:-1]
+
+        c0 = buf[starts]
+        c1 = buf[np.minimum(starts + 1, n - 1)]
+        c1_space = (c1 == _SPACE) | (c1 == _TAB)
+        is_v = (c0 == ord("v")) & c1_space
+        is_vt = (c0 == ord("v")) & (c1 == ord("t"))
+        is_vn = (c0 == ord("v")) & (c1 == ord("n"))
+        is_f = (c0 == ord("f")) & c1_space
+        is_s = (c0 == ord("s")) & c1_space
+
+        parts = self.parts
+        num_v = int(is_v.sum())
+        if num_v:
+            text = _gather(buf, starts[is_v], ends[is_v], 1)
+            parts["vertices"].append(_parse_floats(text, num_v, 3))
+        num_vt = int(is_vt.sum())
+        if num_vt:
+            text = _gather(buf, starts[is_vt], ends[is_vt], 2)
+            parts["uvs"].append(_parse_floats(text, num_vt, 2))
+        num_vn = int(is_vn.sum())
+        if num_vn:
+            text = _gather(buf, starts[is_vn], ends[is_vn], 2)
+            parts["normals"].append(_parse_floats(text, num_vn, 3))
+
+        face_lines = np.flatnonzero(is_f)
+        if len(face_lines):
+            self._read_faces(
+                buf, starts, ends, face_lines, is_v=is_v, is_vt=is_vt, is_vn=is_vn
+            )
+
+        # Smoothing groups and materials only change at a few lines.
+        s_lines = np.flatnonzero(is_s)
+        s_values = ~np.isin(
+            _line_values(buf, starts[s_lines], ends[s_lines], 1), (b"0", b"off")
+        )
+        mtl_lines, mtl_names = _keyword_lines(buf, starts, ends, b"usemtl")
+        mtl_values = self._material_indices(mtl_names)
+        if len(face_lines):
+            parts["face_smooth"].append(
+                _state_per_face(face_lines, s_lines, s_values, self.smooth)
+            )
+            parts["face_materials"].append(
+                _state_per_face(face_lines, mtl_lines, mtl_values, self.material)
+            )
+        if len(s_values):
+            self.smooth = int(s_values[-1])
+        if len(mtl_values):
+            self.material = int(mtl_values[-1])
+
+        _, mtllibs = _keyword_lines(buf, starts, ends, b"mtllib")
+        for names in mtllibs:
+            self.mtllibs += names.decode().split()
+
+        self.num_vertices += num_v
+        self.num_uvs += num_vt
+        self.num_normals += num_vn
+
+    def _material_indices(self, names: np.ndarray) -> np.ndarray:
+        """Index of every `usemtl` name, numbering new names in file order."""
+        unique, first, inverse = np.unique(
+            names, return_index=True, return_inverse=True
+        )
+        for name in unique[np.argsort(first)]:
+            if name not in self.material_indices:
+                self.material_indices[name] = len(self.material_names)
+                self.material_names.append(name.decode())
+        indices = np.array([self.material_indices[name] for name in unique], np.int64)
+        return indices[inverse]
+
+    def _read_faces(self, buf, starts, ends, face_lines, *, is_v, is_vt, is_vn) -> None:
+        text = _gather(buf, starts[face_lines], ends[face_lines], 1)
+        face_sizes = _tokens_per_line(text)
+        if self.layout is None:
+            self.layout = _face_layout(text)
+        has_uv, has_normal = self.layout
+
+        text[text == _SLASH] = _SPACE
+        values = np.fromstring(text.tobytes(), dtype=np.int64, sep=" ")
+        width = 1 + has_uv + has_normal
+        num_loops = int(face_sizes.sum())
+        if len(values) != num_loops * width:
+            raise ValueError("faces with mixed index layouts are not supported")
+        values = values.reshape(-1, width)
+
+        def counts_at_loops(
+            is_kind: np.ndarray, total: int
+        ) -> Callable[[], np.ndarray]:
+            # Elements defined before each face, for relative indices.
+            def counts() -> np.ndarray:
+                before = total + np.cumsum(is_kind)[face_lines]
+                return np.repeat(before, face_sizes)
+
+            return counts
+
+        parts = self.parts
+        parts["loop_vertices"].append(
+            self._resolve(values[:, 0], counts_at_loops(is_v, self.num_vertices))
+        )
+        parts["face_sizes"].append(face_sizes)
+        if has_uv:
+            parts["loop_uvs"].append(
+                self._resolve(values[:, 1], counts_at_loops(is_vt, self.num_uvs))
+            )
+        if has_normal:
+            parts["loop_normals"].append(
+                self._resolve(values[:, -1], counts_at_loops(is_vn, self.num_normals))
+            )
+
+    def result(self) -> ObjData:
+        def concat(key, dtype, shape=(0,)):
+            arrays = self.parts[key]
+            if not arrays:
+                return np.zeros(shape, dtype=dtype)
+            return np.concatenate(arrays).astype(dtype, copy=False)
+
+        face_sizes = concat("face_sizes", np.int32)
+        loop_vertices = concat("loop_vertices", np.int32)
+        has_uv, has_normal = self.layout or (False, False)
+        loop_uvs = concat("loop_uvs", np.int32) if has_uv else None
+        loop_normals = concat("loop_normals", np.int32) if has_normal else None
+        face_smooth = concat("face_smooth", bool)
+        face_materials = concat("face_materials", np.int32)
+
+        # Like `Mesh.validate`, drop the faces that repeat a vertex or have
+        # too few corners.
+        faces = np.repeat(np.arange(len(face_sizes)), face_sizes)
+        repeated = _repeated_corners(loop_vertices, faces, face_sizes.max(initial=0))
+        kept_faces = (face_sizes >= MIN_FACE_SIZE) & (
+            np.bincount(faces[repeated], minlength=len(face_sizes)) == 0
+        )
+        if not kept_faces.all():
+            kept = kept_faces[faces]
+            face_sizes = face_sizes[kept_faces]
+            face_smooth = face_smooth[kept_faces]
+            face_materials = face_materials[kept_faces]
+            loop_vertices = loop_vertices[kept]
+            loop_uvs = loop_uvs[kept] if has_uv else None
+            loop_normals = loop_normals[kept] if has_normal else None
+
+        loop_starts = (np.cumsum(face_sizes) - face_sizes).astype(np.int32)
+        return ObjData(
+            vertices=concat("vertices", np.float32, (0, 3)),
+            loop_vertices=loop_vertices,
+            loop_starts=loop_starts,
+            face_smooth=face_smooth,
+            # Faces before the first `usemtl` go to the first material slot.
+            face_materials=np.maximum(face_materials, 0),
+            material_names=self.material_names,
+            mtllibs=self.mtllibs,
+            uvs=concat("uvs", np.float32, (0, 2)) if has_uv else None,
+            loop_uvs=loop_uvs,
+            normals=concat("normals", np.float32, (0, 3)) if has_normal else None,
+            loop_normals=loop_normals,
+        )
+
+
+def read_obj(model_path: Path, chunk_size: int = CHUNK_SIZE) -> ObjData:
+    """Parse an OBJ file into flat arrays."""
+    reader = _Reader()
+    with open(model_path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return reader.result()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                start = 0
+                while start < len(data):
+                    end = min(start + chunk_size, len(data))
+                    if end < len(data):
+                        # Cut the chunk after the last complete line.
+                        end = mm.rfind(b"\n", start, end) + 1 or len(data)
+                    reader.read_chunk(data[start:end])
+                    start = end
+            except Exception as e:
+                # The map cannot be closed while a view of it exists, and the
+                # parser's frames in the traceback hold some. Dropping their
+                # locals lets the parse error through instead of a BufferError.
+                traceback.clear_frames(e.__traceback__)
+                raise
+            finally:
+                del data
+    return reader.result()
@@ -0,0 +1,164 @@
+from pathlib import Path
+from typing import Any
+
+import bpy
+
+from .lod import triangle_budget
+from .profiles import restore_render_settings, snapshot_render_settings
+from .simple_viewer import SimpleViewer
+from .sinks import ImageOptions
+from .turntable_viewer import TurntableViewer
+
+# Settings used when the viewer is built or a model is imported, which every
+# pass of a run has to share.
+SCENE_FIELDS = (
+    "up",
+    "forward",
+    "importer",
+    "orphan_purge_interval",
+    "camera_height",
+    "camera_distance",
+    "max_triangles",
+    "triangles_per_pixel",
+    "writer_threads",
+)
+
+TURNTABLE_FIELDS = ("num_frames", "animation_pass", "border_union")
+
+
+class MultiPassViewer(TurntableViewer):
+    """Imports each model once and renders it in several passes.
+
+    `passes` lists the name, viewer ("simple" or "turntable") and viewer config
+    of every pass; each pass renders into the subdirectory of its name. The
+    scene holds the turntable's lights, path and camera plus the simple
+    viewer's fixed camera, so passes differ in everything but the fields in
+    `SCENE_FIELDS`. The default material is assigned or taken off per pass.
+    """
+
+    def __init__(
+        self,
+        passes: list[dict[str, Any]],
+        threads: int = 0,
+        mesh_cache: Path | None = None,
+        mesh_cache_gb: float = 10.0,
+        scene: str | None = None,
+    ):
+        if not passes:
+            raise ValueError("at least one render pass is needed")
+        names = [render_pass["name"] for render_pass in passes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"render pass names must be unique: {names}")
+        first = passes[0]["config"]
+        for render_pass in passes[1:]:
+            for field in SCENE_FIELDS:
+                if render_pass["config"][field] != first[field]:
+                    raise ValueError(
+                        f"render pass {render_pass['name']!r} changes {field}, "
+                        "which must be the same in every pass"
+                    )
+
+        self.passes = passes
+        # Render threads given here, e.g. a worker's share, fill in passes
+        # that leave them to Blender.
+        self.default_threads = threads
+        # Render settings of the new scene, which passes that leave the engine
+        # or profile unset get instead of those of the pass before.
+        self.initial_render_settings: dict[str, Any] | None = None
+        # Loaded models and the materials of their files, keyed by pointer.
+        self.models: dict[int, tuple[bpy.types.Object, list[bpy.types.Material]]] = {}
+        kwargs = {k: v for k, v in first.items() if k not in TURNTABLE_FIELDS}
+        super().__init__(
+            **{**kwargs, "threads": first["threads"] or threads},
+            mesh_cache=mesh_cache,
+            mesh_cache_gb=mesh_cache_gb,
+            scene=scene,
+        )
+
+    def setup_scene(self) -> Any:
+        super().setup_scene()
+        self.turntable_camera = self.camera
+        target = next(c.target for c in self.camera.constraints if c.type == "TRACK_TO")
+        self.still_camera = self.add_camera(
+            location=(0, self.camera_distance, self.camera_height),
+            track_target=target,
+        )
+
+    def setup_render(self) -> None:
+        if self.initial_render_settings is None:
+            self.initial_render_settings = snapshot_render_settings(self.scene)
+        else:
+            restore_render_settings(self.scene, self.initial_render_settings)
+        super().setup_render()
+
+    def triangle_budget(self) -> int:
+        """Budget of the pass with the most pixels, as the model is loaded once."""
+        budgets = [
+            triangle_budget(
+                config["max_triangles"],
+                config["triangles_per_pixel"],
+                config["width"],
+                config["height"],
+            )
+            for config in (render_pass["config"] for render_pass in self.passes)
+        ]
+        return 0 if 0 in budgets else max(budgets)
+
+    def load_model(self, model_path: Path) -> Any:
+        obj = self.import_model(model_path)
+        self.models[obj.as_pointer()] = (obj, list(obj.data.materials))
+        return obj
+
+    def unload_model(self, obj: bpy.types.Object) -> Any:
+        self.models.pop(obj.as_pointer(), None)
+        super().unload_model(obj)
+
+    def reset(self) -> None:
+        self.models.clear()
+        super().reset()
+
+    def render(self, output_path: Path) -> Any:
+        for render_pass in self.passes:
+            name = render_pass["name"]
+            with self.hooks.phase(f"pass:{name}"):
+                self.apply_pass(render_pass["config"])
+                if render_pass["viewer"] == "turntable":
+                    self.camera = self.turntable_camera
+                    TurntableViewer.render(self, output_path / name)
+                    self.clear_animation()
+                else:
+                    self.camera = self.still_camera
+                    SimpleViewer.render(self, output_path / name)
+
+    def apply_pass(self, config: dict[str, Any]) -> None:
+        """Switch the render settings and materials to those of one pass."""
+        self.resolution = (config["width"], config["height"])
+        self.transparent_background = config["transparent_background"]
+        self.output_format = config["output_format"]
+        self.image_options = ImageOptions(
+            config["png_compression"],
+            config["png_depth"],
+            config["quality"],
+            config["lossless"],
+            tuple(config["background"]),
+        )
+        self.border = config["border"]
+        self.border_padding = config["border_padding"]
+        for field in TURNTABLE_FIELDS:
+            if field in config:
+                setattr(self, field, config[field])
+
+        self.engine = config["engine"]
+        self.profile = config["profile"]
+        self.threads = config["threads"] or self.default_threads
+        self.setup_render()
+
+        self.apply_default_material = config["apply_default_material"]
+        for obj, materials in self.models.values():
+            if self.apply_default_material:
+                with self.hooks.phase("material"):
+                    self.add_default_material(obj)
+            elif list(obj.data.materials) != materials:
+                obj.data.materials.clear()
+                for material in materials:
+                    obj.data.materials.append(material)
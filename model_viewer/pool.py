@@ -0,0 +1,346 @@
+"""Rendering from asyncio code on a pool of worker processes.
+
+Every worker runs a render daemon's warm viewer, so jobs can override config
+fields like daemon jobs, and a job with the same viewer and config as the
+worker's previous one reuses its scene. Jobs wait in a bounded queue; once it
+is full, submitting waits for a free slot.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Iterable
+
+from .daemon import RenderDaemon
+from .instrumentation import peak_rss
+from .workers import WorkerLimits, exit_error, spawn_safe_sys_path, threads_per_worker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderRequest:
+    """One model to render with a `RenderPool`."""
+
+    model_path: Path
+    output_dir: Path
+    viewer: str = "simple"
+    """Viewer name, as for `main.py submit`."""
+    overrides: dict[str, Any] = field(default_factory=dict)
+    """Config fields that differ from the viewer's defaults."""
+
+
+@dataclass
+class RenderResult:
+    """Outcome of a `RenderRequest`."""
+
+    request: RenderRequest
+    outputs: list[Path] = field(default_factory=list)
+    """Files written to the output folder."""
+    seconds: float = 0.0
+    """Time from the worker receiving the job to finishing it."""
+    metrics: dict[str, Any] | None = None
+    """Per-phase times, counts and memory of the render."""
+    warm: bool = False
+    """Whether the worker reused the viewer of its previous job."""
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _pool_worker(conn: Connection, threads: int):
+    """Render the requests received on `conn` until it sends None.
+
+    Sends None once ready, then a daemon response and the peak RSS for every
+    request.
+    """
+    # The package imports this module, so its viewers are looked up here.
+    from . import VIEWER_CONFIGS, viewer_class  # noqa: PLC0415
+
+    daemon = RenderDaemon(
+        {name: (viewer_class(name), cfg) for name, cfg in VIEWER_CONFIGS.items()}
+    )
+    conn.send(None)
+    while (request := conn.recv()) is not None:
+        config = {"threads": threads, **request["config"]}
+        response = daemon.handle({**request, "config": config})
+        if response["status"] == "ok":
+            config_cls = VIEWER_CONFIGS[request["viewer"]]
+            outputs = config_cls(**config).output_files(Path(request["output_dir"]))
+            response["outputs"] = [str(path) for path in outputs if path.exists()]
+        conn.send((response, peak_rss()))
+
+
+@dataclass(eq=False)
+class _PoolWorker:
+    process: BaseProcess
+    conn: Connection
+    num_jobs: int = 0
+
+    def receive(self, timeout: float) -> Any:
+        """Block for the worker's next message, "died" or "timeout"."""
+        ready = wait([self.conn, self.process.sentinel], timeout=timeout or None)
+        if self.conn in ready:
+            try:
+                return self.conn.recv()
+            except EOFError:
+                return "died"
+        return "died" if self.process.sentinel in ready else "timeout"
+
+    def stop(self) -> None:
+        """Let the worker exit; it is joined when the pool closes."""
+        self.conn.send(None)
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class RenderPool:
+    """Renders `RenderRequest`s on worker processes.
+
+    Use it as an async context manager, which starts the workers and, on
+    leaving, waits for the submitted jobs. `submit` returns a future of each
+    job's `RenderResult`, `imap` yields the results of a stream of requests as
+    they finish. Failed jobs have an error instead of raising. The `limits`
+    of `render_parallel` apply: a job that crashes its worker or outlasts the
+    timeout fails, and the worker is replaced.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_pending: int = 64,
+        limits: WorkerLimits | None = None,
+    ):
+        self.num_workers = workers
+        self.max_pending = max_pending
+        self.limits = limits or WorkerLimits()
+        self.threads = threads_per_worker(workers)
+        self._queue: asyncio.Queue = asyncio.Queue(max_pending)
+        # bpy is not fork-safe, so every worker starts from a fresh interpreter.
+        self._ctx = multiprocessing.get_context("spawn")
+        # Waiting for a worker blocks, so each worker gets a thread to wait in.
+        self._executor = ThreadPoolExecutor(workers)
+        self._workers: set[_PoolWorker] = set()
+        self._stopped: list[BaseProcess] = []
+        self._tasks: list[asyncio.Task] = []
+        self._closed = False
+
+    async def __aenter__(self) -> "RenderPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            self.terminate()
+
+    async def start(self) -> None:
+        """Start the workers and wait until their viewers are built."""
+        try:
+            workers = await asyncio.gather(
+                *(self._start_worker() for _ in range(self.num_workers))
+            )
+        except BaseException:
+            self.terminate()
+            raise
+        self._tasks = [asyncio.create_task(self._serve(w)) for w in workers]
+
+    async def submit(self, request: RenderRequest) -> "asyncio.Future[RenderResult]":
+        """Queue a job, waiting while the queue is full."""
+        if self._closed:
+            raise RuntimeError("the pool is closed")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return future
+
+    async def render(self, request: RenderRequest) -> RenderResult:
+        """Render one job and wait for its result."""
+        return await (await self.submit(request))
+
+    async def imap(
+        self, requests: Iterable[RenderRequest] | AsyncIterable[RenderRequest]
+    ) -> AsyncIterator[RenderResult]:
+        """Render `requests` and yield their results in the order they finish.
+
+        Requests are taken from `requests` only while fewer than `max_pending`
+        of them wait to be rendered or yielded, so it can be a long generator.
+        """
+        slots = asyncio.Semaphore(self.max_pending)
+        # Finished futures, then the number submitted once `requests` ends.
+        done: asyncio.Queue = asyncio.Queue()
+
+        async def feed():
+            submitted = 0
+            try:
+                async for request in _as_async(requests):
+                    await slots.acquire()
+                    future = await self.submit(request)
+                    future.add_done_callback(done.put_nowait)
+                    submitted += 1
+            finally:
+                done.put_nowait(submitted)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            submitted, yielded = None, 0
+            while submitted is None or yielded < submitted:
+                item = await done.get()
+                if isinstance(item, int):
+                    submitted = item
+                    continue
+                slots.release()
+                yielded += 1
+                yield item.result()
+            # Raises if `requests` did.
+            await feeder
+        finally:
+            feeder.cancel()
+
+    async def close(self) -> None:
+        """Wait for the submitted jobs, then stop the workers."""
+        self._closed = True
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+        loop = asyncio.get_running_loop()
+        for process in self._stopped:
+            await loop.run_in_executor(self._executor, process.join)
+        self._executor.shutdown()
+
+    def terminate(self) -> None:
+        """Kill the workers and cancel the jobs that are not finished."""
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        for worker in list(self._workers):
+            worker.kill()
+        self._workers.clear()
+        for process in self._stopped:
+            process.kill()
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
+        self._executor.shutdown(wait=False)
+
+    async def _receive(self, worker: _PoolWorker, timeout: float = 0.0) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, worker.receive, timeout)
+
+    async def _start_worker(self) -> _PoolWorker:
+        conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_pool_worker, args=(child_conn, self.threads), daemon=True
+        )
+        with spawn_safe_sys_path():
+            process.start()
+        child_conn.close()
+        worker = _PoolWorker(process, conn)
+        self._workers.add(worker)
+        if await self._receive(worker) is not None:
+            self._retire(worker, kill=True)
+            raise RuntimeError(
+                f"worker {process.pid} exited with code {process.exitcode} on start"
+            )
+        return worker
+
+    def _retire(self, worker: _PoolWorker, kill: bool = False) -> None:
+        self._workers.discard(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+            self._stopped.append(worker.process)
+
+    async def _serve(self, worker: _PoolWorker | None) -> None:
+        """Render queued jobs on one worker, replacing it when needed."""
+        while (item := await self._queue.get()) is not None:
+            request, future = item
+            if future.cancelled():
+                continue
+            try:
+                if worker is None:
+                    worker = await self._start_worker()
+                result, worker = await self._render(worker, request)
+            except RuntimeError as e:
+                result = RenderResult(request, error=str(e))
+            except (OSError, EOFError) as e:
+                # The worker died while idle, so the job could not be sent.
+                error = f"{type(e).__name__}: {e}"
+                if worker is not None:
+                    self._retire(worker, kill=True)
+                    error = exit_error(worker.process.exitcode)
+                    # Replaced on the next job, like a worker that timed out.
+                    worker = None
+                logger.error("%s: %s", request.model_path, error)
+                result = RenderResult(request, error=error)
+            if not future.done():
+                future.set_result(result)
+        if worker is not None:
+            self._retire(worker)
+
+    async def _render(
+        self, worker: _PoolWorker, request: RenderRequest
+    ) -> tuple[RenderResult, _PoolWorker | None]:
+        """Render a job, returning its result and the worker for the next one."""
+        start = time.perf_counter()
+        worker.conn.send(
+            {
+                "viewer": request.viewer,
+                "model_path": str(Path(request.model_path).absolute()),
+                "output_dir": str(Path(request.output_dir).absolute()),
+                "config": request.overrides,
+            }
+        )
+        message = await self._receive(worker, self.limits.timeout)
+        if message in ("died", "timeout"):
+            self._retire(worker, kill=True)
+            if message == "timeout":
+                error = f"timed out after {self.limits.timeout:g}s"
+            else:
+                error = exit_error(worker.process.exitcode)
+            logger.error("%s: %s", request.model_path, error)
+            return RenderResult(
+                request, seconds=time.perf_counter() - start, error=error
+            ), None
+
+        response, rss = message
+        result = RenderResult(
+            request,
+            outputs=[Path(path) for path in response.get("outputs", [])],
+            seconds=response["time"],
+            metrics=response.get("metrics"),
+            warm=response.get("warm", False),
+            error=response.get("error"),
+        )
+        worker.num_jobs += 1
+        limits = self.limits
+        if (limits.recycle_after and worker.num_jobs >= limits.recycle_after) or (
+            limits.recycle_rss and rss > limits.recycle_rss
+        ):
+            logger.info("recycling worker %d", worker.process.pid)
+            self._retire(worker)
+            return result, None
+        return result, worker
+
+
+async def _as_async(requests: Iterable | AsyncIterable) -> AsyncIterator:
+    if isinstance(requests, AsyncIterable):
+        async for request in requests:
+            yield request
+    else:
+        for request in requests:
+            yield request
@@ -1,15 +1,45 @@
+"""Lights, cameras and paths of the viewers' scenes.
+
+Objects are created through `bpy.data` and linked into the viewer's scene,
+`self.scene`, instead of through `bpy.ops` and the active object, so a viewer
+can build its scene next to the scenes of other viewers.
+"""
+
 import math
 
 import bpy
 
+# Handle length of a four-point Bezier circle of radius 1, as Blender's auto
+# handles place it.
+_CIRCLE_HANDLE = 0.552127
+
+
+def add_object(
+    scene: bpy.types.Scene,
+    name: str,
+    data: bpy.types.ID | None = None,
+    location: tuple[float, float, float] = (0, 0, 0),
+) -> bpy.types.Object:
+    """Create an object, or an empty without `data`, in the scene's collection."""
+    obj = bpy.data.objects.new(name, data)
+    obj.location = location
+    scene.collection.objects.link(obj)
+    return obj
+
+
+def add_track_to(obj: bpy.types.Object, target: bpy.types.Object) -> None:
+    """Point the object's -Z axis at the target, keeping Y up."""
+    track_to = obj.constraints.new(type="TRACK_TO")
+    track_to.target = target
+    track_to.track_axis = "TRACK_NEGATIVE_Z"
+    track_to.up_axis = "UP_Y"
+
 
 class SunLightPreset:
     def add_sunlight(self, energy: float = 5.0):
-        bpy.ops.object.light_add(type="SUN")
-        sun = bpy.context.object
-
-        sun.data.energy = energy
-        return sun
+        light = bpy.data.lights.new("Sun", type="SUN")
+        light.energy = energy
+        return add_object(self.scene, "Sun", light)
 
 
 class AreaLightPreset:
@@ -21,18 +51,14 @@ class AreaLightPreset:
         light_color: tuple[float, float, float] = (1.0, 0.9, 0.8),
         track_target: bpy.types.Object | None = None,
     ):
-        bpy.ops.object.light_add(type="AREA", location=location)
-        light = bpy.context.object
-
-        light.data.energy = energy
-        light.data.size = light_size
-        light.data.color = light_color
+        data = bpy.data.lights.new("Area", type="AREA")
+        data.energy = energy
+        data.size = light_size
+        data.color = light_color
+        light = add_object(self.scene, "Area", data, location)
 
         if track_target is not None:
-            track_to = light.constraints.new(type="TRACK_TO")
-            track_to.target = track_target
-            track_to.track_axis = "TRACK_NEGATIVE_Z"
-            track_to.up_axis = "UP_Y"
+            add_track_to(light, track_target)
 
         return light
 
@@ -47,19 +73,24 @@ class ManyAreaLightsPreset(AreaLightPreset):
         light_size: float = 2.0,
         light_color: tuple[float, float, float] = (1.0, 0.9, 0.8),
         track_target: bpy.types.Object | None = None,
+        *,
+        center: tuple[float, float, float] = (0, 0, 0),
     ):
+        lights = []
         for i in range(num_lights):
             angle = 2.0 * math.pi * i / num_lights
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
+            x = center[0] + radius * math.cos(angle)
+            y = center[1] + radius * math.sin(angle)
 
-            self.add_arealight(
-                location=(x, y, height),
+            light = self.add_arealight(
+                location=(x, y, center[2] + height),
                 energy=energy,
                 light_size=light_size,
                 light_color=light_color,
                 track_target=track_target,
             )
+            lights.append(light)
+        return lights
 
 
 class TrackTargetPreset:
@@ -67,8 +98,7 @@ class TrackTargetPreset:
         self,
         location: tuple[float, float, float] = (0, 0, 0),
     ):
-        bpy.ops.object.empty_add(location=location)
-        return bpy.context.object
+        return add_object(self.scene, "Empty", location=location)
 
 
 class CameraPreset:
@@ -77,14 +107,12 @@ class CameraPreset:
         location: tuple[float, float, float] = (0, 0, 0),
         track_target: bpy.types.Object | None = None,
     ):
-        bpy.ops.object.camera_add(location=location)
-        camera = bpy.context.object
+        camera = add_object(
+            self.scene, "Camera", bpy.data.cameras.new("Camera"), location
+        )
 
         if track_target is not None:
-            track_to = camera.constraints.new(type="TRACK_TO")
-            track_to.target = track_target
-            track_to.track_axis = "TRACK_NEGATIVE_Z"
-            track_to.up_axis = "UP_Y"
+            add_track_to(camera, track_target)
 
         return camera
 
@@ -96,22 +124,51 @@ class FollowCameraPreset:
         track_target: bpy.types.Object | None = None,
         track_path: bpy.types.Object | None = None,
     ):
-        bpy.ops.object.camera_add(location=location)
-        camera = bpy.context.object
+        camera = add_object(
+            self.scene, "Camera", bpy.data.cameras.new("Camera"), location
+        )
 
+        follow_ctr = None
         if track_path is not None:
             follow_ctr = camera.constraints.new(type="FOLLOW_PATH")
             follow_ctr.target = track_path
 
         if track_target is not None:
-            track_to = camera.constraints.new(type="TRACK_TO")
-            track_to.target = track_target
-            track_to.track_axis = "TRACK_NEGATIVE_Z"
-            track_to.up_axis = "UP_Y"
+            add_track_to(camera, track_target)
 
         return camera, follow_ctr
 
 
+class CirclePathPreset:
+    def add_circle_path(
+        self,
+        radius: float = 3.0,
+        center: tuple[float, float, float] = (0, 0, 1),
+    ) -> bpy.types.Object:
+        """A horizontal Bezier circle for cameras to follow, like Blender's
+        Bezier circle primitive: four points, starting at -X, going clockwise
+        seen from above."""
+        curve = bpy.data.curves.new("BezierCircle", type="CURVE")
+        curve.dimensions = "3D"
+        curve.fill_mode = "FULL"
+        curve.use_path = True
+        spline = curve.splines.new("BEZIER")
+        spline.use_cyclic_u = True
+        points = spline.bezier_points
+        points.add(3)
+        handle = radius * _CIRCLE_HANDLE
+        for i, point in enumerate(points):
+            angle = math.pi - i * math.pi / 2
+            x, y = radius * math.cos(angle), radius * math.sin(angle)
+            # Unit tangent, in the direction of travel.
+            dx, dy = math.sin(angle), -math.cos(angle)
+            point.co = (x, y, 0)
+            point.handle_left_type = point.handle_right_type = "AUTO"
+            point.handle_left = (x - handle * dx, y - handle * dy, 0)
+            point.handle_right = (x + handle * dx, y + handle * dy, 0)
+        return add_object(self.scene, "BezierCircle", curve, center)
+
+
 class MaterialPreset:
     def add_default_material(
         self,
@@ -122,21 +179,25 @@ class MaterialPreset:
         roughness: float = 0.5,
         specular: float = 0.5,
     ):
-        # Create new material
-        material = bpy.data.materials.new(name=material_name)
-        material.use_nodes = True
-        
-        # Get the principled BSDF node
-        bsdf = material.node_tree.nodes["Principled BSDF"]
-        bsdf.inputs[0].default_value = base_color  # Base Color
-        bsdf.inputs[1].default_value = metallic    # Metallic
-        bsdf.inputs[2].default_value = roughness   # Roughness  
-        bsdf.inputs[7].default_value = specular    # Specular IOR
-        
+        # Reuse the material across models instead of creating one per model.
+        material = bpy.data.materials.get(material_name)
+        if material is None:
+            material = bpy.data.materials.new(name=material_name)
+            material.use_nodes = True
+            # Keep it alive between models, when no object is using it.
+            material.use_fake_user = True
+
+            # Get the principled BSDF node
+            bsdf = material.node_tree.nodes["Principled BSDF"]
+            bsdf.inputs[0].default_value = base_color  # Base Color
+            bsdf.inputs[1].default_value = metallic  # Metallic
+            bsdf.inputs[2].default_value = roughness  # Roughness
+            bsdf.inputs[7].default_value = specular  # Specular IOR
+
         # Assign material to object
         if target_object.data.materials:
             target_object.data.materials[0] = material
         else:
             target_object.data.materials.append(material)
-            
+
         return material
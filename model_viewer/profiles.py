@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+from typing import Any
+
+# Engine identifiers by config name. EEVEE was renamed in Blender 4.2 and back
+# in 5.0, so every candidate is tried in turn.
+ENGINE_IDS = {
+    "WORKBENCH": ("BLENDER_WORKBENCH",),
+    "EEVEE": ("BLENDER_EEVEE", "BLENDER_EEVEE_NEXT"),
+    "CYCLES": ("CYCLES",),
+}
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """Quality settings that are traded together for throughput."""
+
+    cycles_samples: int
+    """Maximum samples per pixel with Cycles."""
+    adaptive_threshold: float
+    """Noise level at which Cycles' adaptive sampling stops a pixel."""
+    denoise: bool
+    """Whether Cycles denoises the result with OpenImageDenoise."""
+    max_bounces: int
+    """Total light bounces with Cycles, and the limit of each kind of bounce."""
+    tile_size: int
+    """Side of Cycles' render tiles in pixels. Frames up to this size render as
+    one tile, which is fastest on CPU; smaller tiles only save memory."""
+    eevee_samples: int
+    """Anti-aliasing samples with EEVEE."""
+    workbench_aa: str
+    """Anti-aliasing mode with Workbench."""
+
+
+PROFILES = {
+    "preview": RenderProfile(
+        cycles_samples=16,
+        adaptive_threshold=0.1,
+        denoise=True,
+        max_bounces=4,
+        tile_size=2048,
+        eevee_samples=8,
+        workbench_aa="FXAA",
+    ),
+    "standard": RenderProfile(
+        cycles_samples=128,
+        adaptive_threshold=0.03,
+        denoise=True,
+        max_bounces=8,
+        tile_size=2048,
+        eevee_samples=32,
+        workbench_aa="8",
+    ),
+    "final": RenderProfile(
+        cycles_samples=1024,
+        adaptive_threshold=0.01,
+        denoise=True,
+        max_bounces=12,
+        tile_size=2048,
+        eevee_samples=128,
+        workbench_aa="32",
+    ),
+}
+
+
+# Scene settings that `apply_render_settings` changes, besides the threads.
+RENDER_SETTINGS = (
+    "render.engine",
+    "cycles.device",
+    "cycles.samples",
+    "cycles.use_adaptive_sampling",
+    "cycles.adaptive_threshold",
+    "cycles.use_denoising",
+    "cycles.denoiser",
+    "cycles.max_bounces",
+    "cycles.diffuse_bounces",
+    "cycles.glossy_bounces",
+    "cycles.transmission_bounces",
+    "cycles.use_auto_tile",
+    "cycles.tile_size",
+    "eevee.taa_render_samples",
+    "display.render_aa",
+)
+
+
+def snapshot_render_settings(scene: Any) -> dict[str, Any]:
+    """Values of the `RENDER_SETTINGS` of a scene."""
+    snapshot = {}
+    for path in RENDER_SETTINGS:
+        struct, name = path.split(".")
+        snapshot[path] = getattr(getattr(scene, struct), name)
+    return snapshot
+
+
+def restore_render_settings(scene: Any, snapshot: dict[str, Any]) -> None:
+    """Set the values taken by `snapshot_render_settings` back."""
+    for path, value in snapshot.items():
+        struct, name = path.split(".")
+        setattr(getattr(scene, struct), name, value)
+
+
+def set_engine(scene: Any, engine: str) -> None:
+    for engine_id in ENGINE_IDS[engine]:
+        try:
+            scene.render.engine = engine_id
+            return
+        except TypeError:
+            continue
+    raise ValueError(f"render engine {engine} is not available in this Blender")
+
+
+def apply_render_settings(
+    scene: Any,
+    engine: str | None = None,
+    profile: str | None = None,
+    threads: int = 0,
+) -> None:
+    """Set the render engine, quality profile and thread count of a scene.
+
+    Settings that are not given keep Blender's factory defaults.
+    """
+    if engine is not None:
+        set_engine(scene, engine)
+
+    if profile is not None:
+        p = PROFILES[profile]
+        cycles = scene.cycles
+        cycles.device = "CPU"
+        cycles.samples = p.cycles_samples
+        cycles.use_adaptive_sampling = True
+        cycles.adaptive_threshold = p.adaptive_threshold
+        cycles.use_denoising = p.denoise
+        cycles.denoiser = "OPENIMAGEDENOISE"
+        cycles.max_bounces = p.max_bounces
+        cycles.diffuse_bounces = p.max_bounces
+        cycles.glossy_bounces = p.max_bounces
+        cycles.transmission_bounces = p.max_bounces
+        cycles.use_auto_tile = True
+        cycles.tile_size = p.tile_size
+        scene.eevee.taa_render_samples = p.eevee_samples
+        scene.display.render_aa = p.workbench_aa
+
+    if threads > 0:
+        scene.render.threads_mode = "FIXED"
+        scene.render.threads = threads
+    else:
+        scene.render.threads_mode = "AUTO"
@@ -0,0 +1,141 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from .batch import RenderJob
+from .manifest import MANIFEST_NAME, Manifest
+
+_SHARD_RE = re.compile(r"^(\d+)/(\d+)$")
+_SHARD_NAME_RE = re.compile(r"\.shard-(\d+)-of-(\d+)\.")
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Shard `index` of `count`, holding the models whose key hashes to it.
+
+    A model's shard depends only on its key, the path relative to the input
+    folder, so adding or removing files never moves other models between
+    shards.
+    """
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        """Parse "i/N", with shards numbered from 0 to N-1."""
+        m = _SHARD_RE.match(spec)
+        if m is None:
+            raise ValueError(f"shard must look like i/N, not {spec!r}")
+        shard = cls(int(m.group(1)), int(m.group(2)))
+        if not 0 <= shard.index < shard.count:
+            raise ValueError(f"shard index must be between 0 and {shard.count - 1}")
+        return shard
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def contains(self, key: str) -> bool:
+        return shard_of(key, self.count) == self.index
+
+    def select(self, jobs: list[RenderJob]) -> list[RenderJob]:
+        return [job for job in jobs if self.contains(job.key)]
+
+    def file_name(self, name: str) -> str:
+        """Per-shard variant of an output file name, e.g. manifest.shard-0-of-4.json.
+
+        Shards that are copied into one output tree keep their files apart.
+        """
+        stem, dot, suffix = name.partition(".")
+        return f"{stem}.shard-{self.index}-of-{self.count}{dot}{suffix}"
+
+
+def shard_of(key: str, count: int) -> int:
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+@dataclass
+class MergeReport:
+    """Problems found while merging shard manifests."""
+
+    shard_counts: list[int]
+    """Shard counts of the manifests, a single one when they belong together."""
+    missing_shards: list[int]
+    missing: list[str]
+    """Input models that no shard rendered or recorded as failed."""
+    duplicates: dict[str, list[int]]
+    """Models recorded by more than one shard, with those shards."""
+    misplaced: dict[str, int]
+    """Models recorded by a shard they don't hash to."""
+    extra: list[str]
+    """Recorded models that are not part of the input."""
+    config_hashes: set[str]
+    failures: dict[str, str]
+
+    @property
+    def ok(self) -> bool:
+        return not (
+            len(self.shard_counts) > 1
+            or self.missing_shards
+            or self.missing
+            or self.duplicates
+            or self.misplaced
+            or self.extra
+            or self.failures
+            or len(self.config_hashes) > 1
+        )
+
+
+def shard_manifests(output_dir: Path) -> dict[Shard, Manifest]:
+    """Manifests written by `--shard` runs into `output_dir`."""
+    manifests = {}
+    pattern = MANIFEST_NAME.replace(".", ".shard-*-of-*.", 1)
+    for path in sorted(output_dir.glob(pattern)):
+        m = _SHARD_NAME_RE.search(path.name)
+        shard = Shard(int(m.group(1)), int(m.group(2)))
+        manifests[shard] = Manifest.load(output_dir, path.name)
+    return manifests
+
+
+def merge_manifests(
+    output_dir: Path, keys: set[str], manifests: dict[Shard, Manifest]
+) -> tuple[Manifest, MergeReport]:
+    """Combine shard manifests into the manifest of a single-node run.
+
+    `keys` are the models of the whole input, which the shards should
+    have rendered exactly once between them.
+    """
+    counts = sorted({shard.count for shard in manifests})
+    merged = Manifest(output_dir)
+    owners: dict[str, list[int]] = {}
+    misplaced = {}
+    config_hashes = set()
+    for shard, manifest in sorted(manifests.items(), key=lambda item: item[0].index):
+        for key, entry in manifest.entries.items():
+            owners.setdefault(key, []).append(shard.index)
+            if not shard.contains(key):
+                misplaced[key] = shard.index
+            config_hashes.add(entry["config_hash"])
+            merged.entries[key] = entry
+        for key, error in manifest.failures.items():
+            if key not in manifest.entries:
+                merged.failures[key] = error
+
+    # A failure in one shard is resolved by a render in another.
+    for key in merged.entries:
+        merged.failures.pop(key, None)
+
+    present = {shard.index for shard in manifests}
+    report = MergeReport(
+        shard_counts=counts,
+        missing_shards=sorted(set(range(max(counts, default=0))) - present),
+        missing=sorted(keys - set(merged.entries) - set(merged.failures)),
+        duplicates={k: v for k, v in owners.items() if len(v) > 1},
+        misplaced=misplaced,
+        extra=sorted(set(merged.entries) - keys),
+        config_hashes=config_hashes,
+        failures=dict(merged.failures),
+    )
+    return merged, report
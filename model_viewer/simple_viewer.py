@@ -1,9 +1,23 @@
+import math
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 import bpy
 
 from .base import BaseViewer
+from .border import (
+    PixelRect,
+    pixel_border,
+    projected_bounds,
+    set_border,
+    write_crop_metadata,
+)
+from .capture import capture_frame
+from .fast_import import import_obj
+from .lod import decimate, triangle_budget, triangle_count, write_lod_metadata
+from .mesh_cache import MeshCache
 from .presets import (
     CameraPreset,
     ManyAreaLightsPreset,
@@ -11,7 +25,20 @@ from .presets import (
     SunLightPreset,
     TrackTargetPreset,
 )
-from .utils import move_object_to_center, scale_to_unit_cube
+from .profiles import apply_render_settings
+from .sinks import (
+    FrameWriter,
+    ImageOptions,
+    make_sink,
+    output_files,
+    saved_by_blender,
+)
+from .utils import (
+    datablock_count,
+    new_datablocks,
+    normalize_to_unit_cube,
+    snapshot_datablocks,
+)
 
 
 class SimpleViewer(
@@ -32,8 +59,28 @@ class SimpleViewer(
         up: str = "Z",
         forward: str = "Y",
         apply_default_material: bool = True,
+        *,
+        importer: str = "operator",
+        orphan_purge_interval: int = 100,
+        engine: str | None = None,
+        profile: str | None = None,
+        threads: int = 0,
+        output_format: str = "png",
+        border: str = "none",
+        border_padding: float = 0.02,
+        mesh_cache: Path | None = None,
+        mesh_cache_gb: float = 10.0,
+        max_triangles: int = 0,
+        triangles_per_pixel: float = 0.0,
+        scene: str | None = None,
+        png_compression: int = 1,
+        png_depth: int = 8,
+        quality: int = 90,
+        lossless: bool = False,
+        background: tuple[float, float, float] = (1.0, 1.0, 1.0),
+        writer_threads: int = 2,
     ):
-        super().__init__()
+        super().__init__(scene)
         self.resolution = (width, height)
         self.transparent_background = transparent_background
         self.model_up_axis = up  # control import model
@@ -41,8 +88,31 @@ class SimpleViewer(
         self.camera_height = camera_height
         self.camera_distance = camera_distance
         self.apply_default_material = apply_default_material
+        self.importer = importer
+        self.orphan_purge_interval = orphan_purge_interval
+        self.engine = engine
+        self.profile = profile
+        self.threads = threads
+        self.output_format = output_format
+        self.image_options = ImageOptions(
+            png_compression, png_depth, quality, lossless, tuple(background)
+        )
+        self.writer = FrameWriter(writer_threads)
+        self.border = border
+        self.border_padding = border_padding
+        self.mesh_cache = (
+            MeshCache(mesh_cache, int(mesh_cache_gb * 1e9)) if mesh_cache else None
+        )
+        self.max_triangles = max_triangles
+        self.triangles_per_pixel = triangles_per_pixel
+        # Triangles of each loaded model as imported and as rendered.
+        self.triangle_counts: dict[int, tuple[int, int]] = {}
         self.camera = None
+        # Datablocks each loaded model brought in, keyed by object pointer.
+        self.model_datablocks: dict[int, list[bpy.types.ID]] = {}
+        self.num_unloaded = 0
         self.setup_scene()
+        self.setup_render()
 
     def setup_scene(self) -> Any:
         # This target is for a look-at point.
@@ -62,38 +132,246 @@ class SimpleViewer(
             track_target=target,
         )
 
-    def load_model(self, model_path: Path) -> Any:
-        assert model_path.suffix == ".obj"
-        filepath = self.path_to_str(model_path)
-        bpy.ops.wm.obj_import(
-            filepath=filepath,
-            forward_axis=self.model_forward_axis,
-            up_axis=self.model_up_axis,
+    def setup_render(self) -> None:
+        apply_render_settings(
+            self.scene,
+            engine=self.engine,
+            profile=self.profile,
+            threads=self.threads,
         )
 
-        obj = bpy.context.object
-        scale_to_unit_cube(obj)
-        move_object_to_center(obj)
-        
+    def load_model(self, model_path: Path) -> Any:
+        obj = self.import_model(model_path)
         if self.apply_default_material:
-            self.add_default_material(obj)
-        
+            with self.hooks.phase("material"):
+                self.add_default_material(obj)
         return obj
 
+    def import_model(self, model_path: Path) -> bpy.types.Object:
+        """Import and normalize a model, keeping the materials of its file.
+
+        With a mesh cache, a model imported before with the same axes and
+        importer is built from the cache instead. A model over the triangle
+        budget is decimated after it is normalized (and cached at full
+        resolution), so it is framed like the full model.
+        """
+        assert model_path.suffix == ".obj"
+        snapshot = snapshot_datablocks()
+        obj = cache_key = None
+        if self.mesh_cache is not None:
+            with self.hooks.phase("cache"):
+                cache_key = self.mesh_cache.key(
+                    model_path,
+                    {
+                        "up": self.model_up_axis,
+                        "forward": self.model_forward_axis,
+                        "importer": self.importer,
+                    },
+                )
+                obj = self.mesh_cache.load(cache_key, model_path, self.scene)
+            self.hooks.record(mesh_cache="miss" if obj is None else "hit")
+
+        if obj is None:
+            start = time.perf_counter()
+            obj = self.read_model(model_path)
+            with self.hooks.phase("normalize"):
+                normalize_to_unit_cube(obj)
+            if cache_key is not None:
+                with self.hooks.phase("cache"):
+                    self.mesh_cache.store(
+                        cache_key, obj, model_path, time.perf_counter() - start
+                    )
+        budget = self.triangle_budget()
+        if budget > 0:
+            self.limit_triangles(obj, budget)
+        self.model_datablocks[obj.as_pointer()] = new_datablocks(snapshot)
+        self.hooks.record(vertices=len(obj.data.vertices), faces=len(obj.data.polygons))
+        return obj
+
+    def read_model(self, model_path: Path) -> bpy.types.Object:
+        """Import a model file with the configured importer and axes."""
+        with self.hooks.phase("import"):
+            if self.importer == "numpy":
+                return import_obj(
+                    model_path,
+                    forward_axis=self.model_forward_axis,
+                    up_axis=self.model_up_axis,
+                    scene=self.scene,
+                )
+            with self.scene_context():
+                bpy.ops.wm.obj_import(
+                    filepath=self.path_to_str(model_path),
+                    forward_axis=self.model_forward_axis,
+                    up_axis=self.model_up_axis,
+                )
+            return self.scene.view_layers[0].objects.active
+
+    def triangle_budget(self) -> int:
+        """Triangles a model may have when rendered, 0 for no limit."""
+        return triangle_budget(
+            self.max_triangles, self.triangles_per_pixel, *self.resolution
+        )
+
+    def limit_triangles(self, obj: bpy.types.Object, budget: int) -> None:
+        """Decimate the model if it has more triangles than `budget`."""
+        triangles = rendered = triangle_count(obj.data)
+        if triangles > budget:
+            with self.hooks.phase("decimate"):
+                decimate(obj, budget)
+            rendered = triangle_count(obj.data)
+        self.triangle_counts[obj.as_pointer()] = (triangles, rendered)
+        self.hooks.record(triangles=triangles, rendered_triangles=rendered)
+
     def unload_model(self, obj: bpy.types.Object) -> Any:
-        bpy.data.objects.remove(obj, do_unlink=True)
+        self.triangle_counts.pop(obj.as_pointer(), None)
+        with self.hooks.phase("unload"):
+            # Remove the object together with its mesh, materials and images.
+            datablocks = self.model_datablocks.pop(obj.as_pointer(), [obj])
+            bpy.data.batch_remove(datablocks)
+
+            self.num_unloaded += 1
+            interval = self.orphan_purge_interval
+            if interval > 0 and self.num_unloaded % interval == 0:
+                bpy.data.orphans_purge(do_recursive=True)
+
+        if self.hooks.enabled:
+            # Counting walks every collection of bpy.data, so only when measuring.
+            self.hooks.record(datablocks=datablock_count())
+
+    def reset(self) -> None:
+        """Remove models that were never unloaded, e.g. after a failed render."""
+        for datablocks in self.model_datablocks.values():
+            bpy.data.batch_remove(datablocks)
+        self.model_datablocks.clear()
+        self.triangle_counts.clear()
 
     def render(self, output_path: Path) -> Any:
-        R = bpy.context.scene.render
+        R = self.scene.render
         R.resolution_x = self.resolution[0]
         R.resolution_y = self.resolution[1]
         R.film_transparent = self.transparent_background
-        R.image_settings.file_format = "PNG"
-        R.image_settings.color_mode = "RGBA"
-        R.filepath = self.path_to_str(output_path / "render.png")
+        self.set_image_settings()
+
+        R.use_border = False
+
+        self.scene.camera = self.camera
+        output_path.mkdir(parents=True, exist_ok=True)
+        rects = []
+        if self.border != "none":
+            rects.append(self.model_border())
+            set_border(R, rects[0], crop=self.border == "crop")
+        with self.frame_writer(output_path, 1, numbered=False) as render_frame:
+            render_frame(0)
+        self.save_crop_metadata(output_path, rects)
+        self.save_lod_metadata(output_path)
+
+    def set_image_settings(self) -> None:
+        """Set the format Blender saves PNG and EXR frames in."""
+        settings = self.scene.render.image_settings
+        if self.output_format == "exr":
+            # Scene-linear float data, as EXR output is meant for processing.
+            settings.file_format = "OPEN_EXR"
+            settings.color_depth = "32"
+            settings.exr_codec = "ZIP"
+        else:
+            settings.file_format = "PNG"
+            settings.color_depth = str(self.image_options.png_depth)
+            # Blender's compression is a percentage of zlib's 9 levels, which
+            # it rounds down.
+            level = self.image_options.png_compression
+            settings.compression = math.ceil(level * 100 / 9)
+        settings.color_mode = "RGBA"
+
+    def model_border(self) -> PixelRect:
+        """Pixel border around the loaded models, as the camera sees them now."""
+        # Let the camera constraints catch up with any change.
+        self.scene.view_layers[0].update()
+        models = [obj for obj in self.scene.objects if obj.type == "MESH"]
+        bounds = projected_bounds(self.scene, self.camera, models)
+        return pixel_border(bounds, *self.resolution, self.border_padding)
+
+    def save_crop_metadata(self, output_path: Path, rects: list[PixelRect]) -> None:
+        if self.border == "crop":
+            path = write_crop_metadata(output_path, rects, *self.resolution)
+            self.hooks.wrote(path)
+
+    def save_lod_metadata(
+        self, output_path: Path, objects: list[bpy.types.Object] | None = None
+    ) -> None:
+        """Save the triangle counts of `objects`, all loaded models by default."""
+        budget = self.triangle_budget()
+        if budget == 0:
+            return
+        if objects is None:
+            counts = list(self.triangle_counts.values())
+        else:
+            counts = [self.triangle_counts[obj.as_pointer()] for obj in objects]
+        path = write_lod_metadata(
+            output_path,
+            sum(triangles for triangles, _ in counts),
+            sum(rendered for _, rendered in counts),
+            budget,
+        )
+        self.hooks.wrote(path)
+
+    @contextmanager
+    def frame_writer(
+        self, output_path: Path, num_frames: int, numbered: bool = True
+    ) -> Iterator[Callable[[int], None]]:
+        """Yield a function rendering the current frame into the model's output.
+
+        The function takes the frame number, and files are named as in
+        `output_files`. Each frame is captured as an
+        array and handed to a sink. PNG and JPEG frames are encoded on the
+        writer's threads while the next frame renders, and any frame can be
+        rendered on its own; other sinks need the frames in order. The block
+        ends once every file is written. EXR and 16-bit PNG frames are saved
+        by Blender as they are rendered.
+        """
+        if saved_by_blender(self.output_format, self.image_options):
+            files = output_files(self.output_format, output_path, num_frames, numbered)
+            yield lambda frame: self.render_still(files[frame])
+            return
+
+        sink = make_sink(self.output_format, self.image_options, self.writer)
+        sink.open(output_path, num_frames, numbered)
+
+        def render_frame(frame: int) -> None:
+            with self.hooks.phase("render"):
+                bpy.ops.render.render(
+                    animation=False, write_still=False, scene=self.scene.name
+                )
+            with self.hooks.phase("capture"):
+                pixels = capture_frame(self.scene)
+            # Only waits while the writer's queue is full.
+            with self.hooks.phase("write"):
+                sink.add(pixels, frame)
+
+        try:
+            yield render_frame
+        except BaseException:
+            # Frames of a failed model must not be written over the next one.
+            self.writer.cancel()
+            raise
+        with self.hooks.phase("write"):
+            written = sink.close()
+        for path in written:
+            self.hooks.wrote(path)
+
+    def render_still(self, file_path: Path) -> None:
+        """Render the current frame and save it to `file_path`.
 
-        bpy.context.scene.camera = self.camera
-        bpy.ops.render.render(animation=False, write_still=True)
+        Rendering and writing are separate steps so they can be timed apart.
+        """
+        with self.hooks.phase("render"):
+            bpy.ops.render.render(
+                animation=False, write_still=False, scene=self.scene.name
+            )
+        with self.hooks.phase("write"):
+            bpy.data.images["Render Result"].save_render(
+                self.path_to_str(file_path), scene=self.scene
+            )
+        self.hooks.wrote(file_path)
 
 
 if __name__ == "__main__":
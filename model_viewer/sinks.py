@@ -0,0 +1,335 @@
+import struct
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+import numpy as np
+
+OUTPUT_FORMAT = Literal["png", "jpeg", "exr", "npz", "npy", "gif", "webp"]
+BORDER_MODE = Literal["none", "full", "crop"]
+
+OUTPUT_NAME = "render"
+# Formats written as one file per frame, so a turntable can be split between
+# processes, and their file extensions.
+IMAGE_FORMATS = {"png": "png", "jpeg": "jpg", "exr": "exr"}
+# Bits per channel of frames captured from Blender.
+CAPTURE_DEPTH = 8
+# Metadata saved next to the renders with a crop border or a triangle budget.
+CROP_NAME = "crop.json"
+LOD_NAME = "lod.json"
+
+
+@dataclass
+class ImageOptions:
+    """Encoding parameters of the output formats."""
+
+    png_compression: int = 1
+    """zlib level of PNGs, 0 (fastest) to 9 (smallest)."""
+    png_depth: Literal[8, 16] = 8
+    """Bits per PNG channel."""
+    quality: int = 90
+    """Quality of JPEG and lossy WebP, 1 to 100."""
+    lossless: bool = False
+    """Encode WebP losslessly."""
+    background: tuple[float, float, float] = (1.0, 1.0, 1.0)
+    """RGB color that JPEG frames are flattened onto, as JPEG has no alpha."""
+
+
+def saved_by_blender(output_format: OUTPUT_FORMAT, options: ImageOptions) -> bool:
+    """Whether frames are saved by Blender instead of captured as arrays.
+
+    Captured frames have `CAPTURE_DEPTH` bits per channel, so EXR and deeper
+    PNGs are left to Blender's writers. 8-bit PNGs are captured all the same,
+    as `capture_frame` and encoding on a writer thread cost the render thread
+    less than Blender's PNG writer.
+    """
+    return output_format == "exr" or (
+        output_format == "png" and options.png_depth > CAPTURE_DEPTH
+    )
+
+
+class FrameWriter:
+    """Encodes and writes frames on background threads.
+
+    Writes overlap with rendering the next frame. At most `max_pending`
+    captured frames wait to be written; submitting another blocks until one
+    is done, which bounds their memory. Without threads, frames are written
+    when they are submitted.
+    """
+
+    def __init__(self, threads: int = 2, max_pending: int = 0):
+        self.executor = (
+            ThreadPoolExecutor(threads, thread_name_prefix="frame-writer")
+            if threads > 0
+            else None
+        )
+        self.slots = threading.BoundedSemaphore(max_pending or 2 * max(threads, 1))
+        self.pending: list[Future] = []
+
+    def submit(self, write: Callable[..., Any], *args: Any) -> None:
+        if self.executor is None:
+            write(*args)
+            return
+        self.slots.acquire()
+        future = self.executor.submit(write, *args)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.pending.append(future)
+
+    def wait(self) -> None:
+        """Wait for every submitted write, raising the first error."""
+        pending, self.pending = self.pending, []
+        wait(pending)
+        for future in pending:
+            future.result()
+
+    def cancel(self) -> None:
+        """Drop the writes not started yet and wait for the running ones.
+
+        Their errors are ignored.
+        """
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.cancel()
+        wait(pending)
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+
+
+# Frames are written when submitted, for sinks used without a viewer.
+_SYNC_WRITER = FrameWriter(threads=0)
+
+
+class FrameSink:
+    """Receives the rendered RGBA frames of one model.
+
+    Sinks writing one file per frame take the frames in any order, the others
+    in the order of their numbers.
+    """
+
+    def __init__(self, writer: FrameWriter | None = None):
+        self.writer = writer or _SYNC_WRITER
+
+    def open(self, output_dir: Path, num_frames: int, numbered: bool = True) -> None:
+        """Start a model, numbering its frames as in `output_files`."""
+        self.output_dir = output_dir
+        self.num_frames = num_frames
+        self.numbered = numbered
+
+    def add(self, frame: np.ndarray, index: int) -> None:
+        """Add frame number `index`, an (height, width, 4) uint8 array."""
+        raise NotImplementedError
+
+    def close(self) -> list[Path]:
+        """Finish the model and return the files written."""
+        raise NotImplementedError
+
+
+def encode_png(frame: np.ndarray, compression: int = 6) -> bytes:
+    """Encode an (height, width, 4) uint8 array as an 8-bit RGBA PNG."""
+    height, width, _ = frame.shape
+    # Every row starts with its filter type, 0 (none).
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 1:] = frame.reshape(height, -1)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows.tobytes(), compression))
+        + chunk(b"IEND", b"")
+    )
+
+
+def flatten(frame: np.ndarray, background: tuple[float, float, float]) -> np.ndarray:
+    """Composite an RGBA frame onto an RGB color, giving an RGB frame."""
+    alpha = frame[:, :, 3:].astype(np.float32) / 255
+    color = np.asarray(background, dtype=np.float32) * 255
+    rgb = frame[:, :, :3] * alpha + color * (1 - alpha)
+    return np.round(rgb).astype(np.uint8)
+
+
+def _pillow_image() -> Any:
+    # Pillow is an optional dependency, only needed by the formats using it.
+    try:
+        from PIL import Image  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "JPEG, GIF and WebP output needs Pillow, "
+            "install it with: pip install 'model-viewer[animation]'"
+        ) from e
+    return Image
+
+
+class ImageSink(FrameSink):
+    """One PNG or JPEG per frame, named like the files Blender writes.
+
+    Frames are encoded on the writer's threads; `close` waits for them.
+    """
+
+    def __init__(
+        self,
+        image_format: Literal["png", "jpeg"] = "png",
+        options: ImageOptions | None = None,
+        writer: FrameWriter | None = None,
+    ):
+        super().__init__(writer)
+        self.image_format = image_format
+        self.options = options or ImageOptions()
+        if image_format == "jpeg":
+            self.image_cls = _pillow_image()
+
+    def open(self, output_dir: Path, num_frames: int, numbered: bool = True) -> None:
+        super().open(output_dir, num_frames, numbered)
+        self.paths = output_files(self.image_format, output_dir, num_frames, numbered)
+        self.files: list[Path] = []
+
+    def add(self, frame: np.ndarray, index: int) -> None:
+        path = self.paths[index]
+        self.writer.submit(self.write, frame, path)
+        self.files.append(path)
+
+    def write(self, frame: np.ndarray, path: Path) -> None:
+        if self.image_format == "png":
+            path.write_bytes(encode_png(frame, self.options.png_compression))
+            return
+        image = self.image_cls.fromarray(flatten(frame, self.options.background))
+        image.save(path, quality=self.options.quality)
+
+    def close(self) -> list[Path]:
+        self.writer.wait()
+        return self.files
+
+
+class NpzSink(FrameSink):
+    """All frames of a model as one compressed (frames, height, width, 4) array."""
+
+    def open(self, output_dir: Path, num_frames: int, numbered: bool = True) -> None:
+        super().open(output_dir, num_frames, numbered)
+        self.frames: list[np.ndarray] = []
+
+    def add(self, frame: np.ndarray, index: int) -> None:
+        self.frames.append(frame)
+
+    def close(self) -> list[Path]:
+        path = self.output_dir / f"{OUTPUT_NAME}.npz"
+        np.savez_compressed(path, frames=np.stack(self.frames))
+        self.frames = []
+        return [path]
+
+
+class NpySink(FrameSink):
+    """Frames written straight into a memory-mapped (frames, height, width, 4) .npy."""
+
+    def open(self, output_dir: Path, num_frames: int, numbered: bool = True) -> None:
+        super().open(output_dir, num_frames, numbered)
+        self.path = output_dir / f"{OUTPUT_NAME}.npy"
+        self.stack: np.memmap | None = None
+
+    def add(self, frame: np.ndarray, index: int) -> None:
+        if self.stack is None:
+            self.stack = np.lib.format.open_memmap(
+                self.path,
+                mode="w+",
+                dtype=np.uint8,
+                shape=(self.num_frames, *frame.shape),
+            )
+        self.stack[index] = frame
+
+    def close(self) -> list[Path]:
+        if self.stack is not None:
+            self.stack.flush()
+            self.stack = None
+        return [self.path]
+
+
+class AnimationSink(FrameSink):
+    """An animated GIF or WebP encoded in-process with Pillow.
+
+    A single frame is saved as a still image.
+    """
+
+    def __init__(
+        self,
+        image_format: Literal["gif", "webp"],
+        duration: int = 100,
+        options: ImageOptions | None = None,
+    ):
+        super().__init__()
+        self.image_cls = _pillow_image()
+        self.image_format = image_format
+        self.duration = duration  # display time of each frame in milliseconds
+        self.options = options or ImageOptions()
+
+    def open(self, output_dir: Path, num_frames: int, numbered: bool = True) -> None:
+        super().open(output_dir, num_frames, numbered)
+        self.frames: list = []
+
+    def add(self, frame: np.ndarray, index: int) -> None:
+        self.frames.append(self.image_cls.fromarray(frame))
+
+    def close(self) -> list[Path]:
+        path = self.output_dir / f"{OUTPUT_NAME}.{self.image_format}"
+        first, *rest = self.frames
+        if self.image_format == "gif":
+            options = {"disposal": 2}
+        else:
+            options = {
+                "quality": self.options.quality,
+                "lossless": self.options.lossless,
+            }
+        if rest:
+            options.update(
+                save_all=True, append_images=rest, duration=self.duration, loop=0
+            )
+        first.save(path, **options)
+        self.frames = []
+        return [path]
+
+
+def make_sink(
+    output_format: OUTPUT_FORMAT,
+    options: ImageOptions | None = None,
+    writer: FrameWriter | None = None,
+) -> FrameSink:
+    """Sink for frames captured as arrays."""
+    options = options or ImageOptions()
+    if saved_by_blender(output_format, options):
+        raise ValueError("EXR and 16-bit PNG frames can only be saved by Blender")
+    if output_format in ("png", "jpeg"):
+        return ImageSink(output_format, options, writer)
+    if output_format == "npz":
+        return NpzSink()
+    if output_format == "npy":
+        return NpySink()
+    return AnimationSink(output_format, options=options)
+
+
+def output_files(
+    output_format: OUTPUT_FORMAT,
+    output_dir: Path,
+    num_frames: int,
+    numbered: bool = True,
+) -> list[Path]:
+    """Files a model's frames are written to in `output_format`.
+
+    Frames are numbered, as in a turntable's render_0.png, render_1.png...
+    Without `numbered`, the single frame of a still is render.png.
+    """
+    extension = IMAGE_FORMATS.get(output_format)
+    if extension is None:
+        return [output_dir / f"{OUTPUT_NAME}.{output_format}"]
+    if not numbered:
+        return [output_dir / f"{OUTPUT_NAME}.{extension}"]
+    return [output_dir / f"{OUTPUT_NAME}_{i}.{extension}" for i in range(num_frames)]
@@ -1,21 +1,39 @@
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import bpy
 
-from .presets import FollowCameraPreset
+from .border import PixelRect, set_border, union
+from .presets import CirclePathPreset, FollowCameraPreset
 from .simple_viewer import SimpleViewer
+from .sinks import IMAGE_FORMATS, output_files
 
 
-class TurntableViewer(SimpleViewer, FollowCameraPreset):
+class TurntableViewer(SimpleViewer, FollowCameraPreset, CirclePathPreset):
     def __init__(
         self,
         num_frames: int = 5,
+        animation_pass: bool = False,
+        border_union: bool = False,
         *args: Any,
         **kwargs: Any,
     ):
         super().__init__(*args, **kwargs)
         self.num_frames = num_frames
+        self.animation_pass = animation_pass
+        self.border_union = border_union
+        # Render every frame_step-th frame from frame_start, to split a
+        # turntable between processes. Only image formats can be written this
+        # way.
+        self.frame_start = 0
+        self.frame_step = 1
+
+    @property
+    def frames(self) -> range:
+        """Frame numbers this viewer renders."""
+        return range(self.frame_start, self.num_frames, self.frame_step)
 
     def setup_scene(self) -> Any:
         # This target is for a look-at point.
@@ -31,7 +49,7 @@ class TurntableViewer(SimpleViewer, FollowCameraPreset):
         )
 
         # Add a camera following a path.
-        follow_path = self.create_circle_path(
+        follow_path = self.add_circle_path(
             radius=self.camera_distance,
             center=(0, 0, self.camera_height),
         )
@@ -45,35 +63,143 @@ class TurntableViewer(SimpleViewer, FollowCameraPreset):
     def render(self, output_path: Path) -> Any:
         output_path.mkdir(parents=True, exist_ok=True)
 
-        R = bpy.context.scene.render
+        R = self.scene.render
         R.resolution_x = self.resolution[0]
         R.resolution_y = self.resolution[1]
         R.film_transparent = self.transparent_background
-        R.image_settings.file_format = "PNG"
-        R.image_settings.color_mode = "RGBA"
+        self.set_image_settings()
 
-        bpy.context.scene.camera = self.camera
+        R.use_border = False
 
+        self.scene.camera = self.camera
+
+        total_frames = self.num_frames
+        # percent to one circle (100%)
+        offsets = [i / total_frames * 100 for i in range(total_frames)]
+        crop = self.border == "crop"
+        rects = self.frame_borders(offsets) if self.border != "none" else []
+
+        frames = self.frames
+        if len(frames) < total_frames and self.output_format not in IMAGE_FORMATS:
+            raise ValueError("only image output can be rendered in parts of frames")
+
+        if self.animation_pass:
+            if self.output_format in ("png", "exr"):
+                if rects:
+                    set_border(R, rects[0], crop)
+                self.render_animation(output_path)
+                self.save_crop_metadata(output_path, rects)
+                self.save_lod_metadata(output_path)
+                return
+            # An animation job can only write files Blender encodes itself, so
+            # frames for a sink are rendered one at a time, still keeping the
+            # scene data around.
+            R.use_persistent_data = True
+
+        with self.frame_writer(output_path, total_frames) as render_frame:
+            for i in frames:
+                self.follow_ctr.offset = offsets[i]
+                if rects:
+                    set_border(R, rects[i], crop)
+                render_frame(i)
+        self.save_crop_metadata(output_path, rects)
+        self.save_lod_metadata(output_path)
+
+    def frame_borders(self, offsets: list[float]) -> list[PixelRect]:
+        """Render border of every frame of the turntable."""
+        rects = []
+        for offset in offsets:
+            self.follow_ctr.offset = offset
+            rects.append(self.model_border())
+
+        # Frames of one animation job, or stacked into one array, share a border.
+        shared = self.animation_pass or (
+            self.border == "crop" and self.output_format not in IMAGE_FORMATS
+        )
+        if self.border_union or shared:
+            rects = [union(rects)] * len(rects)
+        return rects
+
+    def save_crop_metadata(self, output_path: Path, rects: list[PixelRect]) -> None:
+        # The borders of all frames are known to every part of a split
+        # turntable, so the part holding the first frame writes them.
+        if self.frame_start == 0:
+            super().save_crop_metadata(output_path, rects)
+
+    def save_lod_metadata(
+        self, output_path: Path, objects: list[bpy.types.Object] | None = None
+    ) -> None:
+        if self.frame_start == 0:
+            super().save_lod_metadata(output_path, objects)
+
+    def reset(self) -> None:
+        super().reset()
+        self.clear_animation()
+
+    def clear_animation(self) -> None:
+        """Remove the camera keyframes left by `render_animation`."""
+        # Keyframes from an animation pass would override the per-frame offsets.
+        animation = self.camera.animation_data
+        if animation is not None and animation.action is not None:
+            bpy.data.actions.remove(animation.action)
+        self.camera.animation_data_clear()
+        self.scene.frame_step = 1
+        self.scene.frame_set(0)
+
+    def render_animation(self, output_path: Path) -> Any:
+        """Render all frames as one animation job.
+
+        The path offsets are keyframed over the scene frame range, so the render
+        engine keeps its scene data between frames instead of rebuilding it.
+        """
+        scene = self.scene
         total_frames = self.num_frames
 
         for i in range(total_frames):
-            self.follow_ctr.offset = (
-                i / total_frames * 100
-            )  # percent to one circle (100%)
-            file_path = output_path / f"render_{i}.png"
-            R.filepath = self.path_to_str(file_path)
-            bpy.ops.render.render(animation=False, write_still=True)
-
-    def create_circle_path(
-        self,
-        radius: float = 3.0,
-        center: tuple[float, float, float] = (0, 0, 1),
-    ) -> bpy.types.Object:
-        bpy.ops.curve.primitive_bezier_circle_add(
-            radius=radius,
-            location=center,
-        )
-        return bpy.context.object
+            self.follow_ctr.offset = i / total_frames * 100
+            self.follow_ctr.keyframe_insert("offset", frame=i)
+
+        scene.frame_start = self.frame_start
+        scene.frame_end = total_frames - 1
+        scene.frame_step = self.frame_step
+
+        R = scene.render
+        R.use_persistent_data = True
+        # Blender names the frames of an animation job after the frame number
+        # ("#"); `frame_hooks` moves each one to its name in `output_files`.
+        R.filepath = self.path_to_str(output_path / "frame_#")
+        R.use_file_extension = True
+        files = output_files(self.output_format, output_path, total_frames)
+        with self.frame_hooks(scene, files), self.hooks.phase("animation"):
+            bpy.ops.render.render(animation=True, scene=scene.name)
+
+    @contextmanager
+    def frame_hooks(self, scene: bpy.types.Scene, files: list[Path]) -> Iterator[None]:
+        """Move each frame of an animation render to its path in `files`.
+
+        With hooks, each frame is also timed and its file counted.
+        """
+        frame_start = 0.0
+
+        def render_pre(*args: Any) -> None:
+            nonlocal frame_start
+            frame_start = time.perf_counter()
+
+        def render_write(*args: Any) -> None:
+            frame = scene.frame_current
+            Path(scene.render.frame_path(frame=frame)).replace(files[frame])
+            if self.hooks.enabled:
+                self.hooks.add("render", time.perf_counter() - frame_start)
+                self.hooks.wrote(files[frame])
+
+        handlers = bpy.app.handlers
+        handlers.render_pre.append(render_pre)
+        handlers.render_write.append(render_write)
+        try:
+            yield
+        finally:
+            handlers.render_pre.remove(render_pre)
+            handlers.render_write.remove(render_write)
 
 
 if __name__ == "__main__":
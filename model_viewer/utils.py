@@ -1,38 +1,104 @@
 import bpy
-from mathutils import Vector
+import numpy as np
+from mathutils import Matrix
 
+# Datablock types an imported model can bring into `bpy.data`.
+MODEL_DATABLOCK_TYPES = (
+    "objects",
+    "meshes",
+    "materials",
+    "images",
+    "textures",
+    "node_groups",
+)
 
-def scale_to_unit_cube(obj):
-    # Get the object's bounding box corners in world space
-    bbox_corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+# `foreach_get`/`foreach_set` property, NumPy type and width of each mesh
+# attribute type. The NumPy type matches Blender's storage, which keeps
+# `foreach_set` on its bulk path instead of converting item by item.
+ATTRIBUTE_LAYOUT = {
+    "FLOAT": ("value", np.float32, 1),
+    "INT": ("value", np.int32, 1),
+    "INT8": ("value", np.int8, 1),
+    "BOOLEAN": ("value", np.bool_, 1),
+    "FLOAT2": ("vector", np.float32, 2),
+    "FLOAT_VECTOR": ("vector", np.float32, 3),
+    "FLOAT_COLOR": ("color", np.float32, 4),
+    "BYTE_COLOR": ("color", np.float32, 4),
+    "INT16_2D": ("value", np.int16, 2),
+    "INT32_2D": ("value", np.int32, 2),
+    "QUATERNION": ("value", np.float32, 4),
+}
 
-    # Calculate the bounding box dimensions
-    min_x = min(corner.x for corner in bbox_corners)
-    max_x = max(corner.x for corner in bbox_corners)
-    min_y = min(corner.y for corner in bbox_corners)
-    max_y = max(corner.y for corner in bbox_corners)
-    min_z = min(corner.z for corner in bbox_corners)
-    max_z = max(corner.z for corner in bbox_corners)
 
-    width = max_x - min_x
-    height = max_y - min_y
-    depth = max_z - min_z
+def foreach_get(collection, prop: str, dtype, width: int = 1) -> np.ndarray:
+    """Read `prop` of every item of a bpy collection in one bulk `foreach_get`.
 
-    # Calculate scale factors to make the object a unit cube
-    scale_x = 1.0 / width if width != 0 else 1.0
-    scale_y = 1.0 / height if height != 0 else 1.0
-    scale_z = 1.0 / depth if depth != 0 else 1.0
+    Returns a (len(collection), width) array, or a flat one for width 1.
+    """
+    values = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(prop, values)
+    return values.reshape(len(collection), width) if width > 1 else values
 
-    scale_factor = min(scale_x, scale_y, scale_z)
 
-    # Apply scaling to the object
-    obj.scale *= scale_factor
-    bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-    obj.location = (0, 0, 0)
+def normalize_to_unit_cube(obj, apply_to_mesh: bool = False):
+    """Scale the object to fit a unit cube and center it at the origin.
 
+    The bounds and center are computed in one pass, and the result is set as a
+    single object matrix. With `apply_to_mesh`, the scale and translation are
+    instead written to the mesh vertices in one bulk `foreach_set`, keeping the
+    object's rotation. No operators are called, so the selection state does not
+    matter.
+    """
+    linear = np.array(obj.matrix_world.to_3x3(), dtype=np.float64)
+    if apply_to_mesh:
+        local = foreach_get(obj.data.vertices, "co", np.float32, 3)
+    else:
+        local = np.array(obj.bound_box, dtype=np.float64)
 
-def move_object_to_center(obj):
-    bbox_corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
-    bbox_center = sum((Vector(corner) for corner in bbox_corners), Vector()) / 8
-    translation_vector = -bbox_center
-    obj.location += translation_vector
+    world = local @ linear.T
+    lo = world.min(axis=0)
+    hi = world.max(axis=0)
+
+    # Scale by the largest dimension, ignoring flat ones.
+    extent = hi - lo
+    scale = np.ones(3)
+    np.divide(1.0, extent, out=scale, where=extent != 0)
+    scale_factor = scale.min()
+    translation = -(lo + hi) / 2 * scale_factor
+
+    if apply_to_mesh:
+        # Express the translation in the object's rotated frame.
+        offset = np.linalg.solve(linear, translation)
+        coords = local * scale_factor + offset
+        obj.data.vertices.foreach_set("co", coords.astype(np.float32).ravel())
+        obj.data.update()
+        obj.matrix_world = Matrix(linear.tolist()).to_4x4()
+    else:
+        matrix = np.eye(4)
+        matrix[:3, :3] = linear * scale_factor
+        matrix[:3, 3] = translation
+        obj.matrix_world = Matrix(matrix.tolist())
+
+
+def snapshot_datablocks() -> dict[str, set]:
+    """Current datablocks of the types a model import can create."""
+    return {name: set(getattr(bpy.data, name)) for name in MODEL_DATABLOCK_TYPES}
+
+
+def new_datablocks(snapshot: dict[str, set]) -> list[bpy.types.ID]:
+    """Datablocks created since `snapshot` was taken."""
+    return [
+        datablock
+        for name, before in snapshot.items()
+        for datablock in getattr(bpy.data, name)
+        if datablock not in before
+    ]
+
+
+def datablock_count() -> int:
+    """Total number of datablocks in `bpy.data`."""
+    return sum(
+        len(getattr(bpy.data, prop.identifier))
+        for prop in bpy.data.bl_rna.properties
+        if prop.type == "COLLECTION"
+    )
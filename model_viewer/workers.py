@@ -0,0 +1,477 @@
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, Callable, Type
+
+from .batch import RenderJob, ViewerInterface, process_job
+from .instrumentation import PhaseTimer, merge_records, peak_rss
+
+logger = logging.getLogger(__name__)
+
+# Renders one job in a worker, returning its metrics record and error.
+RenderFunction = Callable[[ViewerInterface, RenderJob], tuple[dict | None, str | None]]
+
+# Each worker process owns one viewer, built once by `_init_worker`.
+_worker: dict[str, ViewerInterface] = {}
+
+
+@dataclass
+class WorkerStats:
+    """How many models a worker rendered and how long it was busy."""
+
+    num_models: int = 0
+    num_failed: int = 0
+    """Jobs that failed or timed out, which count towards `busy_time` only."""
+    busy_time: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Models rendered per second of busy time."""
+        return self.num_models / self.busy_time if self.busy_time > 0 else 0.0
+
+
+def threads_per_worker(num_workers: int) -> int:
+    """Split the available cores evenly between the workers."""
+    return max(1, (os.cpu_count() or 1) // num_workers)
+
+
+@contextmanager
+def spawn_safe_sys_path():
+    """Hide bpy's script directory from processes spawned in this block.
+
+    Importing bpy prepends its `scripts/modules` directory to `sys.path`, and
+    spawned children inherit `sys.path`. A child would then resolve `import bpy`
+    to the pure-Python package in that directory instead of the compiled module.
+    """
+    bpy = sys.modules.get("bpy")
+    if bpy is None or bpy.__file__ is None:
+        yield
+        return
+
+    scripts_dir = str(Path(bpy.__file__).parent.parent)
+    saved = list(sys.path)
+    sys.path[:] = [p for p in saved if p != scripts_dir]
+    try:
+        yield
+    finally:
+        sys.path[:] = saved
+
+
+def _init_worker(
+    viewer_cls: Type[ViewerInterface], cls_kwargs: dict[str, Any], metrics: bool
+):
+    viewer = _worker["viewer"] = viewer_cls(**cls_kwargs)
+    if metrics:
+        viewer.set_hooks(PhaseTimer())
+
+
+def _supervised_worker(
+    conn: Connection,
+    viewer_cls: Type[ViewerInterface],
+    cls_kwargs: dict[str, Any],
+    metrics: bool,
+    render: RenderFunction,
+):
+    """Render the jobs received on `conn` with `render` until it sends None.
+
+    Sends None once the viewer is built, then the render seconds, metrics
+    record, error and peak RSS of every job.
+    """
+    _init_worker(viewer_cls, cls_kwargs, metrics)
+    conn.send(None)
+    while (job := conn.recv()) is not None:
+        start = time.perf_counter()
+        record, error = render(_worker["viewer"], job)
+        conn.send((time.perf_counter() - start, record, error, peak_rss()))
+
+
+@dataclass
+class _Worker:
+    """A supervised worker process and the job it is rendering."""
+
+    process: BaseProcess
+    conn: Connection
+    ready: bool = False
+    job: RenderJob | None = None
+    started: float = 0.0
+    num_models: int = 0
+
+    def send(self, job: RenderJob) -> None:
+        self.job, self.started = job, time.perf_counter()
+        self.conn.send(job)
+
+    def stop(self) -> None:
+        """Let the worker exit after its current job."""
+        self.conn.send(None)
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+@dataclass
+class WorkerLimits:
+    """When supervised workers give up on a job or are replaced."""
+
+    timeout: float = 0.0
+    """Seconds a job may take before its worker is killed, 0 for no limit."""
+    recycle_after: int = 0
+    """Replace a worker after this many jobs, 0 to keep it."""
+    recycle_rss: int = 0
+    """Replace a worker once its peak RSS exceeds this many bytes, 0 to keep it."""
+
+
+def exit_error(exitcode: int) -> str:
+    """Error message of a job whose worker exited with `exitcode`."""
+    if exitcode < 0:
+        return f"worker killed by {signal.Signals(-exitcode).name}"
+    return f"worker exited with code {exitcode}"
+
+
+class _Supervisor:
+    """Hands jobs to worker processes and replaces the ones that fail."""
+
+    def __init__(
+        self,
+        viewer_cls: Type[ViewerInterface],
+        cls_kwargs: dict[str, Any],
+        metrics: bool,
+        limits: WorkerLimits,
+        jobs: list[RenderJob],
+        *,
+        render: RenderFunction = process_job,
+    ):
+        self.args = (viewer_cls, cls_kwargs, metrics, render)
+        self.limits = limits
+        self.pending = deque(jobs)
+        # bpy is not fork-safe, so every worker starts from a fresh interpreter.
+        self.ctx = multiprocessing.get_context("spawn")
+        self.workers: list[_Worker] = []
+        self.stats: dict[int, WorkerStats] = defaultdict(WorkerStats)
+
+    def start_worker(self) -> None:
+        conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(
+            target=_supervised_worker, args=(child_conn, *self.args), daemon=True
+        )
+        with spawn_safe_sys_path():
+            process.start()
+        child_conn.close()
+        self.workers.append(_Worker(process, conn))
+
+    def dispatch(self) -> None:
+        """Send the next jobs to idle workers, and stop the ones left without."""
+        for worker in list(self.workers):
+            if worker.ready and worker.job is None:
+                if self.pending:
+                    worker.send(self.pending.popleft())
+                else:
+                    worker.stop()
+                    self.workers.remove(worker)
+
+    def wait(self) -> list[tuple[_Worker, Any]]:
+        """Wait for messages, exits and timeouts of the workers.
+
+        Returns each worker with a message, with "died" for a worker that
+        exited and "timeout" for one whose job took too long.
+        """
+        timeout = self.limits.timeout
+        now = time.perf_counter()
+        deadlines = [w.started + timeout - now for w in self.workers if w.job]
+        ready = wait(
+            [w.conn for w in self.workers] + [w.process.sentinel for w in self.workers],
+            timeout=max(0.0, min(deadlines)) if timeout and deadlines else None,
+        )
+        now = time.perf_counter()
+        events = []
+        for worker in self.workers:
+            if worker.conn in ready:
+                try:
+                    events.append((worker, worker.conn.recv()))
+                except EOFError:
+                    events.append((worker, "died"))
+            elif worker.process.sentinel in ready:
+                events.append((worker, "died"))
+            elif timeout and worker.job and now - worker.started > timeout:
+                events.append((worker, "timeout"))
+        return events
+
+    def handle(self, worker: _Worker, message: Any) -> tuple | None:
+        """Book a worker's message, replacing the worker if needed.
+
+        Returns the finished job with its error, record and seconds, if any.
+        """
+        if message is None:
+            worker.ready = True
+            return None
+        pid = worker.process.pid
+        job, worker.job = worker.job, None
+        if message in ("died", "timeout"):
+            worker.kill()
+            exitcode = worker.process.exitcode
+            if not worker.ready:
+                raise RuntimeError(f"worker {pid} exited with code {exitcode} on start")
+            if job is None:
+                logger.warning(
+                    "worker %d exited with code %s while idle", pid, exitcode
+                )
+                self.replace(worker)
+                return None
+            elapsed = time.perf_counter() - worker.started
+            if message == "timeout":
+                error = f"timed out after {self.limits.timeout:g}s"
+            else:
+                error = exit_error(exitcode)
+            logger.error("%s: %s", job.key, error)
+            record, replace = None, True
+        else:
+            elapsed, record, error, rss = message
+            worker.num_models += 1
+            replace = self.should_recycle(worker, rss)
+        if error is None:
+            self.stats[pid].num_models += 1
+        else:
+            self.stats[pid].num_failed += 1
+        self.stats[pid].busy_time += elapsed
+        if replace:
+            self.replace(worker)
+        return job, error, record, elapsed
+
+    def replace(self, worker: _Worker) -> None:
+        """Retire a worker, starting another one if jobs are left."""
+        self.workers.remove(worker)
+        if worker.process.is_alive():
+            worker.stop()
+        if self.pending:
+            self.start_worker()
+
+    def should_recycle(self, worker: _Worker, rss: int) -> bool:
+        pid = worker.process.pid
+        if self.limits.recycle_after and worker.num_models >= self.limits.recycle_after:
+            logger.info("recycling worker %d after %d models", pid, worker.num_models)
+            return True
+        if self.limits.recycle_rss and rss > self.limits.recycle_rss:
+            logger.info("recycling worker %d at %.0f MB peak RSS", pid, rss / 1e6)
+            return True
+        return False
+
+    def kill_all(self) -> None:
+        for worker in self.workers:
+            worker.kill()
+        self.workers.clear()
+
+
+def render_parallel(
+    jobs: list[RenderJob],
+    num_workers: int,
+    viewer_cls: Type[ViewerInterface],
+    *,
+    on_done: Callable[[RenderJob, dict | None, float], None] | None = None,
+    on_failed: Callable[[RenderJob, str, float], None] | None = None,
+    metrics: bool = False,
+    limits: WorkerLimits | None = None,
+    **cls_kwargs: Any,
+) -> dict[int, WorkerStats]:
+    """Render `jobs` on `num_workers` processes, each with its own viewer.
+
+    `on_done` is called in this process as each job finishes, with the job's
+    metrics record if `metrics` is set and its render seconds. A job that
+    raises is passed to `on_failed` with its error message instead, or stops
+    the run without `on_failed`. Returns the per-worker statistics keyed by
+    worker pid.
+
+    The workers are supervised: a job whose worker dies, e.g. in a crash
+    inside Blender, or that outlasts the timeout of `limits` fails like a job
+    that raises, and the worker is replaced. `limits` can also replace workers
+    after a number of jobs or above an RSS threshold, so memory that bpy never
+    frees doesn't pile up over long runs.
+    """
+    if not cls_kwargs.get("threads"):
+        cls_kwargs["threads"] = threads_per_worker(num_workers)
+    supervisor = _Supervisor(
+        viewer_cls, cls_kwargs, metrics, limits or WorkerLimits(), jobs
+    )
+    try:
+        for _ in range(min(num_workers, len(jobs))):
+            supervisor.start_worker()
+        supervisor.dispatch()
+        while supervisor.workers:
+            for worker, message in supervisor.wait():
+                finished = supervisor.handle(worker, message)
+                if finished is None:
+                    continue
+                job, error, record, elapsed = finished
+                if error is None:
+                    if on_done is not None:
+                        on_done(job, record, elapsed)
+                elif on_failed is None:
+                    raise RuntimeError(f"failed to render {job.key}: {error}")
+                else:
+                    on_failed(job, error, elapsed)
+            supervisor.dispatch()
+    finally:
+        supervisor.kill_all()
+    return dict(supervisor.stats)
+
+
+@dataclass
+class FrameStats:
+    """Wall time of the turntables rendered by `render_frames_parallel`.
+
+    Busy time is not a measure of the speedup: parts that share cores each
+    take longer. Compare the wall time with one process instead, as
+    scripts/benchmark_frame_parallel.py does.
+    """
+
+    num_models: int = 0
+    num_failed: int = 0
+    wall_time: float = 0.0
+    """Sum over rendered models of the time from the first part starting to
+    the last part finishing."""
+
+
+@dataclass
+class _FramePart(RenderJob):
+    """A job's share of the turntable frames: every `num_parts`-th frame from
+    frame `part`."""
+
+    part: int = 0
+    num_parts: int = 1
+
+
+def _render_part(
+    viewer: ViewerInterface, job: _FramePart
+) -> tuple[dict | None, str | None]:
+    viewer.frame_start, viewer.frame_step = job.part, job.num_parts
+    return process_job(viewer, job)
+
+
+def render_frames_parallel(
+    jobs: list[RenderJob],
+    num_workers: int,
+    viewer_cls: Type[ViewerInterface],
+    *,
+    on_done: Callable[[RenderJob, dict | None, float], None] | None = None,
+    on_failed: Callable[[RenderJob, str, float], None] | None = None,
+    metrics: bool = False,
+    limits: WorkerLimits | None = None,
+    **cls_kwargs: Any,
+) -> FrameStats:
+    """Render each turntable with its frames split over `num_workers` processes.
+
+    Every worker loads the model and renders an interleaved share of the
+    frames (worker w renders frames w, w + n, w + 2n...), so neighbouring
+    frames of similar cost are spread evenly. Models are rendered one after
+    another; callbacks work as in `render_parallel`, with the wall time of
+    each model. The workers are supervised like those of `render_parallel`,
+    and a part that fails, dies or times out fails its model.
+    """
+    if not cls_kwargs.get("threads"):
+        cls_kwargs["threads"] = threads_per_worker(num_workers)
+    by_key = {job.key: job for job in jobs}
+    tasks = [
+        _FramePart(job.model_path, job.output_dir, job.key, part, num_workers)
+        for job in jobs
+        for part in range(num_workers)
+    ]
+    parts: dict[str, list[tuple]] = defaultdict(list)
+    stats = FrameStats()
+
+    supervisor = _Supervisor(
+        viewer_cls,
+        cls_kwargs,
+        metrics,
+        limits or WorkerLimits(),
+        tasks,
+        render=_render_part,
+    )
+    try:
+        for _ in range(min(num_workers, len(tasks))):
+            supervisor.start_worker()
+        supervisor.dispatch()
+        while supervisor.workers:
+            for worker, message in supervisor.wait():
+                # Both ends on this process's clock, as parts run elsewhere.
+                start = worker.started
+                finished = supervisor.handle(worker, message)
+                if finished is None:
+                    continue
+                task, error, record, _ = finished
+                parts[task.key].append((start, time.perf_counter(), record, error))
+                if len(parts[task.key]) < num_workers:
+                    continue
+
+                job = by_key[task.key]
+                starts, ends, records, errors = zip(*parts.pop(task.key))
+                wall_time = max(ends) - min(starts)
+                errors = [e for e in errors if e is not None]
+                if errors:
+                    stats.num_failed += 1
+                    if on_failed is None:
+                        raise RuntimeError(f"failed to render {job.key}: {errors[0]}")
+                    on_failed(job, errors[0], wall_time)
+                    continue
+
+                stats.num_models += 1
+                stats.wall_time += wall_time
+                logger.info(
+                    "rendered %s in %.2fs on %d processes",
+                    job.key,
+                    wall_time,
+                    num_workers,
+                )
+                if on_done is not None:
+                    merged = merge_records(records, wall_time) if metrics else None
+                    on_done(job, merged, wall_time)
+            supervisor.dispatch()
+    finally:
+        supervisor.kill_all()
+    return stats
+
+
+def log_frame_summary(stats: FrameStats, num_workers: int, wall_time: float) -> None:
+    rate = stats.num_models / wall_time if wall_time > 0 else 0.0
+    logger.info(
+        "rendered %d turntables, %d failed, with frames split over %d processes "
+        "in %.1fs (%.2f models/s)",
+        stats.num_models,
+        stats.num_failed,
+        num_workers,
+        wall_time,
+        rate,
+    )
+
+
+def log_summary(stats: dict[int, WorkerStats], wall_time: float) -> None:
+    total = sum(s.num_models for s in stats.values())
+    failed = sum(s.num_failed for s in stats.values())
+    for i, (pid, s) in enumerate(sorted(stats.items())):
+        logger.info(
+            "worker %d (pid %d): %d models, %d failed in %.1fs (%.2f models/s)",
+            i,
+            pid,
+            s.num_models,
+            s.num_failed,
+            s.busy_time,
+            s.throughput,
+        )
+    rate = total / wall_time if wall_time > 0 else 0.0
+    logger.info(
+        "rendered %d models, %d failed, with %d workers in %.1fs (%.2f models/s)",
+        total,
+        failed,
+        len(stats),
+        wall_time,
+        rate,
+    )
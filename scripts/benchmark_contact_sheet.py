@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Compare the throughput of rendering many small models one per image and K per
+contact sheet.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import ContactSheetViewer  # noqa: E402
+from model_viewer.batch import RenderJob  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+
+DEFAULT_SHEET_SIZES = [1, 16, 63]
+
+
+def time_sheets(model_path, sheet_size, args):
+    """Render `args.count` copies of the model and return models per second."""
+    viewer = ContactSheetViewer(
+        sheet_size=sheet_size,
+        width=args.width,
+        height=args.height,
+        engine=args.engine,
+        profile=args.profile,
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        jobs = [
+            RenderJob(model_path, Path(output_dir) / str(i), str(i))
+            for i in range(args.count)
+        ]
+        start = time.perf_counter()
+        viewer.render_jobs(jobs)
+        elapsed = time.perf_counter() - start
+    return args.count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, required=True)
+    parser.add_argument(
+        "--sheet-sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SHEET_SIZES,
+        help=f"Models per image to benchmark (default: {DEFAULT_SHEET_SIZES})",
+    )
+    parser.add_argument(
+        "--count", type=int, default=63, help="Models rendered per run (default: 63)"
+    )
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--height", type=int, default=256)
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINE_IDS),
+        default=None,
+        help="Render engine (default: Blender's factory setting)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=None,
+        help="Render quality profile (default: Blender's factory settings)",
+    )
+    args = parser.parse_args()
+
+    rows = [
+        (sheet_size, time_sheets(args.model_path, sheet_size, args))
+        for sheet_size in args.sheet_sizes
+    ]
+    baseline = rows[0][1]
+
+    print()
+    print(f"{'sheet size':>10} {'models/s':>10} {'speedup':>9}")
+    for sheet_size, throughput in rows:
+        print(f"{sheet_size:>10} {throughput:>10.2f} {throughput / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
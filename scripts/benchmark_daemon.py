@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Compare the latency of rendering one model with a cold `main.py` run and with
+a warm render daemon.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from model_viewer.daemon import submit, wait_until_ready  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+
+
+def config_args(args) -> dict:
+    config = {"width": args.width, "height": args.height}
+    if args.engine:
+        config["engine"] = args.engine
+    if args.profile:
+        config["profile"] = args.profile
+    return config
+
+
+def time_cold(model_path: Path, output_dir: Path, args) -> float:
+    """Wall time of one `main.py simple` process."""
+    cmd = [
+        sys.executable,
+        str(ROOT / "main.py"),
+        "simple",
+        "--model-path",
+        str(model_path),
+        "--output-dir",
+        str(output_dir),
+        "--no-save-to-blend",
+    ]
+    for key, value in config_args(args).items():
+        cmd += [f"--config.{key.replace('_', '-')}", str(value)]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def time_warm(model_path: Path, output_dir: Path, socket_path: Path, args) -> float:
+    """Round-trip time of one job sent to the daemon."""
+    start = time.perf_counter()
+    response = submit(
+        {
+            "viewer": "simple",
+            "model_path": str(model_path),
+            "output_dir": str(output_dir),
+            "config": config_args(args),
+        },
+        socket_path,
+    )
+    elapsed = time.perf_counter() - start
+    if response["status"] != "ok":
+        raise RuntimeError(response["error"])
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, required=True)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--height", type=int, default=256)
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINE_IDS),
+        default=None,
+        help="Render engine (default: Blender's factory setting)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=None,
+        help="Render quality profile (default: Blender's factory settings)",
+    )
+    args = parser.parse_args()
+    model_path = args.model_path.absolute()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        cold = [
+            time_cold(model_path, tmp / f"cold_{i}", args) for i in range(args.repeats)
+        ]
+
+        socket_path = tmp / "daemon.sock"
+        daemon = subprocess.Popen(
+            [
+                sys.executable,
+                str(ROOT / "main.py"),
+                "serve",
+                "--socket-path",
+                str(socket_path),
+                "--preload",
+                "None",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(socket_path)
+            # The first job builds the viewer for this config.
+            first = time_warm(model_path, tmp / "first", socket_path, args)
+            warm = [
+                time_warm(model_path, tmp / f"warm_{i}", socket_path, args)
+                for i in range(args.repeats)
+            ]
+            submit({"command": "shutdown"}, socket_path)
+        finally:
+            daemon.wait(timeout=60)
+
+    print()
+    print(f"{'mode':>20} {'median s':>10} {'min s':>8}")
+    print(f"{'cold main.py':>20} {statistics.median(cold):>10.3f} {min(cold):>8.3f}")
+    print(f"{'daemon, new viewer':>20} {first:>10.3f} {first:>8.3f}")
+    print(f"{'daemon, warm':>20} {statistics.median(warm):>10.3f} {min(warm):>8.3f}")
+    print(f"\nwarm speedup: {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Compare the wall time of one turntable rendered in a single process and with
+its frames split over several worker processes.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import TurntableViewer  # noqa: E402
+from model_viewer.batch import RenderJob, process  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+from model_viewer.workers import render_frames_parallel  # noqa: E402
+
+DEFAULT_WORKERS = [2, 4]
+
+
+def viewer_kwargs(args) -> dict:
+    return {
+        "num_frames": args.frames,
+        "width": args.width,
+        "height": args.height,
+        "engine": args.engine,
+        "profile": args.profile,
+    }
+
+
+def time_sequential(model_path, args):
+    """Wall time of loading and rendering the turntable in this process."""
+    viewer = TurntableViewer(**viewer_kwargs(args))
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        process(viewer, model_path, Path(output_dir))
+        return time.perf_counter() - start
+
+
+def time_split(model_path, num_workers, args):
+    """Wall time of the split turntable, with and without starting the workers."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        job = RenderJob(model_path, Path(output_dir), model_path.name)
+        start = time.perf_counter()
+        stats = render_frames_parallel(
+            [job], num_workers, TurntableViewer, **viewer_kwargs(args)
+        )
+        return time.perf_counter() - start, stats.wall_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, required=True)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=DEFAULT_WORKERS,
+        help=f"Worker counts to benchmark (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=512)
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINE_IDS),
+        default=None,
+        help="Render engine (default: Blender's factory setting)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=None,
+        help="Render quality profile (default: Blender's factory settings)",
+    )
+    args = parser.parse_args()
+    model_path = args.model_path.absolute()
+
+    sequential = time_sequential(model_path, args)
+    rows = [(n, *time_split(model_path, n, args)) for n in args.workers]
+
+    print()
+    print(f"{'workers':>8} {'wall s':>8} {'speedup':>9} {'render s':>9} {'speedup':>9}")
+    print(f"{1:>8} {sequential:>8.2f} {1:>8.2f}x {sequential:>9.2f} {1:>8.2f}x")
+    for n, wall, render in rows:
+        print(
+            f"{n:>8} {wall:>8.2f} {sequential / wall:>8.2f}x "
+            f"{render:>9.2f} {sequential / render:>8.2f}x"
+        )
+    print("\nwall s includes starting the workers, render s only the turntable.")
+
+
+if __name__ == "__main__":
+    main()
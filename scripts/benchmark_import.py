@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare Blender's OBJ import operator with the NumPy importer on generated
+small, medium and huge meshes.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer.fast_import import import_obj  # noqa: E402
+
+# Grid subdivisions per side; the grid has about 2 * n^2 triangles.
+DEFAULT_SIZES = {"small": 70, "medium": 500, "huge": 1450}
+
+
+def write_grid(path, subdivisions):
+    """Write a displaced grid with UVs and normals to an OBJ file."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    bpy.ops.mesh.primitive_grid_add(
+        x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=2.0
+    )
+    obj = bpy.context.object
+    modifier = obj.modifiers.new("displace", "DISPLACE")
+    modifier.texture = bpy.data.textures.new("noise", "CLOUDS")
+    bpy.ops.object.modifier_apply(modifier=modifier.name)
+    bpy.ops.wm.obj_export(filepath=str(path), export_materials=False)
+    return len(obj.data.polygons) * 2
+
+
+def time_import(model_path, importer, repeats):
+    """Return the best import time in seconds over `repeats` runs."""
+    best = float("inf")
+    for _ in range(repeats):
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+        start = time.perf_counter()
+        if importer == "numpy":
+            import_obj(model_path, forward_axis="Y", up_axis="Z")
+        else:
+            bpy.ops.wm.obj_import(
+                filepath=str(model_path), forward_axis="Y", up_axis="Z"
+            )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        choices=list(DEFAULT_SIZES),
+        help="Mesh sizes to benchmark (default: all)",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            model_path = Path(tmp_dir) / f"{size}.obj"
+            triangles = write_grid(model_path, DEFAULT_SIZES[size])
+            size_mb = model_path.stat().st_size / (1024 * 1024)
+            operator = time_import(model_path, "operator", args.repeats)
+            numpy = time_import(model_path, "numpy", args.repeats)
+            rows.append((size, triangles, size_mb, operator, numpy))
+
+    print()
+    print(
+        f"{'mesh':>8} {'triangles':>10} {'MB':>8} {'operator s':>11} "
+        f"{'numpy s':>9} {'speedup':>8}"
+    )
+    for size, triangles, size_mb, operator, numpy in rows:
+        print(
+            f"{size:>8} {triangles:>10} {size_mb:>8.1f} {operator:>11.3f} "
+            f"{numpy:>9.3f} {operator / numpy:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
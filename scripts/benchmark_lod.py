@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare the time of rendering a model at full resolution and simplified to
+several triangle budgets.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import SimpleViewer  # noqa: E402
+from model_viewer.batch import process  # noqa: E402
+from model_viewer.lod import LOD_NAME  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+
+DEFAULT_BUDGETS = [100_000, 20_000, 5_000]
+
+
+def time_render(model_path, budget, args):
+    """Wall time of loading and rendering the model, and triangles rendered."""
+    viewer = SimpleViewer(
+        width=args.width,
+        height=args.height,
+        engine=args.engine,
+        profile=args.profile,
+        max_triangles=budget,
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        process(viewer, model_path, Path(output_dir))
+        seconds = time.perf_counter() - start
+        lod_path = Path(output_dir) / LOD_NAME
+        triangles = (
+            json.loads(lod_path.read_text())["rendered_triangles"]
+            if lod_path.exists()
+            else None
+        )
+    return seconds, triangles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, required=True)
+    parser.add_argument(
+        "--budgets",
+        type=int,
+        nargs="+",
+        default=DEFAULT_BUDGETS,
+        help=f"Triangle budgets to benchmark (default: {DEFAULT_BUDGETS})",
+    )
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=512)
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINE_IDS),
+        default=None,
+        help="Render engine (default: Blender's factory setting)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=None,
+        help="Render quality profile (default: Blender's factory settings)",
+    )
+    args = parser.parse_args()
+    model_path = args.model_path.absolute()
+
+    full, _ = time_render(model_path, 0, args)
+    rows = [(budget, *time_render(model_path, budget, args)) for budget in args.budgets]
+
+    print()
+    print(f"{'budget':>8} {'triangles':>10} {'wall s':>8} {'speedup':>9}")
+    print(f"{'full':>8} {'-':>10} {full:>8.2f} {1:>8.2f}x")
+    for budget, seconds, triangles in rows:
+        print(f"{budget:>8} {triangles:>10} {seconds:>8.2f} {full / seconds:>8.2f}x")
+    print("\nwall s includes importing and simplifying the model.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare loading models with each importer against building them from the mesh
+cache, on generated small, medium and huge meshes.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_import import DEFAULT_SIZES, write_grid  # noqa: E402
+
+from model_viewer import SimpleViewer  # noqa: E402
+
+IMPORTERS = ["operator", "numpy"]
+
+
+def time_load(viewer, model_path, repeats):
+    """Best time of importing and normalizing the model over `repeats` runs."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        obj = viewer.import_model(model_path)
+        best = min(best, time.perf_counter() - start)
+        viewer.unload_model(obj)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        choices=list(DEFAULT_SIZES),
+        help="Mesh sizes to benchmark (default: all)",
+    )
+    parser.add_argument("--importers", nargs="+", default=IMPORTERS, choices=IMPORTERS)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_name:
+        tmp_dir = Path(tmp_name)
+        models = {}
+        for size in args.sizes:
+            models[size] = tmp_dir / f"{size}.obj"
+            write_grid(models[size], DEFAULT_SIZES[size])
+
+        for importer in args.importers:
+            viewer = SimpleViewer(importer=importer)
+            cached = SimpleViewer(importer=importer, mesh_cache=tmp_dir / importer)
+            for size, model_path in models.items():
+                uncached = time_load(viewer, model_path, args.repeats)
+                # The first load misses and stores the mesh, the others hit.
+                start = time.perf_counter()
+                cached.unload_model(cached.import_model(model_path))
+                miss = time.perf_counter() - start
+                hit = time_load(cached, model_path, args.repeats)
+                rows.append((size, importer, uncached, miss, hit))
+
+    print()
+    print(
+        f"{'mesh':>8} {'importer':>9} {'import s':>9} {'miss s':>8} "
+        f"{'hit s':>8} {'speedup':>8}"
+    )
+    for size, importer, uncached, miss, hit in rows:
+        print(
+            f"{size:>8} {importer:>9} {uncached:>9.3f} {miss:>8.3f} "
+            f"{hit:>8.3f} {uncached / hit:>7.1f}x"
+        )
+    print("\nmiss s includes storing the mesh, hit s hashing the model files.")
+
+
+if __name__ == "__main__":
+    main()
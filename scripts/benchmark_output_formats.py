@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare bytes per frame and wall time per frame of the output formats, by
+rendering a turntable in each. Also shows how long the render thread waits
+for writes, with frames encoded on writer threads or in the render thread.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import TurntableViewer  # noqa: E402
+from model_viewer.instrumentation import PhaseTimer  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+
+FORMATS = {
+    "png, zlib 1": {"output_format": "png", "png_compression": 1},
+    "png, zlib 6": {"output_format": "png", "png_compression": 6},
+    "png, zlib 9": {"output_format": "png", "png_compression": 9},
+    "png, 16-bit": {"output_format": "png", "png_depth": 16},
+    "jpeg, q90": {"output_format": "jpeg", "quality": 90},
+    "webp, q90": {"output_format": "webp", "quality": 90},
+    "webp, lossless": {"output_format": "webp", "lossless": True},
+    "exr, float": {"output_format": "exr"},
+    "npz": {"output_format": "npz"},
+}
+
+
+def time_format(model_path: Path, writer_threads: int, args, **kwargs):
+    """Seconds per frame, seconds waiting for writes per frame, bytes per frame."""
+    viewer = TurntableViewer(
+        num_frames=args.frames,
+        width=args.width,
+        height=args.height,
+        engine=args.engine,
+        profile=args.profile,
+        writer_threads=writer_threads,
+        **kwargs,
+    )
+    viewer.hooks = PhaseTimer()
+    obj = viewer.load_model(model_path)
+    with tempfile.TemporaryDirectory() as output_dir:
+        viewer.hooks.begin_model(model_path)
+        start = time.perf_counter()
+        viewer.render(Path(output_dir))
+        elapsed = time.perf_counter() - start
+        record = viewer.hooks.end_model()
+        size = sum(path.stat().st_size for path in Path(output_dir).iterdir())
+    viewer.unload_model(obj)
+    viewer.writer.close()
+    waited = sum(record["phases"].get("write", []))
+    return elapsed / args.frames, waited / args.frames, size / args.frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, required=True)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=list(FORMATS),
+        default=list(FORMATS),
+        metavar="FORMAT",
+        help=f"Formats to benchmark (default: all of {list(FORMATS)})",
+    )
+    parser.add_argument(
+        "--writer-threads",
+        type=int,
+        nargs="+",
+        default=[0, 2],
+        help="Writer thread counts to compare, 0 writes in the render thread",
+    )
+    parser.add_argument("--width", type=int, default=1080)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--engine", choices=list(ENGINE_IDS), default=None)
+    parser.add_argument("--profile", choices=list(PROFILES), default=None)
+    args = parser.parse_args()
+    model_path = args.model_path.absolute()
+
+    rows = []
+    for name in args.formats:
+        for threads in args.writer_threads:
+            rows.append(
+                (
+                    name,
+                    threads,
+                    *time_format(model_path, threads, args, **FORMATS[name]),
+                )
+            )
+
+    print(
+        f"\n{'format':<16} {'writers':>8} {'s/frame':>9} {'wait ms':>8} {'KB/frame':>9}"
+    )
+    for name, threads, seconds, waited, size in rows:
+        print(
+            f"{name:<16} {threads:>8} {seconds:>9.3f} {waited * 1e3:>8.1f} "
+            f"{size / 1e3:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Measure the time per image of every render engine and quality profile on a
+reference mesh.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import SimpleViewer  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+
+
+def time_profile(model_path, engine, profile, args):
+    """Return the best render time in seconds over `args.repeats` images."""
+    viewer = SimpleViewer(
+        width=args.width,
+        height=args.height,
+        engine=engine,
+        profile=profile,
+        threads=args.threads,
+    )
+    obj = viewer.load_model(model_path)
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            viewer.render(Path(output_dir))
+            best = min(best, time.perf_counter() - start)
+    viewer.unload_model(obj)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, required=True)
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=list(ENGINE_IDS),
+        default=list(ENGINE_IDS),
+        help="Render engines to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=list(PROFILES),
+        default=list(PROFILES),
+        help="Quality profiles to benchmark (default: all)",
+    )
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    times = {
+        (engine, profile): time_profile(args.model_path, engine, profile, args)
+        for engine in args.engines
+        for profile in args.profiles
+    }
+
+    print()
+    print(f"{'engine':>10} " + " ".join(f"{p + ' s':>11}" for p in args.profiles))
+    for engine in args.engines:
+        row = " ".join(f"{times[engine, p]:>11.3f}" for p in args.profiles)
+        print(f"{engine:>10} {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Time building the scene of each viewer: lights, camera, track target and
+turntable path. Also time switching between two configs for every model, by
+building a new viewer on every switch or by keeping each viewer in its own
+scene.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import (  # noqa: E402
+    ContactSheetViewer,
+    SimpleViewer,
+    TurntableViewer,
+)
+from model_viewer.batch import process  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+
+VIEWERS = {
+    "simple": SimpleViewer,
+    "turntable": TurntableViewer,
+    "sheet (16 cells)": ContactSheetViewer,
+}
+
+
+def timed(viewer_cls):
+    """Subclass of `viewer_cls` recording how long `setup_scene` takes."""
+
+    class Timed(viewer_cls):
+        def setup_scene(self):
+            start = time.perf_counter()
+            super().setup_scene()
+            self.setup_seconds = time.perf_counter() - start
+
+    return Timed
+
+
+def time_setup(viewer_cls, repeat: int, **kwargs) -> tuple[float, float]:
+    """Median seconds of building a viewer, and of its `setup_scene` alone."""
+    totals, setups = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        viewer = timed(viewer_cls)(**kwargs)
+        totals.append(time.perf_counter() - start)
+        setups.append(viewer.setup_seconds)
+    return statistics.median(totals), statistics.median(setups)
+
+
+def time_switching(model_path: Path, num_models: int, scenes: bool, args) -> float:
+    """Seconds to render every model with two configs, alternating between them.
+
+    Without `scenes`, every switch builds a new viewer, resetting Blender.
+    """
+    configs = [
+        {"width": args.width, "height": args.height},
+        {"width": args.width // 2, "height": args.height // 2, "camera_height": 0.5},
+    ]
+    for config in configs:
+        config.update(engine=args.engine, profile=args.profile)
+    viewers = (
+        [SimpleViewer(scene=f"config {i}", **c) for i, c in enumerate(configs)]
+        if scenes
+        else None
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        for i in range(num_models):
+            for j, config in enumerate(configs):
+                viewer = viewers[j] if scenes else SimpleViewer(**config)
+                process(viewer, model_path, Path(output_dir) / f"{i}_{j}")
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--models", type=int, default=5, help="Models rendered when switching"
+    )
+    parser.add_argument("--width", type=int, default=128)
+    parser.add_argument("--height", type=int, default=128)
+    parser.add_argument("--engine", choices=list(ENGINE_IDS), default=None)
+    parser.add_argument("--profile", choices=list(PROFILES), default=None)
+    args = parser.parse_args()
+
+    print(f"\n{'viewer':<18} {'build ms':>9} {'setup_scene ms':>15}")
+    for name, viewer_cls in VIEWERS.items():
+        total, setup = time_setup(viewer_cls, args.repeat)
+        print(f"{name:<18} {total * 1e3:>9.1f} {setup * 1e3:>15.1f}")
+    total, setup = time_setup(SimpleViewer, args.repeat, scene="benchmark")
+    print(f"{'simple, new scene':<18} {total * 1e3:>9.1f} {setup * 1e3:>15.1f}")
+
+    if args.model_path is not None:
+        model_path = args.model_path.absolute()
+        rebuild = time_switching(model_path, args.models, False, args)
+        scenes = time_switching(model_path, args.models, True, args)
+        print(f"\nTwo configs, {args.models} models each:")
+        print(f"  new viewer per switch  {rebuild:>7.2f}s")
+        print(f"  one scene per config   {scenes:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
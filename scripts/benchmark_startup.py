@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Time how long main.py takes to show its help, reject a bad argument and plan a
+dry run, each in a new Python process, and list the slowest imports.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MAIN = str(ROOT / "main.py")
+
+
+def best_of(command: list[str], repeat: int) -> float:
+    """Fastest wall time of running the command, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, capture_output=True, check=False)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def top_imports(args: list[str], count: int) -> list[tuple[float, str]]:
+    """Modules with the largest cumulative import time, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", MAIN, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        # Only top-level imports, as nested ones are part of their parents.
+        if match and not match.group(2):
+            rows.append((int(match.group(1)) / 1e6, match.group(3)))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--model-path",
+        "-m",
+        type=Path,
+        default=None,
+        help="Model or folder to plan a --dry-run of (default: skip the dry run)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--imports", type=int, default=10, help="Imports to list")
+    args = parser.parse_args()
+
+    commands = {
+        "python -c pass": [sys.executable, "-c", "pass"],
+        "main.py -h": [sys.executable, MAIN, "-h"],
+        "main.py simple -h": [sys.executable, MAIN, "simple", "-h"],
+        "bad argument": [sys.executable, MAIN, "simple", "--no-such-option"],
+    }
+    with tempfile.TemporaryDirectory() as output_dir:
+        if args.model_path is not None:
+            commands["simple --dry-run"] = [
+                sys.executable,
+                MAIN,
+                "simple",
+                "--model-path",
+                str(args.model_path.absolute()),
+                "--output-dir",
+                output_dir,
+                "--dry-run",
+            ]
+        rows = [
+            (name, best_of(command, args.repeat)) for name, command in commands.items()
+        ]
+
+    print(f"\n{'command':<20} {'best s':>8}")
+    for name, seconds in rows:
+        print(f"{name:<20} {seconds:>8.3f}")
+
+    print(f"\n{'import':<30} {'cum. s':>8}")
+    for seconds, module in top_imports(["-h"], args.imports):
+        print(f"{module:<30} {seconds:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compare per-frame wall time of the per-frame turntable loop and the single
+animation render pass.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import TurntableViewer  # noqa: E402
+from model_viewer.profiles import ENGINE_IDS, PROFILES  # noqa: E402
+
+DEFAULT_FRAMES = [30, 120]
+
+
+def time_turntable(model_path, num_frames, animation_pass, args):
+    """Render one turntable and return the wall time per frame in seconds."""
+    viewer = TurntableViewer(
+        num_frames=num_frames,
+        animation_pass=animation_pass,
+        width=args.width,
+        height=args.height,
+        engine=args.engine,
+        profile=args.profile,
+    )
+    obj = viewer.load_model(model_path)
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        viewer.render(Path(output_dir))
+        elapsed = time.perf_counter() - start
+    viewer.unload_model(obj)
+    return elapsed / num_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, required=True)
+    parser.add_argument(
+        "--frames",
+        type=int,
+        nargs="+",
+        default=DEFAULT_FRAMES,
+        help=f"Frame counts to benchmark (default: {DEFAULT_FRAMES})",
+    )
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--height", type=int, default=256)
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINE_IDS),
+        default=None,
+        help="Render engine (default: Blender's factory setting)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=None,
+        help="Render quality profile (default: Blender's factory settings)",
+    )
+    args = parser.parse_args()
+
+    rows = []
+    for num_frames in args.frames:
+        loop = time_turntable(args.model_path, num_frames, False, args)
+        animation = time_turntable(args.model_path, num_frames, True, args)
+        rows.append((num_frames, loop, animation))
+
+    print()
+    print(
+        f"{'frames':>8} {'loop s/frame':>14} {'animation s/frame':>19} {'speedup':>9}"
+    )
+    for num_frames, loop, animation in rows:
+        speedup = loop / animation
+        print(f"{num_frames:>8} {loop:>14.3f} {animation:>19.3f} {speedup:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
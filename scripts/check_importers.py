@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Render the same OBJ files through Blender's import operator and the NumPy
+importer and compare the pixels. Exits with status 1 if more than
+--tolerance of the pixels of any render differ by more than 2 levels: the
+operator stores custom normals in a 16-bit encoding, which moves a few
+noisy path-traced samples. Without --model-path, a cube and a displaced grid
+with normals and UVs are generated.
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_viewer import SimpleViewer  # noqa: E402
+from model_viewer.capture import capture_frame  # noqa: E402
+
+# Pixels closer than this, in 8-bit levels, count as equal.
+MAX_LEVELS = 2
+
+
+def write_models(output_dir: Path) -> list[Path]:
+    """Write a cube and a displaced grid, with UVs and normals, as OBJ files."""
+    paths = []
+    for name in ("cube", "grid"):
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+        if name == "cube":
+            bpy.ops.mesh.primitive_cube_add()
+        else:
+            bpy.ops.mesh.primitive_grid_add(
+                x_subdivisions=40, y_subdivisions=40, size=2.0
+            )
+            obj = bpy.context.object
+            modifier = obj.modifiers.new("displace", "DISPLACE")
+            modifier.texture = bpy.data.textures.new("noise", "CLOUDS")
+            bpy.ops.object.modifier_apply(modifier=modifier.name)
+            bpy.ops.object.shade_smooth()
+        path = output_dir / f"{name}.obj"
+        bpy.ops.wm.obj_export(filepath=str(path), export_materials=False)
+        paths.append(path)
+    return paths
+
+
+def render(model_path: Path, importer: str, args) -> np.ndarray:
+    viewer = SimpleViewer(
+        width=args.width,
+        height=args.height,
+        engine="CYCLES",
+        importer=importer,
+        threads=1,
+    )
+    # Noise would differ between runs otherwise.
+    viewer.scene.cycles.samples = args.samples
+    viewer.scene.cycles.use_denoising = False
+    viewer.scene.cycles.seed = 0
+    viewer.load_model(model_path)
+    with tempfile.TemporaryDirectory() as output_dir:
+        viewer.render(Path(output_dir))
+    return capture_frame(viewer.scene)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", "-m", type=Path, nargs="+", default=None)
+    parser.add_argument("--width", type=int, default=128)
+    parser.add_argument("--height", type=int, default=128)
+    parser.add_argument("--samples", type=int, default=16)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.001,
+        help="Fraction of pixels allowed to differ (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        model_paths = args.model_path or write_models(Path(model_dir))
+        failed = False
+        for model_path in (path.absolute() for path in model_paths):
+            operator = render(model_path, "operator", args).astype(int)
+            numpy = render(model_path, "numpy", args).astype(int)
+            diff = np.abs(operator - numpy).max(axis=-1)
+            differing = float((diff > MAX_LEVELS).mean())
+            failed |= differing > args.tolerance
+            print(
+                f"{model_path.name:<30} max pixel difference {diff.max()}, "
+                f"{differing:.4%} of pixels differ"
+            )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,11 @@
 Convert image sequences in *_textured folders to animated GIFs.
 """
 
-import os
-import sys
 import argparse
+import re
 import subprocess
-import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Default configuration
@@ -15,25 +15,20 @@ DEFAULT_DELAY = 10  # Delay between frames in 1/100th of a second (10 = 0.1s)
 DEFAULT_LOOP = 0  # 0 = infinite loop
 DEFAULT_RESIZE = "50%"  # Resize to 50% to reduce file size, or None to keep original
 DEFAULT_OUTPUT_DIR = "output/texture_outs_gif"
+ENCODERS = ["imagemagick", "pillow"]
+
 
 def natural_sort_key(s):
     """Sort filenames naturally (render_2.png before render_10.png)"""
-    import re
-    return [int(text) if text.isdigit() else text.lower()
-            for text in re.split('([0-9]+)', str(s))]
+    return [
+        int(text) if text.isdigit() else text.lower()
+        for text in re.split("([0-9]+)", str(s))
+    ]
 
-def create_gif(textured_folder, delay, loop, resize, output_base_dir=None, input_base_dir=None):
-    """Create a GIF from all PNG images in the given folder."""
-    folder_path = Path(textured_folder)
 
-    # Find all PNG files and sort them naturally
-    png_files = sorted(folder_path.glob("*.png"), key=natural_sort_key)
-
-    if not png_files:
-        print(f"⚠️  No PNG files found in {folder_path}")
-        return False
-
-    # Create output filename
+def gif_path(textured_folder, output_base_dir=None, input_base_dir=None):
+    """Path of the GIF built from the given folder."""
+    folder_path = Path(textured_folder)
     parent_name = folder_path.parent.name
 
     if output_base_dir:
@@ -48,15 +43,22 @@ def create_gif(textured_folder, delay, loop, resize, output_base_dir=None, input
         else:
             output_dir = output_base
 
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_file = output_dir / f"{parent_name}.gif"
-    else:
-        # Save in parent directory (default behavior)
-        output_file = folder_path.parent / f"{parent_name}.gif"
+        return output_dir / f"{parent_name}.gif"
+
+    # Save in parent directory (default behavior)
+    return folder_path.parent / f"{parent_name}.gif"
+
+
+def is_up_to_date(output_file, png_files):
+    """Whether the GIF exists and is newer than all of its frames."""
+    if not output_file.exists():
+        return False
+    gif_time = output_file.stat().st_mtime
+    return all(f.stat().st_mtime <= gif_time for f in png_files)
 
-    print(f"📸 Creating GIF from {len(png_files)} images in {folder_path.name}")
-    print(f"   → {output_file}")
 
+def encode_imagemagick(png_files, output_file, delay, loop, resize):
+    """Encode the frames with an ImageMagick `convert` subprocess."""
     # Build ImageMagick command
     cmd = ["convert", "-delay", str(delay), "-loop", str(loop), "-dispose", "previous"]
 
@@ -75,12 +77,93 @@ def create_gif(textured_folder, delay, loop, resize, output_base_dir=None, input
 
     try:
         subprocess.run(cmd, check=True, capture_output=True)
-        file_size = output_file.stat().st_size / (1024 * 1024)  # Size in MB
-        print(f"   ✓ Created {output_file.name} ({file_size:.2f} MB)")
-        return True
     except subprocess.CalledProcessError as e:
-        print(f"   ✗ Error creating GIF: {e.stderr.decode()}")
-        return False
+        raise RuntimeError(e.stderr.decode()) from e
+
+
+def resized_size(size, resize):
+    """Apply an ImageMagick-style "50%" or "WIDTHxHEIGHT" resize to a size."""
+    width, height = size
+    if resize.endswith("%"):
+        scale = float(resize[:-1]) / 100
+        return max(1, round(width * scale)), max(1, round(height * scale))
+    new_width, new_height = (int(v) for v in resize.lower().split("x"))
+    return new_width, new_height
+
+
+def encode_pillow(png_files, output_file, delay, loop, resize):
+    """Encode the frames in-process with Pillow, streaming one frame at a time."""
+    # Pillow is optional, the default encoder is ImageMagick.
+    from PIL import Image  # noqa: PLC0415
+
+    def read_frames():
+        # Each frame is read, converted and resized once, as the encoder asks for it.
+        for f in png_files:
+            with Image.open(f) as image:
+                frame = image.convert("RGBA")
+            if resize:
+                frame = frame.resize(resized_size(frame.size, resize), Image.LANCZOS)
+            yield frame
+
+    frames = read_frames()
+    first = next(frames)
+    first.save(
+        output_file,
+        save_all=True,
+        append_images=frames,
+        duration=delay * 10,  # milliseconds
+        loop=loop,
+        disposal=2,
+    )
+
+
+def create_gif(
+    textured_folder,
+    delay,
+    loop,
+    resize,
+    *,
+    output_base_dir=None,
+    input_base_dir=None,
+    encoder="imagemagick",
+    force=False,
+):
+    """Create a GIF from all PNG images in the given folder.
+
+    Returns a (status, message, number of frames, encode seconds) tuple, where
+    status is "created", "skipped" or "failed".
+    """
+    folder_path = Path(textured_folder)
+
+    # Find all PNG files and sort them naturally
+    png_files = sorted(folder_path.glob("*.png"), key=natural_sort_key)
+
+    if not png_files:
+        return "failed", f"⚠️  No PNG files found in {folder_path}", 0, 0.0
+
+    # Create output filename
+    output_file = gif_path(folder_path, output_base_dir, input_base_dir)
+
+    if not force and is_up_to_date(output_file, png_files):
+        return "skipped", f"⏭  {output_file} is up to date", len(png_files), 0.0
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    encode = encode_pillow if encoder == "pillow" else encode_imagemagick
+
+    start = time.perf_counter()
+    try:
+        encode(png_files, output_file, delay, loop, resize)
+    except Exception as e:
+        return "failed", f"✗ Error creating {output_file}: {e}", len(png_files), 0.0
+    elapsed = time.perf_counter() - start
+
+    file_size = output_file.stat().st_size / (1024 * 1024)  # Size in MB
+    message = (
+        f"✓ Created {output_file} from {len(png_files)} images "
+        f"({file_size:.2f} MB) in {elapsed:.2f}s"
+    )
+    return "created", message, len(png_files), elapsed
+
 
 def main():
     """Find all *_textured folders and create GIFs."""
@@ -91,30 +174,52 @@ def main():
         "--input-dir",
         "-i",
         default=DEFAULT_OUTPUT_DIR,
-        help=f"Directory to search for image sequences (default: {DEFAULT_OUTPUT_DIR})"
+        help=f"Directory to search for image sequences (default: {DEFAULT_OUTPUT_DIR})",
     )
     parser.add_argument(
         "--output-dir",
         "-o",
         default=None,
-        help="Directory to save GIF files (default: save next to original images)"
+        help="Directory to save GIF files (default: save next to original images)",
     )
     parser.add_argument(
         "--delay",
         type=int,
         default=DEFAULT_DELAY,
-        help=f"Delay between frames in 1/100th of a second (default: {DEFAULT_DELAY})"
+        help=f"Delay between frames in 1/100th of a second (default: {DEFAULT_DELAY})",
     )
     parser.add_argument(
         "--loop",
         type=int,
         default=DEFAULT_LOOP,
-        help=f"Loop count, 0 = infinite (default: {DEFAULT_LOOP})"
+        help=f"Loop count, 0 = infinite (default: {DEFAULT_LOOP})",
     )
     parser.add_argument(
         "--resize",
         default=DEFAULT_RESIZE,
-        help=f"Resize percentage or 'none' for original size (default: {DEFAULT_RESIZE})"
+        # argparse would read the % of the default as a format character.
+        help="Resize percentage or 'none' for original size (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of GIFs to encode concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=ENCODERS,
+        default="imagemagick",
+        help=(
+            "ImageMagick subprocess, or in-process Pillow encoder "
+            "(default: imagemagick)"
+        ),
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild GIFs that are newer than their frames",
     )
 
     args = parser.parse_args()
@@ -141,16 +246,59 @@ def main():
     print(f"Found {len(textured_folders)} folders with image sequences\n")
     print(f"Input directory: {args.input_dir}")
     print(f"Output directory: {args.output_dir or 'same as input'}")
-    print(f"Settings: delay={args.delay/100}s, loop={'infinite' if args.loop==0 else args.loop}, resize={resize or 'original'}\n")
+    loop = "infinite" if args.loop == 0 else args.loop
+    print(
+        f"Settings: delay={args.delay / 100}s, loop={loop}, "
+        f"resize={resize or 'original'}"
+    )
+    print(f"Encoder: {args.encoder}, jobs: {args.jobs}\n")
+
+    # ImageMagick runs in subprocesses, so threads are enough to drive it;
+    # the Pillow encoder needs its own processes.
+    executor_cls = (
+        ProcessPoolExecutor if args.encoder == "pillow" else ThreadPoolExecutor
+    )
+
+    counts = {"created": 0, "skipped": 0, "failed": 0}
+    num_frames = 0
+    encode_time = 0.0
+    start = time.perf_counter()
+    with executor_cls(max_workers=max(1, args.jobs)) as executor:
+        futures = [
+            executor.submit(
+                create_gif,
+                folder,
+                args.delay,
+                args.loop,
+                resize,
+                output_base_dir=args.output_dir,
+                input_base_dir=args.input_dir,
+                encoder=args.encoder,
+                force=args.force,
+            )
+            for folder in textured_folders
+        ]
+        for i, future in enumerate(as_completed(futures), 1):
+            status, message, frames, elapsed = future.result()
+            print(f"[{i}/{len(textured_folders)}] {message}")
+            counts[status] += 1
+            if status == "created":
+                num_frames += frames
+                encode_time += elapsed
+    wall_time = time.perf_counter() - start
 
-    success_count = 0
-    for i, folder in enumerate(textured_folders, 1):
-        print(f"[{i}/{len(textured_folders)}]")
-        if create_gif(folder, args.delay, args.loop, resize, args.output_dir, args.input_dir):
-            success_count += 1
-        print()
+    print()
+    print(
+        f"✅ Successfully created {counts['created']}/{len(textured_folders)} GIFs "
+        f"({counts['skipped']} up to date, {counts['failed']} failed)"
+    )
+    if counts["created"]:
+        print(
+            f"⏱  {wall_time:.1f}s wall time, {encode_time:.1f}s encoding: "
+            f"{counts['created'] / wall_time:.2f} GIFs/s, "
+            f"{num_frames / wall_time:.1f} frames/s"
+        )
 
-    print(f"✅ Successfully created {success_count}/{len(textured_folders)} GIFs")
 
 if __name__ == "__main__":
     main()